@@ -5,10 +5,9 @@ from jass.game.const import *
 from jass.game.rule_schieber import RuleSchieber
 from jass.agents.agent import Agent
 from jass.agents.agent_random_schieber import AgentRandomSchieber
+from jass.agents.trump_selection import TrumpSelection, TRUMP_THRESHOLD
 from jass.arena.arena import Arena
 
-TRUMP_THRESHOLD = 68
-
 class Agent_rulebased(Agent):
 
 
@@ -16,6 +15,7 @@ class Agent_rulebased(Agent):
         super().__init__()
         # we need a rule object to determine the valid cards
         self._rule = RuleSchieber()
+        self._trump_selection = TrumpSelection(method='score', threshold=TRUMP_THRESHOLD)
 
     def action_trump(self, obs: GameObservation) -> int:
         """
@@ -26,40 +26,10 @@ class Agent_rulebased(Agent):
         Returns:
             selected trump as encoded in jass.game.const or jass.game.const.PUSH
         """
-        # add your code here using the function above
-
-
-
-        # score if the color is trump
-        trump_score = [15, 10, 7, 25, 6, 19, 5, 5, 5]
-        # score if the color is not trump
-        no_trump_score = [9, 7, 5, 2, 1, 0, 0, 0, 0]
-        # score if obenabe is selected (all colors)
-        obenabe_score = [14, 10, 8, 7, 5, 0, 5, 0, 0, ]
-        # score if uneufe is selected (all colors)
-        uneufe_score = [0, 2, 1, 1, 5, 5, 7, 9, 11]
-
-
-        best_cardsum = 0
-        best_trump = -1
-        card_list = convert_one_hot_encoded_cards_to_int_encoded_list(obs.hand)
-        for current_trump in trump_ints:
-            current_cardsum = 0
-            for card in card_list:
-                color = color_of_card[card]
-                offset = offset_of_card[card]
-                if color == current_trump:
-                    current_cardsum += trump_score[offset]
-                elif (current_trump == 4):
-                    current_cardsum += obenabe_score[offset]
-                elif (current_trump == 5):
-                    current_cardsum += uneufe_score[offset]
-                else:
-                    current_cardsum += no_trump_score[offset]
-
-            if (best_cardsum < current_cardsum):
-                best_cardsum = current_cardsum
-                best_trump = current_trump
+        # scores of all trumps, evaluated on the canonical hand and cached
+        scores = self._trump_selection.evaluate(obs.hand)
+        best_trump = int(np.argmax(scores[0:MAX_TRUMP + 1]))
+        best_cardsum = int(scores[best_trump])
 
         if(best_cardsum >= TRUMP_THRESHOLD or obs.forehand == 0):
 
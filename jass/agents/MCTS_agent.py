@@ -1,14 +1,47 @@
 from jass.agents.MCTS_logic import MCTS_logic
 from jass.agents.agent import Agent
+from jass.agents.trump_selection import TrumpSelection
 from jass.game.game_observation import GameObservation
 
 
 class MCTS_agent(Agent):
-    def __init__(self, name, max_iterations=80):
-        self.__play_strategy = MCTS_logic(name, max_iterations)
+    def __init__(self, name='MCTS', max_iterations=80, information_set=False, time_budget_ms=None, nr_workers=0,
+                 reuse_tree=False, endgame_table=None, trump_selection: TrumpSelection = None):
+        self.__play_strategy = MCTS_logic(name, max_iterations, information_set=information_set,
+                                          time_budget_ms=time_budget_ms, nr_workers=nr_workers,
+                                          reuse_tree=reuse_tree, endgame_table=endgame_table)
+        self.__trump_selection = trump_selection if trump_selection is not None \
+            else TrumpSelection(method='simulation')
+
+    def set_seed(self, seed) -> None:
+        """
+        Set the seed of the random number generator of the search.
+        """
+        self.__play_strategy.set_seed(seed)
+
+    def close(self) -> None:
+        """
+        Shut down the worker processes of a parallel search and close the cache of the trump selection.
+        """
+        self.__play_strategy.close()
+        self.__trump_selection.close()
+
+    @property
+    def last_iterations(self) -> int:
+        """
+        Number of iterations of the search for the last card.
+        """
+        return self.__play_strategy.last_iterations
+
+    @property
+    def last_confidence(self) -> float:
+        """
+        Share of the visits of the root that went to the last card played (between 0 and 1).
+        """
+        return self.__play_strategy.last_confidence
 
     def action_trump(self, obs: GameObservation) -> int:
-        return self.__play_strategy.choose_card(obs)
+        return self.__trump_selection.select(obs.hand, obs.forehand)
 
     def action_play_card(self, obs: GameObservation) -> int:
         return self.__play_strategy.choose_card(obs)
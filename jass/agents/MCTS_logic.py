@@ -1,30 +1,216 @@
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
-from jass.agents.agent import Agent
-from jass.game.const import card_strings, next_player, partner_player
+
+from jass.agents.mcts_tree import MCTSTree
+from jass.game.bitboard import ALL_CARDS_BITS, cards_to_bits, card_list_to_bits, bits_to_card_list, bits_to_cards
+from jass.game.const import card_strings, next_player, card_values, team
+from jass.game.determinization import HandSampler
+from jass.game.endgame_table import EndgameTable
 from jass.game.game_observation import GameObservation
-from jass.game.rule_schieber import RuleSchieber
-from anytree import Node
+from jass.game.rollout import RolloutEngine, BatchRolloutEngine, ALL_PLAYERS
+from jass.game.rule_schieber_bitboard import RuleSchieberBitboard
 
 
 class MCTS_logic():
-
-    def __init__(self, agent_name, iterations=40):
-
+    """
+    Monte Carlo tree search for selecting the card to play.
+
+    The tree is stored in an MCTSTree, the position of a node is obtained by replaying the cards from the root
+    on bitboards. The cards of the other players are unknown, they are modelled as one common pool of the unseen
+    cards, from which any of the other players can play any card.
+
+    In information set mode (ISMCTS), the hands of the other players are sampled for each iteration instead,
+    consistent with the number of cards of each player and the colors that a player is known not to have. All the
+    players then play according to the rules, and only the children that are legal in the sampled hands are
+    selected in the tree.
+
+    With reuse_tree, the tree is kept after the search. For the next card of the same game, the tree is followed
+    along the cards played since then, and the subtree of the new position becomes the root, so that its
+    statistics are kept for the next search.
+
+    The search can run in parallel in a pool of worker processes, which is started before the first search and kept
+    for all the following searches (until close is called). Each worker runs an independent search from the root
+    with its own random numbers (and samples of the hands) and the visit counts of the cards at the root are added
+    up (root parallel search).
+    """
+
+    def __init__(self, agent_name, iterations=40, exploration=1.0, tree_capacity=100000, seed=None,
+                 information_set=False, time_budget_ms=None, nr_workers=0,
+                 reuse_tree=False, rollout_policy=None, rollouts_per_leaf=1, endgame_table=None):
+        """
+        Args:
+            agent_name: name of the agent
+            iterations: number of iterations of the search for each card
+            exploration: exploration constant for UCB1
+            tree_capacity: maximal number of nodes in the tree
+            seed: seed for the random number generator of the simulations
+            information_set: True to sample the hands of the other players for each iteration
+            time_budget_ms: if set, the search runs for this time (in milliseconds) for each card instead of a
+                fixed number of iterations
+            nr_workers: number of worker processes for a parallel search, or 0 to search in this process
+            reuse_tree: True to keep the tree between the cards of a game (not used in parallel search)
+            rollout_policy: policy for the simulations (see RolloutEngine), or None to play random cards
+            rollouts_per_leaf: number of random playouts from each leaf, if larger than 1 the playouts are run as
+                one vectorized batch (see BatchRolloutEngine) and the leaf gets the mean payoff. Without information
+                set, the pool of unseen cards is dealt randomly to the other players for each playout.
+            endgame_table: file name of an EndgameTable, which is opened read only and used to end the simulations
+                with the exact values of the last tricks (only for information set search, as the hands of the
+                other players are needed, and not for the batch playouts)
+        """
+        self._logger = logging.getLogger(__name__)
+        self.name = agent_name
         self.iterations = iterations
-        self.__rule = RuleSchieber()
-        self.root: Node = None
-        self.current_node: Node = None
+        self.time_budget_ms = time_budget_ms
+        self.nr_workers = nr_workers
+        self.reuse_tree = reuse_tree
+        self.__pool = None
+        self.information_set = information_set
+        self.__sampler = None
+        self.exploration = exploration
+        self.__rule = RuleSchieberBitboard(use_strength_table=True)
+        self.__card_values = card_values.tolist()
+        self.endgame_table = endgame_table
+        self.__rollout = RolloutEngine(seed, rollout_policy,
+                                       EndgameTable(endgame_table) if endgame_table is not None else None)
+        self.__rng = self.__rollout.rng
+        self.rollouts_per_leaf = rollouts_per_leaf
+        self.__batch_rollout = BatchRolloutEngine(rollouts_per_leaf, seed) if rollouts_per_leaf > 1 else None
+        self.tree = MCTSTree(tree_capacity)
+        self.root = 0
+
+        # the position at the root of the tree, set from the observation
+        self.__player_view = -1
+        self.__trump = -1
+        self.__root_played_cards = []
+        self.__root_hands = [0, 0, 0, 0]
+        self.__root_trick = [-1, -1, -1, -1]
+        self.__root_nr_cards_in_trick = 0
+        self.__root_first_player = -1
+        self.__root_nr_played_cards = 0
+        self.__root_points = [0, 0]
+
+        # the position during an iteration
+        self.__hands = [0, 0, 0, 0]
+        self.__trick = [-1, -1, -1, -1]
+        self.__nr_cards_in_trick = 0
+        self.__first_player = -1
+        self.__player = -1
+        self.__nr_played_cards = 0
+        self.__points = [0, 0]
+
+        # the nodes visited in the current iteration
+        self.__path = []
+
+        # information about the last search
+        self.last_iterations = 0
+        self.last_confidence = 0.0
+        self.last_time_ms = 0.0
+        self.last_reused_iterations = 0
 
     def choose_card(self, obs: GameObservation) -> int:
-
-        self.init_tree(obs)
-        for i in range(self.iterations):
-            self.monte_carlo_tree_search(obs)
-            if len(self.root.children) == 1 and self.root.expanded:
+        """
+        Search for the card to play, either for the given number of iterations or until the time budget is used.
+
+        After the search, last_iterations, last_confidence and last_time_ms contain the number of iterations that
+        were run, the share of the visits of the root that went to the selected card and the time of the search.
+        last_reused_iterations is the number of visits of the root kept from the previous search.
+        In root parallel search, each worker runs the given number of iterations.
+        """
+        if self.nr_workers > 0:
+            # starting the worker processes does not count for the time budget
+            self.start_workers()
+        start = time.time()
+        deadline = None if self.time_budget_ms is None else start + self.time_budget_ms / 1000.0
+        self.last_reused_iterations = 0
+        if self.nr_workers > 0:
+            cards, counts = self.__search_root_parallel(obs, deadline)
+            self.last_iterations = int(counts.sum())
+        else:
+            self.init_tree(obs)
+            self.last_reused_iterations = int(self.tree.count[self.root])
+            self.search(deadline)
+            self.last_iterations = int(self.tree.count[self.root]) - self.last_reused_iterations
+            children = self.tree.children(self.root)
+            cards = self.tree.card[children]
+            counts = self.tree.count[children]
+
+        best = int(np.argmax(counts))
+        self.last_confidence = float(counts[best] / counts.sum())
+        self.last_time_ms = (time.time() - start) * 1000.0
+        self._logger.debug('Search: {} iterations in {:.1f} ms, confidence {:.2f}'.format(
+            self.last_iterations, self.last_time_ms, self.last_confidence))
+        return int(cards[best])
+
+    def search(self, deadline: float = None) -> int:
+        """
+        Run iterations of the search from the current tree in this process.
+
+        Args:
+            deadline: time (as returned by time.time()) at which to stop the search, or None to run the number
+                of iterations of the search
+
+        Returns:
+            the number of iterations
+        """
+        iterations = 0
+        # at least one iteration is needed to expand the root
+        while iterations == 0 or (iterations < self.iterations if deadline is None else time.time() < deadline):
+            self.monte_carlo_tree_search()
+            iterations += 1
+            if self.tree.nr_children[self.root] == 1:
                 break
-
-        best_node = self.best_node()
-        return best_node.card
+        return iterations
+
+    def set_seed(self, seed) -> None:
+        """
+        Set the seed of the random number generator of the simulations.
+        """
+        self.__rng.seed(seed)
+        if self.__batch_rollout is not None:
+            self.__batch_rollout.seed(seed)
+
+    def close(self) -> None:
+        """
+        Shut down the worker processes of the parallel search.
+        """
+        if self.__pool is not None:
+            self.__pool.shutdown()
+            self.__pool = None
+
+    def start_workers(self) -> None:
+        """
+        Start the worker processes of the parallel search, if they are not running yet. This is done by the first
+        search, but can be called before to avoid the delay in the first search.
+        """
+        if self.__pool is None:
+            config = dict(agent_name=self.name, exploration=self.exploration, information_set=self.information_set,
+                          rollout_policy=self.__rollout.policy, rollouts_per_leaf=self.rollouts_per_leaf,
+                          endgame_table=self.endgame_table)
+            self.__pool = ProcessPoolExecutor(max_workers=self.nr_workers, initializer=_init_worker,
+                                              initargs=(config,))
+            # the processes are started when the tasks are submitted, wait until all of them have been initialized
+            futures = [self.__pool.submit(_ready) for _ in range(self.nr_workers)]
+            for future in futures:
+                future.result()
+
+    def __search_root_parallel(self, obs: GameObservation, deadline: float or None) -> (np.ndarray, np.ndarray):
+        """
+        Run independent searches in the worker processes and add up the visit counts of the cards at the root.
+
+        Returns:
+            the cards at the root and their visit counts
+        """
+        counts = np.zeros(36)
+        futures = [self.__pool.submit(_search_root, obs, self.__rng.getrandbits(64), self.iterations, deadline)
+                   for _ in range(self.nr_workers)]
+        for future in futures:
+            worker_cards, worker_counts = future.result()
+            counts[worker_cards] += worker_counts
+        cards = np.flatnonzero(counts)
+        return cards, counts[cards]
 
     def cardnames(self, cards):
         cardnames = list()
@@ -34,325 +220,230 @@ class MCTS_logic():
         return cardnames
 
     def init_tree(self, obs: GameObservation):
-
-        scores = np.zeros(4)
-        for trick, player in enumerate(obs.trick_winner):
-            if player < 0:
-                break
-            scores[player] += obs.trick_points[trick]
-
-        played_cards = np.zeros(36)
-        for trick in obs.tricks:
-            if trick[0] == -1:
-                break
-            for card in trick:
-                if card == -1:
+        """
+        Set the position of the root from the observation and create a new tree, or move the root of the current
+        tree to the position of the observation if reuse_tree is set.
+        """
+        played_cards = [card for card in obs.tricks.flatten().tolist() if card != -1]
+        previous_played_cards = self.__root_played_cards
+        own = cards_to_bits(obs.hand)
+        # the tree can be used if the observation is from the same game (the same hand and the cards played
+        # before the previous search)
+        reuse = self.reuse_tree and self.tree.nr_nodes > 0 and obs.player_view == self.__player_view and \
+            obs.trump == self.__trump and played_cards[0:len(previous_played_cards)] == previous_played_cards and \
+            own == self.__root_hands[obs.player_view] & ~card_list_to_bits(played_cards)
+        self.__root_played_cards = played_cards
+        self.__player_view = obs.player_view
+        self.__trump = obs.trump
+
+        trick = obs.tricks[obs.nr_tricks].tolist()
+        played = card_list_to_bits(played_cards)
+        pool = ALL_CARDS_BITS & ~played & ~own
+        self.__root_hands = [pool, pool, pool, pool]
+        self.__root_hands[obs.player_view] = own
+
+        self.__root_trick = trick
+        self.__root_nr_cards_in_trick = obs.nr_cards_in_trick
+        self.__root_first_player = obs.trick_first_player[obs.nr_tricks] if obs.nr_cards_in_trick > 0 \
+            else obs.player_view
+        self.__root_nr_played_cards = obs.nr_played_cards
+        self.__root_points = [int(obs.points[0]), int(obs.points[1])]
+
+        if self.information_set:
+            self.__sampler = HandSampler(obs)
+
+        if reuse:
+            node = self.root
+            for card in played_cards[len(previous_played_cards):]:
+                node = self.tree.find_child(node, card)
+                if node < 0:
                     break
-                played_cards[card] = 1
+            if node >= 0 and self.tree.is_expanded(node):
+                self.root = self.tree.reroot(node)
+                return
 
-        own_cards = obs.hand.copy()
-
-        self.root = Node("Root", player=next_player[next_player[next_player[obs.player_view]]], trick=obs.nr_tricks,
-                         trick_cards=obs.current_trick.copy(), played_cards=played_cards, own_cards=own_cards,
-                         expanded=False, scores=scores, count=0, card=None, total_payoff=0)
-        self.current_node = self.root
-
-    def monte_carlo_tree_search(self, obs: GameObservation):
+        # the root node belongs to the player that played before us
+        self.root = self.tree.clear(player=next_player[next_player[next_player[obs.player_view]]])
 
+    def monte_carlo_tree_search(self):
         # 1. Selection
-        self.selection()
+        node = self.selection()
         # 2. Expansion
-        self.expansion(obs)
+        node = self.expansion(node)
         # 3. Simulation
-        payoff = self.simulation(obs)
+        payoff = self.simulation()
         # 4. Backpropagation
         self.backpropagation(payoff)
 
-    def selection(self):
-
-        self.__current_node = self.root
-        while self.current_node.expanded and not self.current_node.is_leaf:
-            # select child node by tree policy
-            best_node = None
-            # Cannot be zero as early confidences can be zero as well
-            best_confidence = -1
-            for node in self.current_node.children:
-                confidence = self.calculate_ucb1(self.node)
-                if best_confidence < confidence:
-                    best_confidence = confidence
-                    best_node = node
-            self.current_node = best_node
-
-    def calc_ucb1(self, node):
-        ucb1 = (node.total_payoff / node.count) + 1 * (np.sqrt(np.log(self.root.count) / node.count))
-        return ucb1
-
-    def expansion(self, obs):
-        if self.current_node.expanded:
-            return
-        is_my_turn = next_player[self.current_node.player] == obs.player_view
-        valid_cards = None
-        if is_my_turn:
-            own_cards = self.current_node.own_cards.copy()
-            nr_cards_in_trick = int(
-                np.sum(self.current_node.played_cards) % 4)
-            valid_cards = self.rule.get_valid_cards(own_cards,
-                                                    self.current_node.trick_cards,
-                                                    nr_cards_in_trick,
-                                                    obs.trump)
+    def selection(self) -> int:
+        """
+        Select a node by descending the tree with UCB1 from the root, while replaying the cards of the nodes.
+
+        Returns:
+            the selected node, which is either not yet expanded or terminal
+        """
+        self.__reset_position()
+        node = self.root
+        self.__path = [node]
+        while self.tree.is_expanded(node):
+            node = self.__select_child(node)
+            self.__play_card(int(self.tree.card[node]))
+            self.__path.append(node)
+        return node
+
+    def expansion(self, node: int) -> int:
+        """
+        Expand the node, if it has already been visited (or if it is the root) and select its first child.
+
+        Returns:
+            the node from which the simulation starts
+        """
+        if self.__nr_played_cards == 36 or (self.tree.count[node] == 0 and node != self.root):
+            return node
+        if not self.tree.expand(node, bits_to_card_list(self.__candidate_cards()), self.__player):
+            # the tree is full, simulate from the node
+            return node
+        node = self.__select_child(node)
+        self.__play_card(int(self.tree.card[node]))
+        self.__path.append(node)
+        return node
+
+    def simulation(self) -> float:
+        """
+        Play the game from the current position to the end with the rollout engine.
+
+        Returns:
+            the payoff for team 0
+        """
+        if self.__batch_rollout is not None:
+            return self.__batch_simulation()
+        self.__rollout.playout(self.__hands, self.__trick, self.__nr_cards_in_trick, self.__first_player,
+                               self.__player, self.__nr_played_cards, self.__points, self.__trump,
+                               ALL_PLAYERS if self.information_set else 1 << self.__player_view)
+        return self.__points[0] / (self.__points[0] + self.__points[1])
+
+    def __batch_simulation(self) -> float:
+        """
+        Play a batch of random playouts from the current position.
+
+        Returns:
+            the mean payoff for team 0
+        """
+        if self.information_set:
+            hands = np.array([bits_to_cards(hand) for hand in self.__hands])
         else:
-            valid_cards = np.ones(36)
-            valid_cards = np.subtract(
-                valid_cards, self.current_node.own_cards)
-            valid_cards = np.subtract(
-                valid_cards, self.current_node.played_cards)
-        valid_actions = list()
-        for card, value in enumerate(valid_cards):
-            if value == 1:
-                valid_actions.append(card)
-        unexplored_actions = valid_actions.copy()
-        for node in self.current_node.children:
-            unexplored_actions.remove(node.card)
-
-        # we now have fully expanded the node
-        if len(unexplored_actions) <= 1:
-            self.current_node.expanded = True
-
-        if 0 < len(unexplored_actions):
-            # select an unexplored action / card by policy (currently random)
-            card = unexplored_actions[-1]
-            player = next_player[self.current_node.player]
-            own_cards = self.current_node.own_cards.copy()
-            if player == obs.player_view:
-                own_cards[card] = 0
-            played_cards = self.current_node.played_cards.copy()
-            trick_position = int(np.sum(played_cards)) % 4
-            played_cards[card] = 1
-            if trick_position == 0:
-                current_trick = self.current_node.trick + 1
-                trick_cards = np.full(4, -1)
-            else:
-                current_trick = self.current_node.trick
-                trick_cards = self.current_node.trick_cards.copy()
-            trick_cards[trick_position] = card
-            scores = self.current_node.scores.copy()
-
-            # a trick was finished
-            if trick_position == 3:
-                first_player = next_player[player]
-                trick_points = self.rule.calc_points(
-                    trick_cards, current_trick == 8, obs.trump)
-                winner = self.rule.calc_winner(
-                    trick_cards, first_player, obs.trump)
-                scores[winner] += trick_points
-
-            next_node = Node(f"{int(np.sum(played_cards))}.{card}", parent=self.current_node,
-                             player=player, trick=current_trick, trick_cards=trick_cards,
-                             played_cards=played_cards, own_cards=own_cards, card=card,
-                             expanded=False, scores=scores, count=0, total_payoff=0)
-            self.current_node = next_node
-
-    def __do_simulation(self, obs):
-        payoff = 0
-        # a leaf we already calculated the payoff for
-        if self.current_node.expanded:
-            if 0 < self.current_node.total_payoff:
-                payoff = self.current_node.total_payoff / self.current_node.count
-            # a leaf need to calculate the payoff for
-            else:
-                payoff = self.calculate_payoff(obs, self.current_node.scores)
+            # deal the pool of unseen cards to the other players for each playout
+            batch_size = self.rollouts_per_leaf
+            hands = np.zeros([batch_size, 4, 36], dtype=np.int32)
+            hands[:, self.__player_view, :] = bits_to_cards(self.__hands[self.__player_view])
+            pool = np.array(bits_to_card_list(self.__hands[next_player[self.__player_view]]), dtype=np.int32)
+            cards = pool[np.argsort(self.__batch_rollout.rng.random((batch_size, pool.size)), axis=1)]
+            rows = np.arange(batch_size)[:, np.newaxis]
+            nr_tricks = (self.__nr_played_cards - self.__nr_cards_in_trick) // 4
+            start = 0
+            for player in range(4):
+                if player == self.__player_view:
+                    continue
+                # the players that already played in the current trick have one card less
+                nr_cards = 9 - nr_tricks - (1 if (self.__first_player - player) % 4 < self.__nr_cards_in_trick else 0)
+                hands[rows, player, cards[:, start:start + nr_cards]] = 1
+                start += nr_cards
+        points = self.__batch_rollout.rollout_position(hands, self.__trick, self.__nr_cards_in_trick,
+                                                       self.__first_player, self.__player, self.__nr_played_cards,
+                                                       self.__points, self.__trump)
+        return float(np.mean(points[:, 0] / points.sum(axis=1)))
+
+    def backpropagation(self, payoff: float):
+        self.tree.backpropagate(self.__path, payoff)
+
+    def best_node(self) -> int:
+        return self.tree.best_child(self.root)
+
+    def __reset_position(self):
+        if self.information_set:
+            self.__hands[:] = self.__sampler.sample(self.__rng)
         else:
-            current_player = next_player[self.current_node.player]
-            trick_cards = self.current_node.trick_cards.copy()
-            own_cards = self.current_node.own_cards.copy()
-            played_cards = self.current_node.played_cards.copy()
-            unplayed_cards_others = np.ones(36)
-            unplayed_cards_others = np.subtract(unplayed_cards_others, own_cards)
-            unplayed_cards_others = np.subtract(unplayed_cards_others, played_cards)
-            simulated_scores = self.current_node.scores.copy()
-            actions_others = list()
-            for card, value in enumerate(unplayed_cards_others):
-                if value == 1:
-                    actions_others.append(card)
-
-            # play remaining tricks
-            for played_card_count in range(int(np.sum(self.current_node.played_cards)), 36):
-                current_trick = int(played_card_count / 4)
-                trick_position = played_card_count % 4
-                if current_player == obs.player_view:
-                    valid_cards = self.rule.get_valid_cards(own_cards,
-                                                            trick_cards,
-                                                            played_card_count % 4,
-                                                            obs.trump)
-                    valid_actions = list()
-                    for card, value in enumerate(valid_cards):
-                        if value == 1:
-                            valid_actions.append(card)
-                else:
-                    valid_actions = actions_others
-
-                card = np.random.choice(valid_actions)
-                trick_cards[trick_position] = card
-                played_cards[card] = 1
-                if current_player == obs.player_view:
-                    own_cards[card] = 0
-                else:
-                    unplayed_cards_others[card] = 0
-                    actions_others.remove(card)
-                if trick_position == 3:
-                    first_player = next_player[current_player]
-                    trick_points = self.rule.calc_points(
-                        trick_cards, current_trick == 8, obs.trump)
-                    winner = self.rule.calc_winner(
-                        trick_cards, first_player, obs.trump)
-                    simulated_scores[winner] += trick_points
-                    trick_cards.fill(-1)
-                    current_player = winner
-                else:
-                    current_player = next_player[current_player]
-            payoff = self.calculate_payoff(obs, simulated_scores)
-        return payoff
-
-    def calculate_payoff(self, obs, scores):
-        player = obs.player_view
-        partner = partner_player[player]
-        payoff = (scores[player] + scores[partner]) / 157
-        return payoff
-
-    def backpropagation(self, payoff):
-        for node in self.current_node.iter_path_reverse():
-            node.count += 1
-            node.total_payoff += payoff
-
-    def expansion(self, obs):
-        if self.current_node.expanded:
+            self.__hands[:] = self.__root_hands
+        self.__trick[:] = self.__root_trick
+        self.__nr_cards_in_trick = self.__root_nr_cards_in_trick
+        self.__first_player = self.__root_first_player
+        self.__player = self.__player_view
+        self.__nr_played_cards = self.__root_nr_played_cards
+        self.__points[:] = self.__root_points
+
+    def __select_child(self, node: int) -> int:
+        if self.information_set:
+            return self.tree.select_child_ucb1(node, self.exploration, self.__valid_cards())
+        return self.tree.select_child_ucb1(node, self.exploration)
+
+    def __candidate_cards(self) -> int:
+        """
+        Get the cards that the current player might play in the position as bitboard. In information set mode,
+        these are all the cards that have not been seen by the player of the observation.
+        """
+        if not self.information_set or self.__player == self.__player_view:
+            return self.__valid_cards()
+        unseen = 0
+        for player in range(4):
+            if player != self.__player_view:
+                unseen |= self.__hands[player]
+        return unseen
+
+    def __valid_cards(self) -> int:
+        """
+        Get the valid cards of the current player as bitboard. Without information set, the other players can
+        play any card of the pool.
+        """
+        hand = self.__hands[self.__player]
+        if self.__player != self.__player_view and not self.information_set:
+            return hand
+        return self.__rule.get_valid_cards_bits(hand, self.__trick, self.__nr_cards_in_trick, self.__trump)
+
+    def __play_card(self, card: int):
+        mask = ~(1 << card)
+        hands = self.__hands
+        for player in range(4):
+            hands[player] &= mask
+        self.__trick[self.__nr_cards_in_trick] = card
+        self.__nr_played_cards += 1
+        if self.__nr_cards_in_trick < 3:
+            self.__nr_cards_in_trick += 1
+            self.__player = next_player[self.__player]
             return
-        is_my_turn = next_player[self.current_node.player] == obs.player_view
-        valid_cards = None
-        if is_my_turn:
-            own_cards = self.current_node.own_cards.copy()
-            nr_cards_in_trick = int(
-                np.sum(self.current_node.played_cards) % 4)
-            valid_cards = self.rule.get_valid_cards(own_cards,
-                                                    self.current_node.trick_cards,
-                                                    nr_cards_in_trick,
-                                                    obs.trump)
-        else:
-            valid_cards = np.ones(36)
-            valid_cards = np.subtract(
-                valid_cards, self.current_node.own_cards)
-            valid_cards = np.subtract(
-                valid_cards, self.current_node.played_cards)
-        valid_actions = list()
-        for card, value in enumerate(valid_cards):
-            if value == 1:
-                valid_actions.append(card)
-        unexplored_actions = valid_actions.copy()
-        for node in self.current_node.children:
-            unexplored_actions.remove(node.card)
-
-        # we now have fully expanded the node
-        if len(unexplored_actions) <= 1:
-            self.current_node.expanded = True
-
-        if 0 < len(unexplored_actions):
-            # select an unexplored action / card by policy (currently random)
-            card = unexplored_actions[-1]
-            player = next_player[self.current_node.player]
-            own_cards = self.current_node.own_cards.copy()
-            if player == obs.player_view:
-                own_cards[card] = 0
-            played_cards = self.current_node.played_cards.copy()
-            trick_position = int(np.sum(played_cards)) % 4
-            played_cards[card] = 1
-            if trick_position == 0:
-                current_trick = self.current_node.trick + 1
-                trick_cards = np.full(4, -1)
-            else:
-                current_trick = self.current_node.trick
-                trick_cards = self.current_node.trick_cards.copy()
-            trick_cards[trick_position] = card
-            scores = self.current_node.scores.copy()
-
-            # a trick was finished
-            if trick_position == 3:
-                first_player = next_player[player]
-                trick_points = self.rule.calc_points(
-                    trick_cards, current_trick == 8, obs.trump)
-                winner = self.rule.calc_winner(
-                    trick_cards, first_player, obs.trump)
-                scores[winner] += trick_points
-
-            next_node = Node(f"{int(np.sum(played_cards))}.{card}", parent=self.current_node,
-                             player=player, trick=current_trick, trick_cards=trick_cards,
-                             played_cards=played_cards, own_cards=own_cards, card=card,
-                             expanded=False, scores=scores, count=0, total_payoff=0)
-            self.current_node = next_node
-
-    def simulation(self, obs):
-        payoff = 0
-        # a leaf we already calculated the payoff for
-        if self.current_node.expanded:
-            if 0 < self.current_node.total_payoff:
-                payoff = self.current_node.total_payoff / self.current_node.count
-            # a leaf need to calculate the payoff for
-            else:
-                payoff = self.__calculate_payoff(obs, self.current_node.scores)
-        else:
-            current_player = next_player[self.current_node.player]
-            trick_cards = self.current_node.trick_cards.copy()
-            own_cards = self.current_node.own_cards.copy()
-            played_cards = self.current_node.played_cards.copy()
-            unplayed_cards_others = np.ones(36)
-            unplayed_cards_others = np.subtract(unplayed_cards_others, own_cards)
-            unplayed_cards_others = np.subtract(unplayed_cards_others, played_cards)
-            simulated_scores = self.current_node.scores.copy()
-            actions_others = list()
-            for card, value in enumerate(unplayed_cards_others):
-                if value == 1:
-                    actions_others.append(card)
-
-            # play remaining tricks
-            for played_card_count in range(int(np.sum(self.current_node.played_cards)), 36):
-                current_trick = int(played_card_count / 4)
-                trick_position = played_card_count % 4
-                if current_player == obs.player_view:
-                    valid_cards = self.rule.get_valid_cards(own_cards,
-                                                            trick_cards,
-                                                            played_card_count % 4,
-                                                            obs.trump)
-                    valid_actions = list()
-                    for card, value in enumerate(valid_cards):
-                        if value == 1:
-                            valid_actions.append(card)
-                else:
-                    valid_actions = actions_others
-
-                card = np.random.choice(valid_actions)
-                trick_cards[trick_position] = card
-                played_cards[card] = 1
-                if current_player == obs.player_view:
-                    own_cards[card] = 0
-                else:
-                    unplayed_cards_others[card] = 0
-                    actions_others.remove(card)
-                if trick_position == 3:
-                    first_player = next_player[current_player]
-                    trick_points = self.rule.calc_points(
-                        trick_cards, current_trick == 8, obs.trump)
-                    winner = self.rule.calc_winner(
-                        trick_cards, first_player, obs.trump)
-                    simulated_scores[winner] += trick_points
-                    trick_cards.fill(-1)
-                    current_player = winner
-                else:
-                    current_player = next_player[current_player]
-            payoff = self.calculate_payoff(obs, simulated_scores)
-        return payoff
-
-    def best_node(self):
-        best_node = self.root.children[0]
-        for node in self.root.children:
-            if best_node.count < node.count:
-                best_node = node
-        return best_node
+
+        # end of the trick
+        trump = self.__trump
+        values = self.__card_values[trump]
+        points = values[self.__trick[0]] + values[self.__trick[1]] + values[self.__trick[2]] + \
+            values[self.__trick[3]]
+        if self.__nr_played_cards == 36:
+            points += 5
+        winner = self.__rule.calc_winner(self.__trick, self.__first_player, trump)
+        self.__points[team[winner]] += points
+        self.__trick[:] = [-1, -1, -1, -1]
+        self.__nr_cards_in_trick = 0
+        self.__first_player = winner
+        self.__player = winner
+
+
+# the search of a worker process of the parallel search
+_worker_logic = None
+
+
+def _init_worker(config: dict) -> None:
+    global _worker_logic
+    _worker_logic = MCTS_logic(**config)
+
+
+def _ready() -> bool:
+    return True
+
+
+def _search_root(obs: GameObservation, seed: int, iterations: int, deadline: float or None) -> (list, list):
+    _worker_logic.set_seed(seed)
+    _worker_logic.iterations = iterations
+    _worker_logic.init_tree(obs)
+    _worker_logic.search(deadline)
+    children = _worker_logic.tree.children(_worker_logic.root)
+    return _worker_logic.tree.card[children].tolist(), _worker_logic.tree.count[children].tolist()
+
@@ -0,0 +1,93 @@
+# HSLU
+#
+# Created by agent on 18.10.26
+#
+import logging
+
+import numpy as np
+
+from jass.agents.agent_cheating import AgentCheating
+from jass.game.const import MAX_TRUMP, card_strings, team
+from jass.game.double_dummy import DoubleDummySolver
+from jass.game.game_sim import GameSim
+from jass.game.game_state import GameState
+from jass.game.rollout import RolloutEngine
+from jass.game.rule_schieber import RuleSchieber
+
+
+class AgentCheatingDoubleDummy(AgentCheating):
+    """
+    Plays the cards with the best result for the team with perfect information. If there are at most
+    max_cards_to_solve cards left, the cards are evaluated exactly by the double dummy solver, otherwise by the
+    average points of random playouts after each card (as solving the earlier positions takes too long).
+
+    Trump is selected by the average points of random playouts for each trump, the agent does not push.
+    """
+    def __init__(self, max_cards_to_solve: int = 20, nr_playouts: int = 50, seed=None):
+        """
+        Args:
+            max_cards_to_solve: maximal number of remaining cards (in the hands of all players) to use the solver
+            nr_playouts: number of playouts for each card or trump, if the position is not solved
+            seed: seed for the random number generator of the playouts
+        """
+        self._logger = logging.getLogger(__name__)
+        self._rule = RuleSchieber()
+        self.max_cards_to_solve = max_cards_to_solve
+        self.nr_playouts = nr_playouts
+        self._solver = DoubleDummySolver()
+        self._rollout = RolloutEngine(seed)
+        self._nr_played_cards = -1
+
+    def set_seed(self, seed) -> None:
+        """
+        Set the seed of the random number generator of the playouts.
+        """
+        self._rollout.seed(seed)
+
+    def action_trump(self, state: GameState) -> int:
+        """
+        Select the trump with the most points for the team in random playouts.
+        Args:
+            state: the current game
+        Returns:
+            trump action
+        """
+        self._logger.info('Trump request')
+        own_team = team[state.player]
+        sim = GameSim(self._rule)
+        points = np.zeros(MAX_TRUMP + 1)
+        for trump in range(MAX_TRUMP + 1):
+            sim.init_from_state(state)
+            sim.action_trump(trump)
+            points[trump] = self._rollout.rollout(sim.state, self.nr_playouts)[:, own_team].mean()
+        result = int(np.argmax(points))
+        self._logger.info('Result: {}'.format(result))
+        return result
+
+    def action_play_card(self, state: GameState) -> int:
+        """
+        Select the card with the most points for the team at the end of the game.
+        Args:
+            state: the current game
+        Returns:
+            card to play
+        """
+        self._logger.info('Card request')
+        if state.nr_played_cards < self._nr_played_cards:
+            # new game, the positions of the last game will not be needed again
+            self._solver.clear()
+        self._nr_played_cards = state.nr_played_cards
+
+        if 36 - state.nr_played_cards <= self.max_cards_to_solve:
+            points = self._solver.evaluate_cards(state)
+        else:
+            points = np.full(36, -1.0)
+            own_team = team[state.player]
+            sim = GameSim(self._rule)
+            for card in np.flatnonzero(self._rule.get_valid_cards_from_state(state)):
+                sim.init_from_state(state)
+                sim.action_play_card(card)
+                points[card] = self._rollout.rollout(sim.state, self.nr_playouts)[:, own_team].mean()
+        card = int(np.argmax(points))
+        self._logger.info('Played card: {}'.format(card_strings[card]))
+        return card
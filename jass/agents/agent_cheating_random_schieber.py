@@ -24,6 +24,12 @@ class AgentCheatingRandomSchieber(AgentCheating):
         # init random number generator
         self._rng = np.random.default_rng()
 
+    def set_seed(self, seed) -> None:
+        """
+        Set the seed of the random number generator.
+        """
+        self._rng = np.random.default_rng(seed)
+
     def action_trump(self, state: GameState) -> int:
         """
         Select trump randomly. Pushing is selected with probability 0.5 if possible.
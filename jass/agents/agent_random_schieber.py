@@ -23,6 +23,12 @@ class AgentRandomSchieber(Agent):
         # init random number generator
         self._rng = np.random.default_rng()
 
+    def set_seed(self, seed) -> None:
+        """
+        Set the seed of the random number generator.
+        """
+        self._rng = np.random.default_rng(seed)
+
     def action_trump(self, obs: GameObservation) -> int:
         """
         Select trump randomly. Pushing is selected with probability 0.5 if possible.
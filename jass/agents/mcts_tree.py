@@ -0,0 +1,193 @@
+# HSLU
+#
+# Created by agent on 18.10.26
+#
+import numpy as np
+
+from jass.game.const import team
+
+
+class MCTSTree:
+    """
+    Tree for Monte Carlo tree search stored in preallocated parallel arrays, a node is an index into the arrays.
+
+    The children of a node are allocated together as one contiguous block, so a node only stores the index of its
+    first child and the number of children. A child with count 0 has not been visited yet. The nodes do not store
+    the position of the game, the position of a node is obtained by replaying the cards from the root.
+
+    Each node stores the payoff from the view of the team of the player who played the card leading to the node,
+    so that the selection of a child maximizes the payoff of the player to move.
+
+    For information set search, the children of a node are all the cards that might be played in the position, and
+    only the children that are legal in the current determinization are selected. The number of times a child was
+    available for selection is counted and used instead of the count of the parent in UCB1.
+    """
+    def __init__(self, capacity: int = 100000):
+        """
+        Args:
+            capacity: maximal number of nodes in the tree
+        """
+        self.capacity = capacity
+        self.parent = np.full(capacity, -1, dtype=np.int32)
+        self.first_child = np.full(capacity, -1, dtype=np.int32)
+        self.nr_children = np.zeros(capacity, dtype=np.int32)
+        self.card = np.full(capacity, -1, dtype=np.int8)
+        self.player = np.full(capacity, -1, dtype=np.int8)
+        self.count = np.zeros(capacity, dtype=np.float64)
+        self.total_payoff = np.zeros(capacity, dtype=np.float64)
+        self.available = np.zeros(capacity, dtype=np.float64)
+        self.nr_nodes = 0
+        self._team = np.array(team, dtype=np.int8)
+
+    def clear(self, player: int = -1) -> int:
+        """
+        Remove all nodes and add a new root node.
+
+        Args:
+            player: the player who made the last move before the position of the root
+
+        Returns:
+            the index of the root (always 0)
+        """
+        self.nr_nodes = 0
+        return self._add_nodes(-1, [-1], player)
+
+    def _add_nodes(self, parent: int, cards: list, player: int) -> int:
+        start = self.nr_nodes
+        end = start + len(cards)
+        self.parent[start:end] = parent
+        self.first_child[start:end] = -1
+        self.nr_children[start:end] = 0
+        self.card[start:end] = cards
+        self.player[start:end] = player
+        self.count[start:end] = 0
+        self.total_payoff[start:end] = 0
+        self.available[start:end] = 0
+        self.nr_nodes = end
+        return start
+
+    def expand(self, node: int, cards: list, player: int) -> bool:
+        """
+        Add the children for the cards that can be played by player in the position of the node.
+
+        Args:
+            node: the node to expand
+            cards: the cards that can be played
+            player: the player who plays the cards
+
+        Returns:
+            True if the children were added, False if the capacity of the tree is not sufficient
+        """
+        if self.nr_nodes + len(cards) > self.capacity:
+            return False
+        self.first_child[node] = self._add_nodes(node, cards, player)
+        self.nr_children[node] = len(cards)
+        return True
+
+    def is_expanded(self, node: int) -> bool:
+        return self.first_child[node] >= 0
+
+    def children(self, node: int) -> range:
+        """
+        Get the indices of the children of the node.
+        """
+        start = int(self.first_child[node])
+        return range(start, start + int(self.nr_children[node])) if start >= 0 else range(0)
+
+    def find_child(self, node: int, card: int) -> int:
+        """
+        Get the child of the node for the card, or -1 if the node has no such child.
+        """
+        children = self.children(node)
+        index = np.flatnonzero(self.card[children.start:children.stop] == card)
+        return children.start + int(index[0]) if index.size > 0 else -1
+
+    def reroot(self, node: int) -> int:
+        """
+        Make the node the new root of the tree, keeping its subtree and removing all other nodes. The nodes are
+        compacted (in breadth first order) to the start of the arrays, so that the space of the removed nodes can
+        be used again.
+
+        Args:
+            node: the new root
+
+        Returns:
+            the index of the new root (always 0)
+        """
+        # the old indices of the nodes in their new order, the children of the nodes of each level are added as
+        # blocks, so they stay contiguous
+        levels = [np.array([node], dtype=np.int32)]
+        while levels[-1].size > 0:
+            level = levels[-1]
+            level = level[self.first_child[level] >= 0]
+            starts = self.first_child[level]
+            lengths = self.nr_children[level]
+            offsets = np.cumsum(lengths) - lengths
+            levels.append((np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())).astype(np.int32))
+        old = np.concatenate(levels)
+        nr_nodes = old.size
+
+        new_index = np.full(self.nr_nodes, -1, dtype=np.int32)
+        new_index[old] = np.arange(nr_nodes, dtype=np.int32)
+        first_child = self.first_child[old]
+        parent = self.parent[old]
+        for array in (self.nr_children, self.card, self.player, self.count, self.total_payoff, self.available):
+            array[0:nr_nodes] = array[old]
+        self.first_child[0:nr_nodes] = np.where(first_child >= 0, new_index[first_child], -1)
+        self.parent[0:nr_nodes] = np.where(parent >= 0, new_index[parent], -1)
+        self.parent[0] = -1
+        self.nr_nodes = nr_nodes
+        return 0
+
+    def select_child_ucb1(self, node: int, exploration: float, legal: int = None) -> int:
+        """
+        Select a child of an expanded node, an unvisited child if there is one and otherwise the child with the
+        highest UCB1 value.
+
+        Args:
+            node: the node, which must be expanded
+            exploration: the exploration constant of UCB1
+            legal: bitboard of the cards that can be selected (for information set search), or None if all the
+                children can be selected. At least one child must be legal.
+
+        Returns:
+            the selected child
+        """
+        start = int(self.first_child[node])
+        end = start + int(self.nr_children[node])
+        if legal is None:
+            counts = self.count[start:end]
+            index = int(np.argmin(counts))
+            if counts[index] == 0:
+                return start + index
+            ucb1 = self.total_payoff[start:end] / counts + exploration * np.sqrt(np.log(self.count[node]) / counts)
+            return start + int(np.argmax(ucb1))
+
+        children = start + np.flatnonzero((legal >> self.card[start:end].astype(np.int64)) & 1)
+        self.available[children] += 1
+        counts = self.count[children]
+        index = int(np.argmin(counts))
+        if counts[index] == 0:
+            return int(children[index])
+        ucb1 = self.total_payoff[children] / counts + \
+            exploration * np.sqrt(np.log(self.available[children]) / counts)
+        return int(children[np.argmax(ucb1)])
+
+    def best_child(self, node: int) -> int:
+        """
+        Get the most visited child of an expanded node.
+        """
+        start = int(self.first_child[node])
+        return start + int(np.argmax(self.count[start:start + int(self.nr_children[node])]))
+
+    def backpropagate(self, path: list, payoff: float) -> None:
+        """
+        Update the nodes on the path with the payoff of a simulation.
+
+        Args:
+            path: the nodes from the root to the leaf of the simulation
+            payoff: the payoff of team 0 (between 0 and 1), the payoff of team 1 is 1 - payoff
+        """
+        nodes = np.array(path, dtype=np.int32)
+        self.count[nodes] += 1
+        self.total_payoff[nodes] += np.where(self._team[self.player[nodes]] == 0, payoff, 1.0 - payoff)
@@ -0,0 +1,212 @@
+# HSLU
+#
+# Created by agent on 18.10.26
+#
+"""
+Selection of trump from the hand of a player.
+
+The evaluation of a hand does not change if the colors are permuted (except that the values of the color trumps
+are permuted in the same way), so the hands are evaluated in a canonical form, in which the colors are sorted by the
+cards of the hand. The evaluations of the canonical hands are kept in a LRU cache and optionally in a file (shelve),
+so that the evaluation of a hand that was already seen only takes a lookup.
+"""
+import dbm
+import random
+import shelve
+from functools import lru_cache
+from typing import List
+
+import numpy as np
+
+from jass.game.bitboard import ALL_CARDS_BITS, cards_to_bits, bits_to_cards, card_list_to_bits, bits_to_card_list
+from jass.game.const import MAX_TRUMP, OBE_ABE, UNE_UFE, PUSH, team
+from jass.game.rollout import RolloutEngine, greedy_policy
+
+# score of the cards (by offset in the color) if the color is trump
+TRUMP_SCORE = [15, 10, 7, 25, 6, 19, 5, 5, 5]
+# score of the cards if the color is not trump
+NO_TRUMP_SCORE = [9, 7, 5, 2, 1, 0, 0, 0, 0]
+# score of the cards if obenabe is selected (all colors)
+OBENABE_SCORE = [14, 10, 8, 7, 5, 0, 5, 0, 0]
+# score of the cards if uneufe is selected (all colors)
+UNEUFE_SCORE = [0, 2, 1, 1, 5, 5, 7, 9, 11]
+# push if the score of no trump reaches the threshold
+TRUMP_THRESHOLD = 68
+
+
+def _score_table() -> np.ndarray:
+    # score of each card (columns) for each trump (rows)
+    scores = np.zeros([MAX_TRUMP + 1, 36], dtype=np.int32)
+    for trump in range(4):
+        scores[trump, :] = np.tile(NO_TRUMP_SCORE, 4)
+        scores[trump, trump * 9:trump * 9 + 9] = TRUMP_SCORE
+    scores[OBE_ABE, :] = np.tile(OBENABE_SCORE, 4)
+    scores[UNE_UFE, :] = np.tile(UNEUFE_SCORE, 4)
+    return scores
+
+
+trump_score_table = _score_table()
+
+
+def trump_scores(hands: np.ndarray) -> np.ndarray:
+    """
+    Calculate the heuristic scores of all trumps for one or more hands.
+
+    Args:
+        hands: one hot encoded hands of shape [36] or [N, 36]
+
+    Returns:
+        the scores of the trumps of shape [6] or [N, 6]
+    """
+    return hands @ trump_score_table.T
+
+
+def canonical_hand(hand: int) -> (int, List[int]):
+    """
+    Get the canonical form of a hand under permutation of the colors: the colors are sorted by the cards in them.
+
+    Args:
+        hand: bitboard of the hand
+
+    Returns:
+        the bitboard of the canonical hand and the colors of the hand in the order of the canonical colors
+    """
+    colors = sorted(range(4), key=lambda color: (hand >> (9 * color)) & 0x1FF, reverse=True)
+    canonical = 0
+    for new_color, color in enumerate(colors):
+        canonical |= ((hand >> (9 * color)) & 0x1FF) << (9 * new_color)
+    return canonical, colors
+
+
+class TrumpSelection:
+    """
+    Evaluates the hand of the forehand player for all trumps and for pushing and selects the best action.
+
+    The evaluation (by method) is either:
+        - 'score': the heuristic scores of the cards for each trump (as in Agent_rulebased), pushing has the value
+          of the threshold
+        - 'simulation': the average points of the team in games with random hands of the other players, played by
+          the greedy rollout policy. For pushing, the partner selects the trump with the heuristic score.
+    """
+    def __init__(self, method: str = 'score', nr_deals: int = 32, threshold: int = TRUMP_THRESHOLD,
+                 cache_size: int = 100000, cache_file: str = None, seed: int = 0):
+        """
+        Args:
+            method: 'score' or 'simulation'
+            nr_deals: number of random deals for each hand for the simulation
+            threshold: value of pushing for the score method
+            cache_size: maximal number of evaluations in the LRU cache
+            cache_file: file name of a shelve to store the evaluations of the simulation, or None. Copies of the
+                object made by pickling (for example in the worker processes of the arena) only read the file.
+            seed: seed for the random deals, the deals of a hand only depend on the hand and the seed
+        """
+        if method not in ('score', 'simulation'):
+            raise ValueError('Unknown method: {}'.format(method))
+        self.method = method
+        self.nr_deals = nr_deals
+        self.threshold = threshold
+        self.seed = seed
+        self.cache_size = cache_size
+        self.cache_file = cache_file
+        # number of hands that were simulated (and not found in a cache)
+        self.nr_simulations = 0
+        self._rollout = RolloutEngine(policy=greedy_policy)
+        self._shelve = shelve.open(cache_file) if cache_file is not None else None
+        self._writable = True
+        self._evaluate_canonical = lru_cache(maxsize=cache_size)(self._evaluate_canonical_hand)
+
+    def __getstate__(self):
+        # the cache and the open file can not be pickled, they are created again after unpickling
+        state = self.__dict__.copy()
+        del state['_evaluate_canonical']
+        state['_shelve'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._writable = False
+        if self.cache_file is not None and dbm.whichdb(self.cache_file):
+            # several copies must not write to the same file
+            self._shelve = shelve.open(self.cache_file, flag='r')
+        self._evaluate_canonical = lru_cache(maxsize=self.cache_size)(self._evaluate_canonical_hand)
+
+    def cache_info(self):
+        """
+        Get the statistics of the LRU cache of the evaluations (hits, misses, maxsize, currsize).
+        """
+        return self._evaluate_canonical.cache_info()
+
+    def close(self) -> None:
+        """
+        Close the file of the cache.
+        """
+        if self._shelve is not None:
+            self._shelve.close()
+            self._shelve = None
+
+    def evaluate(self, hand: np.ndarray) -> np.ndarray:
+        """
+        Evaluate the hand.
+
+        Args:
+            hand: one hot encoded hand
+
+        Returns:
+            array with the values of the trumps 0 to 5 and of pushing (at index 6)
+        """
+        canonical, colors = canonical_hand(cards_to_bits(hand))
+        canonical_values = self._evaluate_canonical(canonical)
+        values = np.array(canonical_values, dtype=np.float64)
+        values[colors] = canonical_values[0:4]
+        return values
+
+    def select(self, hand: np.ndarray, forehand: int) -> int:
+        """
+        Select the trump for a hand.
+
+        Args:
+            hand: one hot encoded hand
+            forehand: forehand of the observation or state, -1 if the player can still push
+
+        Returns:
+            the selected trump or PUSH
+        """
+        values = self.evaluate(hand)
+        if forehand != -1:
+            return int(np.argmax(values[0:MAX_TRUMP + 1]))
+        action = int(np.argmax(values))
+        return PUSH if action == MAX_TRUMP + 1 else action
+
+    def _evaluate_canonical_hand(self, hand: int) -> tuple:
+        if self.method == 'score':
+            values = trump_scores(bits_to_cards(hand)).tolist()
+            return tuple(values) + (self.threshold,)
+        key = '{}:{}:{}'.format(hand, self.nr_deals, self.seed)
+        if self._shelve is not None and key in self._shelve:
+            return self._shelve[key]
+        values = self._simulate(hand)
+        self.nr_simulations += 1
+        if self._shelve is not None and self._writable:
+            self._shelve[key] = values
+        return values
+
+    def _simulate(self, hand: int) -> tuple:
+        """
+        Play the random deals for all trumps and for pushing, the player with the hand is player 0 who leads the
+        first trick, the partner is player 2.
+        """
+        rng = random.Random(hand * 1000003 + self.seed)
+        self._rollout.rng = rng
+        other_cards = bits_to_card_list(ALL_CARDS_BITS & ~hand)
+        points = np.zeros(MAX_TRUMP + 2)
+        for _ in range(self.nr_deals):
+            rng.shuffle(other_cards)
+            hands = [hand] + [card_list_to_bits(other_cards[9 * i:9 * i + 9]) for i in range(3)]
+            partner_trump = int(np.argmax(trump_scores(bits_to_cards(hands[2]))))
+            for action in range(MAX_TRUMP + 2):
+                trump = action if action <= MAX_TRUMP else partner_trump
+                game_points = [0, 0]
+                self._rollout.playout(list(hands), [-1, -1, -1, -1], 0, 0, 0, 0, game_points, trump)
+                points[action] += game_points[team[0]]
+        return tuple((points / self.nr_deals).tolist())
+
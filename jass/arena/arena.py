@@ -3,8 +3,11 @@
 # Created by Thomas Koller on 27.07.20
 #
 import logging
+import random
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
+from statistics import NormalDist
 from typing import List, Union
 
 import numpy as np
@@ -13,6 +16,7 @@ from jass.agents.agent import Agent
 from jass.agents.agent_cheating import AgentCheating
 from jass.arena.dealing_card_random_strategy import DealingCardRandomStrategy
 from jass.arena.dealing_card_strategy import DealingCardStrategy
+from jass.arena.stopping_rule import StoppingRule, UNDECIDED, TEAM_0_BETTER, TEAM_1_BETTER
 from jass.game.const import NORTH, EAST, SOUTH, WEST, DIAMONDS, MAX_TRUMP, PUSH, next_player
 from jass.game.game_observation import GameObservation
 from jass.game.game_sim import GameSim
@@ -29,6 +33,19 @@ class Arena:
 
     The class uses some strategy and template methods patterns. Currently, this is only done for dealing cards.
 
+    In duplicate mode, each deal is played twice with the same hands and dealer, the second time with the players
+    of the teams swapped. The difference between the points of the two pairs of players on the same cards removes
+    most of the luck of the deal from the comparison (see paired_differences and duplicate_result).
+
+    With a stopping rule, the match is stopped as soon as the rule decides which team is better, the decision and the
+    number of games used for it are printed at the end (see decision and nr_games_played).
+
+    The games can be played in parallel by a pool of worker processes: the deals and dealers of all games are
+    determined first in the same order as in a sequential run, then the games are split into shards of consecutive
+    games, which are played by copies of the players in the workers. Each shard seeds the global random number
+    generators and the players (that have a method set_seed) with its own seed derived from the seed of the arena
+    (see seed_players), so the results do not depend on the number of workers or the order in which the shards are
+    played.
     """
 
     def __init__(self,
@@ -37,7 +54,13 @@ class Arena:
                  print_every_x_games: int = 5,
                  check_move_validity=True,
                  save_filename=None,
-                 cheating_mode=False):
+                 cheating_mode=False,
+                 reuse_observation=False,
+                 nr_workers: int = 0,
+                 shard_size: int = 100,
+                 seed: int = None,
+                 duplicate: bool = False,
+                 stopping_rule: StoppingRule = None):
         """
 
         Args:
@@ -47,8 +70,26 @@ class Arena:
             check_move_validity: True if moves from the agents should be checked for validity
             save_filename: True if results should be save
             cheating_mode: True if agents will receive the full game state
+            reuse_observation: True if the same observation object should be filled for every action instead of
+                creating a new one, agents must then not keep references to observations between actions
+            nr_workers: number of worker processes to play the games in parallel, or 0 to play them in this process
+            shard_size: number of consecutive games played together by a worker
+            seed: seed for the shards of the parallel games
+            duplicate: True to play each deal twice, the second time with the teams swapped (see
+                paired_differences), the number of games must be even
+            stopping_rule: rule to stop the match before all games are played, once it is decided which team is
+                better (see decision), the rule is updated with the point difference of each game, or of each deal
+                in duplicate mode
         """
+        if duplicate and nr_games_to_play % 2 != 0:
+            raise ValueError('The number of games must be even in duplicate mode: {}'.format(nr_games_to_play))
+        self._duplicate = duplicate
+        self._stopping_rule = stopping_rule
         self._cheating_mode = cheating_mode
+        self._reuse_observation = reuse_observation
+        self._nr_workers = nr_workers
+        self._shard_size = shard_size
+        self._seed = seed
         self._logger = logging.getLogger(__name__)
 
         self._nr_games_played = 0
@@ -81,12 +122,16 @@ class Arena:
         if save_filename is not None:
             self._save_games = True
             self._file_generator = LogEntryFileGenerator(basename=save_filename, max_entries=100000, shuffle=False)
+            self._save_entry = self._file_generator.add_entry
         else:
             self._save_games = False
 
         # if cheating mode agents observation corresponds to the full game state
         if self._cheating_mode:
             self.get_agent_observation = lambda: self._game.state
+        elif reuse_observation:
+            self._observation = GameObservation()
+            self.get_agent_observation = lambda: self._game.get_observation(self._observation)
         else:
             self.get_agent_observation = self._game.get_observation
 
@@ -145,6 +190,44 @@ class Arena:
     def points_team_1(self):
         return self._points_team_1
 
+    @property
+    def decision(self) -> int:
+        """
+        Decision of the stopping rule (TEAM_0_BETTER, TEAM_1_BETTER or UNDECIDED), the number of games used for the
+        decision is nr_games_played.
+        """
+        return self._stopping_rule.decision if self._stopping_rule is not None else UNDECIDED
+
+    @property
+    def paired_differences(self) -> np.ndarray:
+        """
+        The differences between the points of the players set as north and south and the points of the players set
+        as east and west for each deal played in duplicate mode, averaged over the two games of the deal.
+        """
+        nr_deals = self._nr_games_played // 2
+        first = self._points_team_0[0:2 * nr_deals:2] - self._points_team_1[0:2 * nr_deals:2]
+        second = self._points_team_1[1:2 * nr_deals:2] - self._points_team_0[1:2 * nr_deals:2]
+        return (first + second) / 2
+
+    def duplicate_result(self, confidence: float = 0.95) -> (float, float, float):
+        """
+        Get the mean of the paired differences in duplicate mode and its confidence interval (from the normal
+        approximation).
+
+        Args:
+            confidence: the confidence level of the interval
+
+        Returns:
+            the mean difference per game and the lower and upper bound of the confidence interval
+        """
+        differences = self.paired_differences
+        mean = float(differences.mean())
+        if differences.size < 2:
+            return mean, -np.inf, np.inf
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        half_width = z * float(differences.std(ddof=1)) / np.sqrt(differences.size)
+        return mean, mean - half_width, mean + half_width
+
     def get_observation(self) -> GameObservation:
         """
         Creates and returns the observation for the current player
@@ -184,26 +267,41 @@ class Arena:
         elif not self._cheating_mode and not all([issubclass(type(x), Agent) for x in self._players]):
             raise AssertionError(f"All agents must be a subclass of {Agent} in non cheating mode.")
 
-    def play_game(self, dealer: int) -> None:
+    def play_game(self, dealer: int, hands: np.ndarray = None, swap_teams: bool = False) -> None:
         """
         Play a complete game (36 cards).
+
+        Args:
+            dealer: the dealer of the game
+            hands: the hands of the players, or None to deal them with the dealing strategy
+            swap_teams: True to play the game with the teams swapped, the players of team 0 (north and south) play
+                the cards of east and west and the players of team 1 the cards of north and south
         """
+        if hands is None:
+            hands = self._dealing_card_strategy.deal_cards(game_nr=self._nr_games_played,
+                                                           total_nr_games=self._nr_games_to_play)
+        if swap_teams:
+            # rotate the players by one seat, so that each player sits in the seat of the next opponent
+            players = [self._players[next_player[seat]] for seat in range(4)]
+            player_ids = [self._player_ids[next_player[seat]] for seat in range(4)]
+        else:
+            players = self._players
+            player_ids = self._player_ids
+
         # init game
-        self._game.init_from_cards(dealer=dealer, hands=self._dealing_card_strategy.deal_cards(
-            game_nr=self._nr_games_played,
-            total_nr_games=self._nr_games_to_play))
+        self._game.init_from_cards(dealer=dealer, hands=hands)
 
         # determine trump
         # ask first player
 
-        trump_action = self._players[self._game.state.player].action_trump(self.get_agent_observation())
+        trump_action = players[self._game.state.player].action_trump(self.get_agent_observation())
         if trump_action < DIAMONDS or (trump_action > MAX_TRUMP and trump_action != PUSH):
             self._logger.error('Illegal trump (' + str(trump_action) + ') selected')
             raise RuntimeError('Illegal trump (' + str(trump_action) + ') selected')
         self._game.action_trump(trump_action)
         if trump_action == PUSH:
             # ask second player
-            trump_action = self._players[self._game.state.player].action_trump(self.get_agent_observation())
+            trump_action = players[self._game.state.player].action_trump(self.get_agent_observation())
             if trump_action < DIAMONDS or trump_action > MAX_TRUMP:
                 self._logger.error('Illegal trump (' + str(trump_action) + ') selected')
                 raise RuntimeError('Illegal trump (' + str(trump_action) + ') selected')
@@ -212,7 +310,7 @@ class Arena:
         # play cards
         for cards in range(36):
             obs = self.get_agent_observation()
-            card_action = self._players[self._game.state.player].action_play_card(obs)
+            card_action = players[self._game.state.player].action_play_card(obs)
             if self._check_moves_validity:
                 assert card_action in np.flatnonzero(self._game.rule.get_valid_actions_from_state(obs)) \
                     if self._cheating_mode else \
@@ -222,37 +320,203 @@ class Arena:
         # update results
         self._points_team_0[self._nr_games_played] = self._game.state.points[0]
         self._points_team_1[self._nr_games_played] = self._game.state.points[1]
-        self.save_game()
+        self.save_game(player_ids)
 
         self._nr_games_played += 1
 
-    def save_game(self):
+    def save_game(self, player_ids: List[int] = None):
         """
         Save the current game if enabled.
+        Args:
+            player_ids: the ids of the players in the seats of the game, or None for the ids set with the players
         Returns:
 
         """
         if self._save_games:
-            entry = GameLogEntry(game=self._game.state, date=datetime.now(), player_ids=self._player_ids)
-            self._file_generator.add_entry(entry.to_json())
+            entry = GameLogEntry(game=self._game.state, date=datetime.now(),
+                                 player_ids=player_ids if player_ids is not None else self._player_ids)
+            self._save_entry(entry.to_json())
 
     def play_all_games(self):
         """
         Play the number of games.
         """
+        if self._nr_workers > 0:
+            self._play_all_games_parallel()
+            return
         if self._save_games:
             self._file_generator.__enter__()
         dealer = NORTH
+        hands = None
         for game_id in range(self._nr_games_to_play):
-            self.play_game(dealer=dealer)
+            if not self._duplicate:
+                self.play_game(dealer=dealer)
+                dealer = next_player[dealer]
+            elif game_id % 2 == 0:
+                hands = self._dealing_card_strategy.deal_cards(game_nr=self._nr_games_played,
+                                                               total_nr_games=self._nr_games_to_play)
+                self.play_game(dealer=dealer, hands=hands)
+            else:
+                # the same deal with the teams swapped
+                self.play_game(dealer=dealer, hands=hands, swap_teams=True)
+                dealer = next_player[dealer]
             if self.nr_games_played % self._print_every_x_games == 0:
-                points_to_write = int(self.nr_games_played / self._nr_games_to_play * 40)
-                spaces_to_write = 40 - points_to_write
-                sys.stdout.write("\r[{}{}] {:4}/{:4} games played".format('.' * points_to_write,
-                                                                          ' ' * spaces_to_write,
-                                                                          self.nr_games_played,
-                                                                          self._nr_games_to_play))
-            dealer = next_player[dealer]
+                self._print_progress()
+            if self._update_stopping_rule(self._nr_games_played - 1):
+                break
         if self._save_games:
             self._file_generator.__exit__(None, None, None)
         sys.stdout.write('\n')
+        self._print_result()
+
+    def _update_stopping_rule(self, game_nr: int) -> bool:
+        """
+        Update the stopping rule with the result of a game.
+
+        Returns:
+            True if the match is decided and can be stopped
+        """
+        if self._stopping_rule is None:
+            return False
+        if not self._duplicate:
+            difference = self._points_team_0[game_nr] - self._points_team_1[game_nr]
+        elif game_nr % 2 == 1:
+            difference = (self._points_team_0[game_nr - 1] - self._points_team_1[game_nr - 1] +
+                          self._points_team_1[game_nr] - self._points_team_0[game_nr]) / 2
+        else:
+            return False
+        return self._stopping_rule.update(float(difference)) != UNDECIDED
+
+    def _print_result(self):
+        if self._duplicate and self._nr_games_played >= 2:
+            mean, lower, upper = self.duplicate_result()
+            sys.stdout.write('Difference per game: {:.2f} (95% confidence interval {:.2f} to {:.2f}) '
+                             'in {} deals\n'.format(mean, lower, upper, self._nr_games_played // 2))
+        if self._stopping_rule is not None:
+            decision = {TEAM_0_BETTER: 'team 0 is better', TEAM_1_BETTER: 'team 1 is better',
+                        UNDECIDED: 'undecided'}[self._stopping_rule.decision]
+            sys.stdout.write('Decision: {} after {} of {} games\n'.format(decision, self._nr_games_played,
+                                                                          self._nr_games_to_play))
+
+    def _print_progress(self):
+        points_to_write = int(self.nr_games_played / self._nr_games_to_play * 40)
+        spaces_to_write = 40 - points_to_write
+        sys.stdout.write("\r[{}{}] {:4}/{:4} games played".format('.' * points_to_write,
+                                                                  ' ' * spaces_to_write,
+                                                                  self.nr_games_played,
+                                                                  self._nr_games_to_play))
+
+    def _play_all_games_parallel(self):
+        """
+        Play the games in shards in the worker processes and merge the results.
+        """
+        nr_games = self._nr_games_to_play - self._nr_games_played
+        start = self._nr_games_played
+
+        # deal all games in the same order as the sequential games
+        hands = []
+        dealers = []
+        swaps = []
+        dealer = NORTH
+        for game_nr in range(start, start + nr_games):
+            if self._duplicate and game_nr % 2 == 1:
+                hands.append(hands[-1])
+                swaps.append(True)
+            else:
+                hands.append(self._dealing_card_strategy.deal_cards(game_nr=game_nr,
+                                                                    total_nr_games=self._nr_games_to_play))
+                swaps.append(False)
+            dealers.append(dealer)
+            if not self._duplicate or game_nr % 2 == 1:
+                dealer = next_player[dealer]
+
+        nr_shards = (nr_games + self._shard_size - 1) // self._shard_size
+        seeds = [int(seq.generate_state(1)[0]) for seq in np.random.SeedSequence(self._seed).spawn(nr_shards)]
+        config = dict(cheating_mode=self._cheating_mode, check_move_validity=self._check_moves_validity,
+                      reuse_observation=self._reuse_observation, save_games=self._save_games,
+                      players=self._players, player_ids=self._player_ids)
+
+        # the results of the shards are merged in the order of the games as soon as they are available, so that
+        # the stopping rule sees the games in order
+        if self._save_games:
+            self._file_generator.__enter__()
+        results = [None] * nr_shards
+        next_shard = 0
+        decided = False
+        pool = ProcessPoolExecutor(max_workers=self._nr_workers)
+        try:
+            futures = {}
+            for shard in range(nr_shards):
+                begin = shard * self._shard_size
+                end = min(begin + self._shard_size, nr_games)
+                futures[pool.submit(_play_shard, config, hands[begin:end], dealers[begin:end], swaps[begin:end],
+                                    seeds[shard])] = shard
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                while not decided and next_shard < nr_shards and results[next_shard] is not None:
+                    points_team_0, points_team_1, entries = results[next_shard]
+                    results[next_shard] = None
+                    next_shard += 1
+                    for i in range(len(points_team_0)):
+                        game_nr = self._nr_games_played
+                        self._points_team_0[game_nr] = points_team_0[i]
+                        self._points_team_1[game_nr] = points_team_1[i]
+                        if self._save_games:
+                            self._save_entry(entries[i])
+                        self._nr_games_played += 1
+                        if self._nr_games_played % self._print_every_x_games == 0:
+                            self._print_progress()
+                        decided = self._update_stopping_rule(game_nr)
+                        if decided:
+                            break
+                if decided or next_shard == nr_shards:
+                    break
+        finally:
+            # the shards that are not needed anymore (or after an error) are cancelled
+            pool.shutdown(cancel_futures=True)
+            if self._save_games:
+                self._file_generator.__exit__(None, None, None)
+        sys.stdout.write('\n')
+        self._print_result()
+
+
+def seed_players(players: List[Union[Agent, AgentCheating]], seed: int) -> None:
+    """
+    Seed the global random number generators and the players (that have a method set_seed) in a worker process.
+    Each player gets its own seed derived from the seed, so that two instances of the same agent do not play with
+    the same random numbers.
+
+    Args:
+        players: the players, the same instance can be given more than once (it then gets the seed of the last
+            occurrence)
+        seed: the seed
+    """
+    np.random.seed(seed % 2**32)
+    random.seed(seed)
+    for player, child in zip(players, np.random.SeedSequence(seed).spawn(len(players))):
+        if hasattr(player, 'set_seed'):
+            player.set_seed(int(child.generate_state(1)[0]))
+
+
+def _play_shard(config: dict, hands: List[np.ndarray], dealers: List[int], swaps: List[bool],
+                seed: int) -> (list, list, list):
+    """
+    Play the games of a shard in a worker process.
+
+    Returns:
+        the points of both teams and the entries of the saved games (if saving is enabled) for each game
+    """
+    players = config['players']
+    seed_players(players, seed)
+
+    arena = Arena(nr_games_to_play=len(hands),
+                  check_move_validity=config['check_move_validity'], cheating_mode=config['cheating_mode'],
+                  reuse_observation=config['reuse_observation'])
+    arena.set_players(*players, *config['player_ids'])
+    # the entries of the saved games are collected and written by the arena in the main process
+    entries = []
+    arena._save_games = config['save_games']
+    arena._save_entry = entries.append
+    for game_hands, dealer, swap_teams in zip(hands, dealers, swaps):
+        arena.play_game(dealer=dealer, hands=game_hands, swap_teams=swap_teams)
+    return arena.points_team_0.tolist(), arena.points_team_1.tolist(), entries
@@ -0,0 +1,59 @@
+# HSLU
+#
+# Created by agent on 18.10.26
+#
+import numpy as np
+
+from jass.arena.dealing_card_seeded_random_strategy import DealingCardSeededRandomStrategy
+from jass.arena.dealing_card_strategy import DealingCardStrategy
+from jass.game.game_util import deal_hands_from_cards
+
+
+class DealingCardFileStrategy(DealingCardStrategy):
+    """
+    Deal the cards from a fixed set of deals in a file (see save_deals), game n gets the n-th deal of the file.
+
+    The file is memory mapped, so only the deals that are played are read, and it is opened again in each worker
+    process instead of copying the deals.
+    """
+    def __init__(self, filename: str):
+        """
+        Args:
+            filename: file with the deals, written by save_deals
+        """
+        self._filename = filename
+        self._cards = None
+
+    @property
+    def nr_deals(self) -> int:
+        return self._get_cards().shape[0]
+
+    def deal_cards(self, game_nr: int = 0, total_nr_games: int = 0) -> np.ndarray:
+        cards = self._get_cards()
+        if game_nr >= cards.shape[0]:
+            raise ValueError('Game {} is not in the {} deals of {}'.format(game_nr, cards.shape[0], self._filename))
+        return deal_hands_from_cards(cards[game_nr])
+
+    def _get_cards(self) -> np.ndarray:
+        if self._cards is None:
+            self._cards = np.load(self._filename, mmap_mode='r')
+        return self._cards
+
+    def __getstate__(self):
+        # the memory mapped file is opened again after unpickling
+        state = self.__dict__.copy()
+        state['_cards'] = None
+        return state
+
+
+def save_deals(filename: str, nr_deals: int, seed: int = None) -> None:
+    """
+    Save the deals of DealingCardSeededRandomStrategy with the given seed for the first nr_deals games to a file.
+
+    Args:
+        filename: name of the file (in numpy .npy format)
+        nr_deals: number of deals
+        seed: seed of the deals
+    """
+    cards = DealingCardSeededRandomStrategy(seed).get_cards(0, nr_deals)
+    np.save(filename, cards)
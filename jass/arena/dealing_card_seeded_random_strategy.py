@@ -0,0 +1,62 @@
+# HSLU
+#
+# Created by agent on 18.10.26
+#
+import numpy as np
+
+from jass.arena.dealing_card_strategy import DealingCardStrategy
+from jass.game.game_util import deal_hands_from_cards
+
+
+class DealingCardSeededRandomStrategy(DealingCardStrategy):
+    """
+    Deal cards randomly from a seeded random number generator, so that the deals can be reproduced.
+
+    The deals are generated in batches of batch_size shuffled decks at once. The deal of a game only depends on the
+    seed and the game number (and not on the deals requested before), so the same games get the same deals in
+    every run, in every worker and in any order.
+    """
+    def __init__(self, seed: int = None, batch_size: int = 1024):
+        """
+        Args:
+            seed: seed of the deals, or None for a random seed (which is then fixed for this object)
+            batch_size: number of deals generated together
+        """
+        self._entropy = np.random.SeedSequence(seed).entropy
+        self._batch_size = batch_size
+        self._batch_nr = -1
+        self._batch = None
+
+    @property
+    def entropy(self) -> int:
+        """
+        The entropy of the seed, which can be used as seed to reproduce the deals of a strategy created without seed.
+        """
+        return self._entropy
+
+    def deal_cards(self, game_nr: int = 0, total_nr_games: int = 0) -> np.ndarray:
+        return deal_hands_from_cards(self.get_cards(game_nr, game_nr + 1)[0])
+
+    def get_cards(self, start: int, end: int) -> np.ndarray:
+        """
+        Get the shuffled decks of a range of games.
+
+        Args:
+            start: number of the first game
+            end: number after the number of the last game
+
+        Returns:
+            the permutations of the card ids as array [end - start, 36]
+        """
+        batches = [self._get_batch(batch_nr)
+                   for batch_nr in range(start // self._batch_size, (end - 1) // self._batch_size + 1)]
+        offset = start - (start // self._batch_size) * self._batch_size
+        return np.concatenate(batches)[offset:offset + end - start]
+
+    def _get_batch(self, batch_nr: int) -> np.ndarray:
+        if batch_nr != self._batch_nr:
+            rng = np.random.default_rng(np.random.SeedSequence(self._entropy, spawn_key=(batch_nr,)))
+            decks = np.tile(np.arange(36, dtype=np.int8), (self._batch_size, 1))
+            self._batch = rng.permuted(decks, axis=1)
+            self._batch_nr = batch_nr
+        return self._batch
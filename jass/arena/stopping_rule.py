@@ -0,0 +1,143 @@
+# HSLU
+#
+# Created by agent on 18.10.26
+#
+"""
+Rules to stop a match in the arena early, as soon as the observed point differences decide which team is better.
+"""
+import math
+from statistics import NormalDist
+
+# decisions of the stopping rules
+TEAM_1_BETTER = -1
+UNDECIDED = 0
+TEAM_0_BETTER = 1
+
+
+class StoppingRule:
+    """
+    Abstract base class of the stopping rules. The rule is updated with the point difference of team 0 and team 1
+    of each game (or of each deal in duplicate mode) and decides when the match can be stopped.
+    """
+    def __init__(self, min_observations: int = 10):
+        """
+        Args:
+            min_observations: number of observations before the rule can decide
+        """
+        self.min_observations = min_observations
+        self.decision = UNDECIDED
+        self.nr_observations = 0
+        self._mean = 0.0
+        self._sum_squares = 0.0
+
+    def reset(self) -> None:
+        self.decision = UNDECIDED
+        self.nr_observations = 0
+        self._mean = 0.0
+        self._sum_squares = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self._mean
+
+    @property
+    def variance(self) -> float:
+        """
+        Sample variance of the observations.
+        """
+        return self._sum_squares / (self.nr_observations - 1) if self.nr_observations > 1 else math.inf
+
+    def update(self, difference: float) -> int:
+        """
+        Add the point difference of a game.
+
+        Args:
+            difference: points of team 0 minus points of team 1
+
+        Returns:
+            the decision (TEAM_0_BETTER, TEAM_1_BETTER or UNDECIDED), once the rule has decided, the decision does
+            not change anymore
+        """
+        # update mean and variance (Welford)
+        self.nr_observations += 1
+        delta = difference - self._mean
+        self._mean += delta / self.nr_observations
+        self._sum_squares += delta * (difference - self._mean)
+        if self.decision == UNDECIDED and self.nr_observations >= self.min_observations and self.variance > 0:
+            self.decision = self._decide()
+        return self.decision
+
+    def _decide(self) -> int:
+        raise NotImplementedError
+
+
+class SPRTStoppingRule(StoppingRule):
+    """
+    Sequential probability ratio test of the hypothesis that the mean point difference is delta_0 (H0) against the
+    hypothesis that it is delta_1 (H1), with a normal distribution of the differences with the sample variance.
+
+    With the default values, H0 is that team 1 is better by 5 points per game and H1 that team 0 is better by 5
+    points per game. Accepting H1 is the decision TEAM_0_BETTER and accepting H0 the decision TEAM_1_BETTER.
+    """
+    def __init__(self, delta_0: float = -5.0, delta_1: float = 5.0, alpha: float = 0.05, beta: float = 0.05,
+                 min_observations: int = 10):
+        """
+        Args:
+            delta_0: mean difference of H0
+            delta_1: mean difference of H1, must be larger than delta_0
+            alpha: probability to accept H1 if H0 is true
+            beta: probability to accept H0 if H1 is true
+            min_observations: number of observations before the test can decide
+        """
+        super().__init__(min_observations)
+        if delta_1 <= delta_0:
+            raise ValueError('delta_1 must be larger than delta_0')
+        self.delta_0 = delta_0
+        self.delta_1 = delta_1
+        self.lower_bound = math.log(beta / (1.0 - alpha))
+        self.upper_bound = math.log((1.0 - beta) / alpha)
+
+    @property
+    def log_likelihood_ratio(self) -> float:
+        if self.nr_observations < 2:
+            return 0.0
+        return self.nr_observations * (self.delta_1 - self.delta_0) * \
+            (self._mean - (self.delta_0 + self.delta_1) / 2) / self.variance
+
+    def _decide(self) -> int:
+        llr = self.log_likelihood_ratio
+        if llr >= self.upper_bound:
+            return TEAM_0_BETTER
+        if llr <= self.lower_bound:
+            return TEAM_1_BETTER
+        return UNDECIDED
+
+
+class ConfidenceBoundStoppingRule(StoppingRule):
+    """
+    Stops as soon as the confidence interval of the mean point difference does not contain 0.
+
+    As the interval is checked after every observation, the error rate of a single interval would not hold for the
+    whole match. The error rate is split over the maximal number of checks (Bonferroni correction), so that the
+    probability of a wrong decision is at most alpha.
+    """
+    def __init__(self, alpha: float = 0.05, max_observations: int = 10000, min_observations: int = 10):
+        """
+        Args:
+            alpha: probability of deciding for a team, if the teams are equally good
+            max_observations: maximal number of observations (for the correction of the error rate)
+            min_observations: number of observations before the rule can decide
+        """
+        super().__init__(min_observations)
+        self.alpha = alpha
+        self.max_observations = max_observations
+        nr_checks = max(max_observations - min_observations + 1, 1)
+        self.z = NormalDist().inv_cdf(1.0 - alpha / (2 * nr_checks))
+
+    def _decide(self) -> int:
+        half_width = self.z * math.sqrt(self.variance / self.nr_observations)
+        if self._mean - half_width > 0:
+            return TEAM_0_BETTER
+        if self._mean + half_width < 0:
+            return TEAM_1_BETTER
+        return UNDECIDED
@@ -0,0 +1,263 @@
+# HSLU
+#
+# Created by agent on 18.10.26
+#
+import itertools
+import logging
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Union
+
+import numpy as np
+
+from jass.agents.agent import Agent
+from jass.agents.agent_cheating import AgentCheating
+from jass.arena.arena import Arena, seed_players
+from jass.arena.dealing_card_seeded_random_strategy import DealingCardSeededRandomStrategy
+from jass.game.const import NORTH, next_player
+from jass.game.game_util import deal_hands_from_cards
+
+# an agent or a (picklable) callable without arguments that creates the agent, like the class of the agent
+AgentFactory = Union[Agent, AgentCheating, Callable[[], Union[Agent, AgentCheating]]]
+
+
+class Tournament:
+    """
+    Round robin tournament between a number of agents. Each agent plays every other agent in a match, in which
+    both players of a team are the same agent. All matches are played on the same deals in duplicate mode (see
+    Arena), so the result of a match is the mean difference of the points per game on the same cards.
+
+    The matches are split into tasks of a few deals each, which are played by a pool of worker processes. Each free
+    worker takes the next task, so a match between slow agents (like MCTS) is spread over the workers instead of
+    keeping a single worker busy while the others are idle. Each task seeds the global random number generators and
+    the agents (that have a method set_seed) with seeds derived from the seed of the tournament (see seed_players),
+    so the results do not depend on the number of workers.
+
+    The agents are rated by a Bradley-Terry model of the won deals (the team with more points on the two games of
+    the deal wins, a tie counts half for each team), fitted by maximum likelihood and shown on the Elo scale. The
+    fit does not depend on the order in which the deals are finished, unlike incremental Elo updates. The standings
+    are updated after each finished task.
+    """
+
+    def __init__(self,
+                 agents: Dict[str, AgentFactory],
+                 nr_deals: int = 100,
+                 deals_per_task: int = 10,
+                 nr_workers: int = 0,
+                 seed: int = None,
+                 cheating_mode: bool = False,
+                 check_move_validity: bool = True,
+                 standings_callback: Callable[[List[tuple]], None] = None,
+                 print_standings: bool = True):
+        """
+        Args:
+            agents: the agents by name, either agents or callables to create them (which must be picklable if the
+                games are played in worker processes)
+            nr_deals: number of deals of each match, each deal is played twice with the teams swapped
+            deals_per_task: number of consecutive deals of a match played together by a worker
+            nr_workers: number of worker processes, or 0 to play the games in this process
+            seed: seed for the deals and the tasks
+            cheating_mode: True if the agents receive the full game state
+            check_move_validity: True if moves from the agents should be checked for validity
+            standings_callback: function that is called with the current standings (see standings) after each
+                finished task
+            print_standings: True to print the standings at the end of the tournament
+        """
+        if len(agents) < 2:
+            raise ValueError('A tournament needs at least 2 agents: {}'.format(len(agents)))
+        self._logger = logging.getLogger(__name__)
+        self._names = list(agents.keys())
+        self._agents = list(agents.values())
+        self._nr_deals = nr_deals
+        self._deals_per_task = deals_per_task
+        self._nr_workers = nr_workers
+        self._seed = seed
+        self._cheating_mode = cheating_mode
+        self._check_move_validity = check_move_validity
+        self._standings_callback = standings_callback
+        self._print_standings = print_standings
+
+        nr_agents = len(self._names)
+        self._pairings = list(itertools.combinations(range(nr_agents), 2))
+
+        # results: differences[i, j, deal] is the mean difference of the points per game of agent i against agent j
+        # on the deal, nan if the deal has not been played yet
+        self._differences = np.full((nr_agents, nr_agents, nr_deals), np.nan)
+
+    @property
+    def names(self) -> List[str]:
+        return self._names
+
+    @property
+    def pairings(self) -> List[tuple]:
+        return self._pairings
+
+    @property
+    def differences(self) -> np.ndarray:
+        """
+        The mean difference of the points per game of agent i against agent j for each deal, as array
+        [nr_agents, nr_agents, nr_deals], nan for the deals not played.
+        """
+        return self._differences
+
+    @property
+    def nr_deals_played(self) -> np.ndarray:
+        """
+        The number of deals played between agent i and agent j.
+        """
+        return np.count_nonzero(~np.isnan(self._differences), axis=2)
+
+    @property
+    def wins(self) -> np.ndarray:
+        """
+        The number of deals won by agent i against agent j, ties count half.
+        """
+        played = ~np.isnan(self._differences)
+        return np.sum(played & (self._differences > 0), axis=2) + \
+            0.5 * np.sum(played & (self._differences == 0), axis=2)
+
+    def ratings(self, prior_deals: float = 1.0, nr_iterations: int = 200) -> np.ndarray:
+        """
+        Fit the Bradley-Terry model to the won deals and return the ratings on the Elo scale (400 points difference
+        for a winning probability of 10:1), with a mean of 1500.
+
+        Args:
+            prior_deals: number of virtual tied deals between each pair of agents, which keeps the ratings finite
+                if an agent won or lost all its deals
+            nr_iterations: number of iterations of the fit
+
+        Returns:
+            the rating of each agent
+        """
+        nr_agents = len(self._names)
+        wins = self.wins + prior_deals / 2 * (1 - np.eye(nr_agents))
+        games = wins + wins.T
+        total_wins = wins.sum(axis=1)
+        strength = np.ones(nr_agents)
+        for _ in range(nr_iterations):
+            # minorization-maximization update
+            strength = total_wins / np.sum(games / (strength[:, np.newaxis] + strength[np.newaxis, :]), axis=1)
+            strength /= np.exp(np.mean(np.log(strength)))
+        return 1500.0 + 400.0 * np.log10(strength)
+
+    def standings(self) -> List[tuple]:
+        """
+        Get the current standings, sorted by the rating.
+
+        Returns:
+            a tuple (name, rating, number of deals played, mean difference of the points per game) for each agent
+        """
+        ratings = self.ratings()
+        nr_deals = self.nr_deals_played.sum(axis=1)
+        sums = np.nansum(self._differences, axis=(1, 2))
+        result = [(self._names[i], float(ratings[i]), int(nr_deals[i]),
+                   float(sums[i] / nr_deals[i]) if nr_deals[i] > 0 else 0.0)
+                  for i in range(len(self._names))]
+        return sorted(result, key=lambda standing: standing[1], reverse=True)
+
+    def play(self) -> List[tuple]:
+        """
+        Play all matches of the tournament.
+
+        Returns:
+            the final standings
+        """
+        deals = self._deal()
+        tasks = self._tasks()
+        seeds = [int(seq.generate_state(1)[0]) for seq in np.random.SeedSequence(self._seed).spawn(len(tasks))]
+        config = dict(cheating_mode=self._cheating_mode, check_move_validity=self._check_move_validity)
+
+        if self._nr_workers == 0:
+            for (first, second, start, end), seed in zip(tasks, seeds):
+                differences = _play_task(config, self._agents[first], self._agents[second], deals[start:end],
+                                         start, seed)
+                self._add_result(first, second, start, differences)
+        else:
+            with ProcessPoolExecutor(max_workers=self._nr_workers) as pool:
+                futures = {}
+                for (first, second, start, end), seed in zip(tasks, seeds):
+                    future = pool.submit(_play_task, config, self._agents[first], self._agents[second],
+                                         deals[start:end], start, seed)
+                    futures[future] = (first, second, start)
+                for future in as_completed(futures):
+                    first, second, start = futures[future]
+                    self._add_result(first, second, start, future.result())
+
+        standings = self.standings()
+        if self._print_standings:
+            self._print(standings)
+        return standings
+
+    def _deal(self) -> np.ndarray:
+        """
+        Deal the cards for all deals of the tournament.
+
+        Returns:
+            one hot encoded hands as array [nr_deals, 4, 36]
+        """
+        cards = DealingCardSeededRandomStrategy(self._seed).get_cards(0, self._nr_deals)
+        return deal_hands_from_cards(cards)
+
+    def _tasks(self) -> List[tuple]:
+        """
+        Split the matches into tasks.
+
+        Returns:
+            a tuple (first agent, second agent, first deal, end of the deals) for each task, the tasks of the
+            different matches are interleaved, so that the standings of all agents are updated from the start
+        """
+        tasks = []
+        for start in range(0, self._nr_deals, self._deals_per_task):
+            end = min(start + self._deals_per_task, self._nr_deals)
+            for first, second in self._pairings:
+                tasks.append((first, second, start, end))
+        return tasks
+
+    def _add_result(self, first: int, second: int, start: int, differences: List[float]) -> None:
+        end = start + len(differences)
+        self._differences[first, second, start:end] = differences
+        self._differences[second, first, start:end] = -np.asarray(differences)
+        self._logger.debug('{} against {}: deals {} to {} played'.format(self._names[first], self._names[second],
+                                                                         start, end))
+        if self._standings_callback is not None:
+            self._standings_callback(self.standings())
+
+    @staticmethod
+    def _print(standings: List[tuple]) -> None:
+        sys.stdout.write('{:>4} {:<30} {:>8} {:>8} {:>10}\n'.format('Rank', 'Agent', 'Rating', 'Deals', 'Diff/game'))
+        for rank, (name, rating, nr_deals, difference) in enumerate(standings):
+            sys.stdout.write('{:>4} {:<30} {:>8.1f} {:>8} {:>10.2f}\n'.format(rank + 1, name, rating, nr_deals,
+                                                                              difference))
+
+
+def _create_agent(agent: AgentFactory) -> Union[Agent, AgentCheating]:
+    if isinstance(agent, (Agent, AgentCheating)):
+        return agent
+    return agent()
+
+
+def _play_task(config: dict, first: AgentFactory, second: AgentFactory, deals: np.ndarray, start: int,
+               seed: int) -> List[float]:
+    """
+    Play the deals of a task in duplicate mode, the first agent plays north and south in the first game of each
+    deal.
+
+    Returns:
+        the mean difference of the points per game of the first agent against the second agent for each deal
+    """
+    first = _create_agent(first)
+    second = _create_agent(second)
+    seed_players([first, second], seed)
+
+    arena = Arena(nr_games_to_play=2 * len(deals), duplicate=True, check_move_validity=config['check_move_validity'],
+                  cheating_mode=config['cheating_mode'])
+    arena.set_players(first, second, first, second)
+    # the dealer rotates with the deals of the match
+    dealer = NORTH
+    for _ in range(start % 4):
+        dealer = next_player[dealer]
+    for hands in deals:
+        arena.play_game(dealer=dealer, hands=hands)
+        arena.play_game(dealer=dealer, hands=hands, swap_teams=True)
+        dealer = next_player[dealer]
+    return arena.paired_differences.tolist()
@@ -0,0 +1,100 @@
+# HSLU
+#
+# Created by agent on 18.10.26
+#
+"""
+Bitboard representation of card sets.
+
+A set of cards (for example a hand) is stored as a single python int, where bit i is set if card i (as defined
+in jass.game.const) is in the set. The masks for colors and trumps are precomputed as ints, so that the rules can
+be evaluated with bit operations only, without allocating any numpy arrays.
+"""
+from typing import List
+
+import numpy as np
+
+from jass.game.const import higher_trump, lower_trump, J_offset, color_offset
+
+# all 36 cards
+ALL_CARDS_BITS = (1 << 36) - 1
+
+# bit of each single card
+card_bits = [1 << card for card in range(36)]
+
+# mask of all the cards of a color
+color_masks_bits = [0x1FF << int(color_offset[color]) for color in range(4)]
+
+# mask of the trump jack of each color
+trump_jack_bits = [1 << (int(color_offset[color]) + J_offset) for color in range(4)]
+
+
+def cards_to_bits(cards: np.ndarray) -> int:
+    """
+    Convert a one-hot encoded array of cards to the bitboard representation.
+
+    Args:
+        cards: one-hot encoded array of length 36
+
+    Returns:
+        int with bit i set if card i is in the array
+    """
+    packed = np.packbits(np.asarray(cards, dtype=np.uint8), bitorder='little')
+    return int.from_bytes(packed.tobytes(), 'little')
+
+
+def bits_to_cards(bits: int) -> np.ndarray:
+    """
+    Convert the bitboard representation of cards to a one-hot encoded array.
+
+    Args:
+        bits: int with bit i set if card i is in the set
+
+    Returns:
+        one-hot encoded array of length 36
+    """
+    packed = np.frombuffer(bits.to_bytes(5, 'little'), dtype=np.uint8)
+    return np.unpackbits(packed, bitorder='little')[0:36].astype(np.int32)
+
+
+def card_list_to_bits(cards: List[int]) -> int:
+    """
+    Convert a list of int encoded cards to the bitboard representation, entries of -1 are ignored.
+    """
+    bits = 0
+    for card in cards:
+        if card != -1:
+            bits |= 1 << int(card)
+    return bits
+
+
+def bits_to_card_list(bits: int) -> List[int]:
+    """
+    Get the int encoded cards of the bitboard in increasing order.
+    """
+    cards = []
+    while bits:
+        lowest = bits & -bits
+        cards.append(lowest.bit_length() - 1)
+        bits ^= lowest
+    return cards
+
+
+def count_bits(bits: int) -> int:
+    """
+    Number of cards in the bitboard.
+    """
+    return bin(bits).count('1')
+
+
+def _mask_from_row(row: np.ndarray) -> int:
+    return card_list_to_bits(np.flatnonzero(row).tolist())
+
+
+# higher_trump_bits[card] is the mask of trumps higher than card, same as the rows of const.higher_trump
+higher_trump_bits = [_mask_from_row(higher_trump[card, :]) for card in range(36)]
+
+# lower_trump_bits[card] is the mask of trumps lower than card (including the card), same as const.lower_trump
+lower_trump_bits = [_mask_from_row(lower_trump[card, :]) for card in range(36)]
+
+# color of each card as python list (faster to index with python ints than the numpy array)
+color_of_card_list = [card // 9 for card in range(36)]
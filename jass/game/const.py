@@ -301,6 +301,22 @@ lower_trump[9:18, 9:18] = lower_trump_card
 lower_trump[18:27, 18:27] = lower_trump_card
 lower_trump[27:36, 27:36] = lower_trump_card
 
+#
+# 3D array of the strength of the cards in a trick, i.e. trick_strength[trump, color, card] is the strength of card
+# in a trick where a card of the given color was played first. The card with the highest strength wins the trick,
+# so the winner can be determined by an argmax over the strength of the 4 cards. Cards that can not win the trick
+# have a strength of 0, trumps have a higher strength than the cards of the color played.
+#
+trick_strength = np.zeros([6, 4, 36], np.int32)
+for _color in range(4):
+    # rank from 1 (lowest) to 9 (highest) of the cards in the color for obe and une
+    trick_strength[OBE_ABE, _color, _color * 9:(_color + 1) * 9] = np.arange(9, 0, -1)
+    trick_strength[UNE_UFE, _color, _color * 9:(_color + 1) * 9] = np.arange(1, 10)
+    for _trump in range(4):
+        trick_strength[_trump, _color, _color * 9:(_color + 1) * 9] = np.arange(9, 0, -1)
+        # rank of the trumps is the number of trumps not higher than the card (J, 9, A, K, Q, 10, 8, 7, 6)
+        trick_strength[_trump, _color, _trump * 9:(_trump + 1) * 9] = 10 + lower_trump_card.sum(axis=1)
+
 # next player of player with given index
 next_player = [3, 0, 1, 2]
 
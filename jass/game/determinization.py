@@ -0,0 +1,207 @@
+# HSLU
+#
+# Created by agent on 18.10.26
+#
+"""
+Sampling of the hidden cards of the other players (determinization) from an observation.
+"""
+import random
+from typing import List
+
+from jass.game.bitboard import ALL_CARDS_BITS, cards_to_bits, card_list_to_bits, bits_to_card_list, \
+    color_masks_bits, trump_jack_bits, color_of_card_list
+from jass.game.const import next_player, OBE_ABE
+from jass.game.game_observation import GameObservation
+
+
+def infer_excluded_cards(obs: GameObservation) -> List[int]:
+    """
+    Determine the cards that each player can not have in the hand from the cards played in the tricks of the
+    observation. A player that did not follow the color of the first card of a trick has no card of that color,
+    except that a player is never forced to follow with the jack of trump.
+
+    Args:
+        obs: the observation
+
+    Returns:
+        bitboards of the excluded cards for each player
+    """
+    excluded = [0, 0, 0, 0]
+    nr_tricks = obs.nr_tricks + (1 if obs.nr_cards_in_trick > 0 and obs.nr_tricks < 9 else 0)
+    for trick_nr in range(nr_tricks):
+        trick = obs.tricks[trick_nr].tolist()
+        color_played = color_of_card_list[trick[0]]
+        player = next_player[obs.trick_first_player[trick_nr]]
+        for card in trick[1:]:
+            if card == -1:
+                break
+            color = color_of_card_list[card]
+            if color != color_played:
+                if obs.trump >= OBE_ABE:
+                    excluded[player] |= color_masks_bits[color_played]
+                elif color_played == obs.trump:
+                    excluded[player] |= color_masks_bits[color_played] & ~trump_jack_bits[color_played]
+                elif color != obs.trump:
+                    # (playing a trump is always allowed, so it does not tell anything)
+                    excluded[player] |= color_masks_bits[color_played]
+            player = next_player[player]
+    return excluded
+
+
+class HandSampler:
+    """
+    Samples the hands of all players consistent with an observation: the player of the observation has the cards of
+    the observation, and the unseen cards are dealt to the other players according to the number of cards they
+    still have, such that no player gets a card of a color that the player is known not to have.
+    """
+    def __init__(self, obs: GameObservation, max_tries: int = 20):
+        """
+        Args:
+            obs: the observation
+            max_tries: number of fast tries to sample the hands, before the slower sampling that checks in each
+                step that the remaining cards can still be dealt is used
+        """
+        self.player_view = obs.player_view
+        self.max_tries = max_tries
+        self.nr_fallbacks = 0
+
+        played = card_list_to_bits(obs.tricks.flatten().tolist())
+        own = cards_to_bits(obs.hand)
+        self.unseen = ALL_CARDS_BITS & ~played & ~own
+
+        # number of cards in the hands
+        self.nr_cards = [9, 9, 9, 9]
+        for trick_nr in range(min(obs.nr_tricks + 1, 9)):
+            player = obs.trick_first_player[trick_nr]
+            for card in obs.tricks[trick_nr].tolist():
+                if card == -1:
+                    break
+                self.nr_cards[player] -= 1
+                player = next_player[player]
+
+        # possible cards for each player
+        excluded = infer_excluded_cards(obs)
+        self.possible = [self.unseen & ~excluded[player] for player in range(4)]
+        self.possible[self.player_view] = own
+
+        # the unseen cards sorted by the number of players that can have them, so that the most constrained cards
+        # are dealt first
+        cards = bits_to_card_list(self.unseen)
+        self._candidates = []
+        for card in cards:
+            players = [p for p in range(4) if p != self.player_view and (self.possible[p] >> card) & 1]
+            self._candidates.append((card, players))
+        self._candidates.sort(key=lambda entry: len(entry[1]))
+
+        # the other players and all the non-empty subsets of them as bit masks of players
+        self._others = [p for p in range(4) if p != self.player_view]
+        self._subsets = [mask for mask in range(1, 16) if not mask & (1 << self.player_view)]
+
+    def sample(self, rng: random.Random) -> List[int]:
+        """
+        Sample the hands.
+
+        Args:
+            rng: random number generator
+
+        Returns:
+            bitboards of the hands of the 4 players
+        """
+        for _ in range(self.max_tries):
+            hands = self._try_sample(rng)
+            if hands is not None:
+                return hands
+        self.nr_fallbacks += 1
+        hands = self._sample_checked(rng)
+        if hands is not None:
+            return hands
+        # the observation is not consistent with the excluded cards
+        return self._sample_without_constraints(rng)
+
+    def _try_sample(self, rng: random.Random) -> List[int] or None:
+        hands = [0, 0, 0, 0]
+        hands[self.player_view] = self.possible[self.player_view]
+        remaining = self.nr_cards.copy()
+        for card, players in self._candidates:
+            # choose a player with probability proportional to the number of cards still to deal to the player
+            total = 0
+            for player in players:
+                total += remaining[player]
+            if total == 0:
+                return None
+            pick = rng.randrange(total)
+            for player in players:
+                pick -= remaining[player]
+                if pick < 0:
+                    hands[player] |= 1 << card
+                    remaining[player] -= 1
+                    break
+        return hands
+
+    def _sample_checked(self, rng: random.Random) -> List[int] or None:
+        """
+        Sample the hands, such that after each card the remaining cards can still be dealt: for each set of
+        players, the number of cards that only these players can have must not be larger than the number of cards
+        the players still get (which is sufficient by Hall's theorem).
+        """
+        hands = [0, 0, 0, 0]
+        hands[self.player_view] = self.possible[self.player_view]
+        remaining = self.nr_cards.copy()
+        # number of cards not yet dealt for each mask of the players that can have them
+        pending = [0] * 16
+        masks = []
+        for card, players in self._candidates:
+            mask = 0
+            for player in players:
+                mask |= 1 << player
+            masks.append(mask)
+            pending[mask] += 1
+
+        for (card, players), mask in zip(self._candidates, masks):
+            pending[mask] -= 1
+            options = []
+            for player in players:
+                if remaining[player] > 0:
+                    remaining[player] -= 1
+                    if self._can_deal(pending, remaining):
+                        options.append(player)
+                    remaining[player] += 1
+            if not options:
+                return None
+            total = 0
+            for player in options:
+                total += remaining[player]
+            pick = rng.randrange(total)
+            for player in options:
+                pick -= remaining[player]
+                if pick < 0:
+                    hands[player] |= 1 << card
+                    remaining[player] -= 1
+                    break
+        return hands
+
+    def _can_deal(self, pending: List[int], remaining: List[int]) -> bool:
+        for subset in self._subsets:
+            nr_cards = 0
+            for mask in range(1, 16):
+                if pending[mask] and mask & subset == mask:
+                    nr_cards += pending[mask]
+            capacity = 0
+            for player in self._others:
+                if subset & (1 << player):
+                    capacity += remaining[player]
+            if nr_cards > capacity:
+                return False
+        return True
+
+    def _sample_without_constraints(self, rng: random.Random) -> List[int]:
+        cards = bits_to_card_list(self.unseen)
+        rng.shuffle(cards)
+        hands = [0, 0, 0, 0]
+        hands[self.player_view] = self.possible[self.player_view]
+        start = 0
+        for player in range(4):
+            if player != self.player_view:
+                hands[player] = card_list_to_bits(cards[start:start + self.nr_cards[player]])
+                start += self.nr_cards[player]
+        return hands
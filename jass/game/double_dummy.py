@@ -0,0 +1,363 @@
+# HSLU
+#
+# Created by agent on 18.10.26
+#
+"""
+Double dummy solver for Schieber: the exact result of a game with perfect information (all hands known), if all
+players play optimally for their team.
+"""
+from typing import List
+
+import numpy as np
+
+from jass.game.bitboard import cards_to_bits, bits_to_card_list, color_of_card_list
+from jass.game.const import card_values, trick_strength, team, color_offset
+from jass.game.game_state import GameState
+from jass.game.rule_schieber_bitboard import RuleSchieberBitboard
+
+# the tables as nested lists, as indexing lists with python ints is faster than indexing numpy arrays
+_card_values = card_values.tolist()
+_trick_strength = trick_strength.tolist()
+
+
+def _weaker_card_table(trump: int) -> List[int]:
+    """
+    For each card, the next weaker card of the same color (in the order used for winning tricks), or -1 for the
+    weakest card of a color.
+    """
+    weaker = [-1] * 36
+    for color in range(4):
+        cards = list(range(int(color_offset[color]), int(color_offset[color]) + 9))
+        cards.sort(key=lambda card: -_trick_strength[trump][color][card])
+        for stronger, weaker_card in zip(cards[:-1], cards[1:]):
+            weaker[stronger] = weaker_card
+    return weaker
+
+
+_weaker_card = [_weaker_card_table(trump) for trump in range(6)]
+
+
+def _stronger_cards_table(trump: int) -> List[int]:
+    """
+    For each card, the bitboard of the stronger cards of the same color.
+    """
+    stronger = [0] * 36
+    for card in range(36):
+        weaker_card = _weaker_card[trump][card]
+        while weaker_card != -1:
+            stronger[weaker_card] |= 1 << card
+            weaker_card = _weaker_card[trump][weaker_card]
+    return stronger
+
+
+_stronger_cards = [_stronger_cards_table(trump) for trump in range(6)]
+
+
+class DoubleDummySolver:
+    """
+    Alpha-beta search for the points that each team gets from the remaining cards of a game with perfect
+    information.
+
+    The search uses:
+        - a transposition table for the positions at the start of a trick, keyed on the cards of each player and
+          the player to lead. The value of these positions is the number of points from the remaining tricks,
+          which does not depend on how the position was reached.
+        - move ordering: winning the trick as cheaply as possible, giving points to the partner if the partner
+          wins the trick and otherwise playing cards with few points
+        - equivalent cards: of two cards of a player of the same color and with the same points, that are next to
+          each other in the order of the cards remaining in the game, only one is searched
+
+    The transposition table is kept between searches (for the same trump), as the values of the positions do not
+    change. The values of the positions of the last tricks can also be looked up in an endgame table.
+    """
+    def __init__(self, endgame_table=None):
+        """
+        Args:
+            endgame_table: EndgameTable with the values of positions of the last tricks, or None
+        """
+        self._valid_cards = RuleSchieberBitboard().get_valid_cards_bits
+        self.endgame_table = endgame_table
+        self._tt = {}
+        self._tt_trump = -1
+        self.nr_nodes = 0
+
+        # values for the current search
+        self._trump = -1
+        self._values = _card_values[0]
+        self._strength = _trick_strength[0]
+        self._weaker = _weaker_card[0]
+        self._stronger = _stronger_cards[0]
+
+    def clear(self) -> None:
+        """
+        Clear the transposition table.
+        """
+        self._tt.clear()
+
+    def solve(self, state: GameState) -> np.ndarray:
+        """
+        Calculate the points of the teams at the end of the game with optimal play from the state.
+
+        Args:
+            state: the state of the game after trump selection, it is not changed
+
+        Returns:
+            array with the points of team 0 and team 1
+        """
+        hands, trick, first_player = self._position_from_state(state)
+        self._set_trump(state.trump)
+        total = self._remaining_points(hands, trick)
+        team_0 = self.solve_position(hands, trick, state.nr_cards_in_trick, first_player, state.player, state.trump)
+        return np.array([state.points[0] + team_0, state.points[1] + total - team_0])
+
+    def evaluate_cards(self, state: GameState) -> np.ndarray:
+        """
+        Calculate the points that the team of the current player gets at the end of the game for each card the
+        player can play, with optimal play afterwards.
+
+        Args:
+            state: the state of the game after trump selection, it is not changed
+
+        Returns:
+            array of size 36 with the points for each valid card and -1 for the other cards
+        """
+        hands, trick, first_player = self._position_from_state(state)
+        player = state.player
+        n = state.nr_cards_in_trick
+        own_team = team[player]
+        self._set_trump(state.trump)
+        total = self._remaining_points(hands, trick)
+        result = np.full(36, -1, dtype=np.int32)
+        for card in bits_to_card_list(self._valid_cards(hands[player], trick, n, state.trump)):
+            hands[player] ^= 1 << card
+            trick[n] = card
+            if n == 3:
+                gain, winner, _ = self._end_trick(hands, trick, first_player)
+                team_0 = gain + self._solve(hands, [-1, -1, -1, -1], 0, winner, winner)
+            else:
+                team_0 = self._solve(hands, trick, n + 1, first_player, (player + 3) % 4)
+            trick[n] = -1
+            hands[player] ^= 1 << card
+            result[card] = state.points[own_team] + (team_0 if own_team == 0 else total - team_0)
+        return result
+
+    def solve_position(self, hands: List[int], trick: List[int], nr_cards_in_trick: int, first_player: int,
+                       player: int, trump: int) -> int:
+        """
+        Calculate the points that team 0 gets from the remaining cards (including the cards in the current trick)
+        with optimal play.
+
+        Args:
+            hands: bitboards of the cards of the players
+            trick: the cards of the current trick
+            nr_cards_in_trick: number of cards in the current trick
+            first_player: the first player of the current trick
+            player: the player to play the next card
+            trump: trump of the game
+
+        Returns:
+            the points of team 0
+        """
+        self._set_trump(trump)
+        return self._solve(list(hands), list(trick), nr_cards_in_trick, first_player, player)
+
+    def _solve(self, hands: List[int], trick: List[int], n: int, first_player: int, player: int) -> int:
+        """
+        Find the value by a binary search with null window searches, which cut off much more than a search with
+        the full window. The bounds found by each search are kept in the transposition table for the next ones.
+        """
+        lower = 0
+        remaining = upper = self._remaining_points(hands, trick)
+        while lower < upper:
+            test = (lower + upper + 1) // 2
+            value = self._search(hands, trick, n, first_player, player, remaining, test - 1, test)
+            if value >= test:
+                lower = value
+            else:
+                upper = value
+        return lower
+
+    @staticmethod
+    def _position_from_state(state: GameState) -> (List[int], List[int], int):
+        hands = [cards_to_bits(state.hands[player]) for player in range(4)]
+        if state.nr_played_cards == 36:
+            return hands, [-1, -1, -1, -1], -1
+        trick = state.tricks[state.nr_tricks].tolist()
+        first_player = int(state.trick_first_player[state.nr_tricks]) if state.nr_cards_in_trick > 0 \
+            else state.player
+        return hands, trick, first_player
+
+    def _remaining_points(self, hands: List[int], trick: List[int]) -> int:
+        cards = hands[0] | hands[1] | hands[2] | hands[3]
+        if cards == 0 and trick[0] == -1:
+            return 0
+        values = self._values
+        return sum(values[card] for card in bits_to_card_list(cards)) + \
+            sum(values[card] for card in trick if card != -1) + 5
+
+    def _set_trump(self, trump: int) -> None:
+        if trump != self._tt_trump:
+            self._tt.clear()
+            self._tt_trump = trump
+        self._trump = trump
+        self._values = _card_values[trump]
+        self._strength = _trick_strength[trump]
+        self._weaker = _weaker_card[trump]
+        self._stronger = _stronger_cards[trump]
+
+    def _end_trick(self, hands: List[int], trick: List[int], first_player: int) -> (int, int, int):
+        """
+        Calculate the points of team 0, the winner and the points of the completed trick.
+        """
+        strength = self._strength[color_of_card_list[trick[0]]]
+        winner = 0
+        highest = strength[trick[0]]
+        for i in range(1, 4):
+            if strength[trick[i]] > highest:
+                highest = strength[trick[i]]
+                winner = i
+        winner = (first_player - winner) % 4
+        values = self._values
+        points = values[trick[0]] + values[trick[1]] + values[trick[2]] + values[trick[3]]
+        if not (hands[0] | hands[1] | hands[2] | hands[3]):
+            points += 5
+        return (points if team[winner] == 0 else 0), winner, points
+
+    def _ordered_moves(self, hands: List[int], trick: List[int], n: int, first_player: int, player: int,
+                       first_card: int) -> List[int]:
+        """
+        Get the valid cards to search in the order in which they should be searched, without equivalent cards.
+        The first card (the best card of an earlier search of the position), if not -1, is searched first.
+        """
+        hand = hands[player]
+        valid = self._valid_cards(hand, trick, n, self._trump)
+        values = self._values
+
+        # remove the cards that are equivalent to the next weaker card
+        in_play = hands[0] | hands[1] | hands[2] | hands[3]
+        for i in range(n):
+            in_play |= 1 << trick[i]
+        weaker = self._weaker
+        cards = []
+        remaining_valid = valid
+        while remaining_valid:
+            bit = remaining_valid & -remaining_valid
+            remaining_valid ^= bit
+            card = bit.bit_length() - 1
+            weaker_card = weaker[card]
+            while weaker_card != -1 and not (in_play >> weaker_card) & 1:
+                weaker_card = weaker[weaker_card]
+            if weaker_card != -1 and (valid >> weaker_card) & 1 and values[weaker_card] == values[card]:
+                continue
+            cards.append(card)
+        if len(cards) == 1:
+            return cards
+
+        if n == 0:
+            # lead with the cards that are the highest of their color first, the cards with more points first,
+            # then the other cards with few points first
+            stronger = self._stronger
+            others = in_play & ~hand
+            cards.sort(key=lambda c: -values[c] if not stronger[c] & others else 100 + values[c])
+            if first_card in cards:
+                cards.remove(first_card)
+                cards.insert(0, first_card)
+            return cards
+
+        strength = self._strength[color_of_card_list[trick[0]]]
+        winning = 0
+        highest = strength[trick[0]]
+        for i in range(1, n):
+            if strength[trick[i]] > highest:
+                highest = strength[trick[i]]
+                winning = i
+        if team[(first_player - winning) % 4] == team[player]:
+            # partner wins the trick so far: give points
+            cards.sort(key=lambda c: -values[c])
+        else:
+            # win as cheaply as possible, otherwise give as few points as possible
+            cards.sort(key=lambda c: (0, values[c]) if strength[c] > highest else (1, values[c]))
+        return cards
+
+    def _search(self, hands: List[int], trick: List[int], n: int, first_player: int, player: int, remaining: int,
+                alpha: int, beta: int) -> int:
+        """
+        Alpha-beta search, team 0 maximizes and team 1 minimizes the points of team 0 from the remaining cards.
+        The remaining points (of the cards in the hands and in the trick and for the last trick) bound the value.
+        """
+        self.nr_nodes += 1
+        if remaining <= alpha:
+            return remaining
+        if beta <= 0:
+            return 0
+        key = None
+        tt_card = -1
+        if n == 0:
+            if not remaining:
+                return 0
+            if hands[player] & (hands[player] - 1) == 0:
+                # last trick, the cards are forced
+                for i in range(4):
+                    trick[i] = hands[(player - i) % 4].bit_length() - 1
+                gain, _, _ = self._end_trick([0, 0, 0, 0], trick, player)
+                return gain
+            table = self.endgame_table
+            if table is not None and bin(hands[player]).count('1') <= table.nr_tricks:
+                value = table.lookup(hands, player, self._trump)
+                if value >= 0:
+                    return value
+            key = (hands[0], hands[1], hands[2], hands[3], player)
+            entry = self._tt.get(key)
+            if entry is not None:
+                lower, upper, tt_card = entry
+                if lower >= beta or lower == upper:
+                    return lower
+                if upper <= alpha:
+                    return upper
+                alpha = max(alpha, lower)
+                beta = min(beta, upper)
+        alpha_start = alpha
+        beta_start = beta
+        best_card = -1
+
+        maximize = team[player] == 0
+        best = -1 if maximize else 158
+        next_to_play = (player + 3) % 4
+        for card in self._ordered_moves(hands, trick, n, first_player, player, tt_card):
+            bit = 1 << card
+            hands[player] ^= bit
+            trick[n] = card
+            if n == 3:
+                gain, winner, points = self._end_trick(hands, trick, first_player)
+                value = gain + self._search(hands, [-1, -1, -1, -1], 0, winner, winner, remaining - points,
+                                            alpha - gain, beta - gain)
+            else:
+                value = self._search(hands, trick, n + 1, first_player, next_to_play, remaining, alpha, beta)
+            trick[n] = -1
+            hands[player] ^= bit
+
+            if maximize:
+                if value > best:
+                    best = value
+                    best_card = card
+                    if best > alpha:
+                        alpha = best
+            else:
+                if value < best:
+                    best = value
+                    best_card = card
+                    if best < beta:
+                        beta = best
+            if alpha >= beta:
+                break
+
+        if key is not None:
+            lower, upper, _ = self._tt.get(key, (0, 157, -1))
+            if best <= alpha_start:
+                upper = min(upper, best)
+            elif best >= beta_start:
+                lower = max(lower, best)
+            else:
+                lower = upper = best
+            self._tt[key] = (lower, upper, best_card)
+        return best
@@ -0,0 +1,267 @@
+# HSLU
+#
+# Created by agent on 18.10.26
+#
+"""
+Table of the exact results of the last tricks of a game, stored in a file that is used as a memory mapped hash
+table, so that all the processes that open the file share the same pages.
+
+A position at the start of one of the last nr_tricks tricks is stored in a canonical form:
+    - the hands are rotated, so that the player to lead is player 0 and the other players play in the same order
+      as in the game (player 3, then player 2 and player 1)
+    - the colors are permuted: for a color trump the trump color becomes diamonds, the other colors (and all colors
+      for obe abe or une ufe) are sorted by the cards the players have in them
+The positions that are equal by these symmetries have the same entry. The value of an entry is the number of points
+that the team of the player to lead gets from the remaining tricks with perfect information (see DoubleDummySolver).
+
+The number of possible positions is much too large to precompute all of them, so the table is filled lazily with
+the positions that are looked up (or with the positions of random games by the command line program) and only
+contains some of them. Lookups of missing positions return -1.
+
+The table can be built with:
+    python -m jass.game.endgame_table --file endgame.bin --nr_tricks 3 --nr_games 10000
+"""
+import argparse
+import os
+from typing import List
+
+import numpy as np
+
+from jass.game.bitboard import cards_to_bits, bits_to_card_list
+from jass.game.const import team, card_values, DIAMONDS, OBE_ABE, UNE_UFE, MAX_TRUMP
+from jass.game.double_dummy import DoubleDummySolver
+from jass.game.game_sim import GameSim
+from jass.game.game_util import deal_random_hand
+from jass.game.rule_schieber import RuleSchieber
+
+_MAGIC = b'JASSEGT1'
+_HEADER_SIZE = 64
+_HEADER_DTYPE = np.dtype([('magic', 'S8'), ('nr_tricks', '<i8'), ('capacity', '<i8')])
+
+# an entry has the 4 hands of the canonical position, the kind of trump (0: color, 1: obe abe, 2: une ufe) and the
+# value, which is -1 for an empty entry
+ENTRY_DTYPE = np.dtype([('hands', '<u8', (4,)), ('kind', 'i1'), ('value', '<i2')])
+
+_MAX_PROBES = 16
+_COLOR_MASK = 0x1FF
+_MIX = 0x9E3779B97F4A7C15
+_MASK_64 = (1 << 64) - 1
+
+_card_values = card_values.tolist()
+
+
+def canonical_position(hands: List[int], player: int, trump: int) -> (int, List[int]):
+    """
+    Get the canonical form of a position at the start of a trick.
+
+    Args:
+        hands: bitboards of the cards of the players
+        player: the player to lead
+        trump: trump of the game
+
+    Returns:
+        the kind of trump (0: color trump, 1: obe abe, 2: une ufe) and the hands of the canonical position, the
+        canonical position is played with trump DIAMONDS for a color trump
+    """
+    # the player to lead gets seat 0 and the k-th player after the leader gets the seat that plays k-th after seat 0
+    rotated = [hands[player], hands[(player + 1) % 4], hands[(player + 2) % 4], hands[(player + 3) % 4]]
+    if trump < OBE_ABE:
+        kind = 0
+        colors = [color for color in range(4) if color != trump]
+    else:
+        kind = 1 if trump == OBE_ABE else 2
+        colors = [0, 1, 2, 3]
+    colors.sort(key=lambda color: tuple((hand >> (9 * color)) & _COLOR_MASK for hand in rotated), reverse=True)
+    if kind == 0:
+        colors.insert(0, trump)
+    canonical = [0, 0, 0, 0]
+    for new_color, color in enumerate(colors):
+        shift = 9 * color
+        new_shift = 9 * new_color
+        for i in range(4):
+            canonical[i] |= ((rotated[i] >> shift) & _COLOR_MASK) << new_shift
+    return kind, canonical
+
+
+def _trump_of_kind(kind: int) -> int:
+    return DIAMONDS if kind == 0 else (OBE_ABE if kind == 1 else UNE_UFE)
+
+
+class EndgameTable:
+    """
+    Memory mapped hash table of the values of endgame positions (with open addressing and linear probing).
+
+    The file is opened read only by default, which is sufficient for lookups and allows many processes to use the
+    same file. Entries can only be added if the file is opened with mode 'r+', and only one process should write
+    to the file at a time.
+    """
+    def __init__(self, filename: str, mode: str = 'r'):
+        """
+        Args:
+            filename: the file of the table (see create)
+            mode: 'r' to open the table read only, 'r+' to add entries
+        """
+        header = np.fromfile(filename, dtype=_HEADER_DTYPE, count=1)
+        if header.size == 0 or header['magic'][0] != _MAGIC:
+            raise ValueError('Not an endgame table file: {}'.format(filename))
+        self.filename = filename
+        self.nr_tricks = int(header['nr_tricks'][0])
+        self.nr_cards = 4 * self.nr_tricks
+        self.capacity = int(header['capacity'][0])
+        self.writable = mode == 'r+'
+        self._entries = np.memmap(filename, dtype=ENTRY_DTYPE, mode=mode, offset=_HEADER_SIZE,
+                                  shape=(self.capacity,))
+        self._hands = self._entries['hands']
+        self._kind = self._entries['kind']
+        self._value = self._entries['value']
+        self._solver = None
+
+    @classmethod
+    def create(cls, filename: str, nr_tricks: int = 3, capacity: int = 1 << 20) -> 'EndgameTable':
+        """
+        Create a new empty table file and open it for writing.
+
+        Args:
+            filename: the file to create
+            nr_tricks: number of tricks at the end of the game for which positions are stored
+            capacity: number of entries of the table, rounded up to a power of 2
+
+        Returns:
+            the table
+        """
+        capacity = 1 << max(capacity - 1, 1).bit_length()
+        header = np.zeros(1, dtype=_HEADER_DTYPE)
+        header['magic'] = _MAGIC
+        header['nr_tricks'] = nr_tricks
+        header['capacity'] = capacity
+        with open(filename, 'wb') as file:
+            file.write(header.tobytes().ljust(_HEADER_SIZE, b'\0'))
+        entries = np.memmap(filename, dtype=ENTRY_DTYPE, mode='r+', offset=_HEADER_SIZE, shape=(capacity,))
+        entries['value'] = -1
+        entries.flush()
+        del entries
+        return cls(filename, mode='r+')
+
+    def flush(self) -> None:
+        if self.writable:
+            self._entries.flush()
+
+    @property
+    def nr_entries(self) -> int:
+        return int(np.count_nonzero(self._value >= 0))
+
+    def lookup(self, hands: List[int], player: int, trump: int) -> int:
+        """
+        Get the value of a position at the start of a trick.
+
+        Args:
+            hands: bitboards of the cards of the players
+            player: the player to lead
+            trump: trump of the game
+
+        Returns:
+            the points of team 0 from the remaining tricks, or -1 if the position is not in the table
+        """
+        kind, canonical = canonical_position(hands, player, trump)
+        value = self._find(kind, canonical)[1]
+        if value < 0:
+            return -1
+        return value if team[player] == 0 else self._total_points(canonical, kind) - value
+
+    def value(self, hands: List[int], player: int, trump: int) -> int:
+        """
+        Get the value of a position at the start of a trick, the position is solved if it is not in the table and
+        added to the table (if it is writable).
+
+        Args:
+            hands: bitboards of the cards of the players
+            player: the player to lead
+            trump: trump of the game
+
+        Returns:
+            the points of team 0 from the remaining tricks
+        """
+        kind, canonical = canonical_position(hands, player, trump)
+        index, value = self._find(kind, canonical)
+        if value < 0:
+            if self._solver is None:
+                self._solver = DoubleDummySolver()
+            # the player to lead is player 0 (of team 0) in the canonical position
+            value = self._solver.solve_position(canonical, [-1, -1, -1, -1], 0, 0, 0, _trump_of_kind(kind))
+            if self.writable and index >= 0:
+                self._hands[index] = canonical
+                self._kind[index] = kind
+                self._value[index] = value
+        return value if team[player] == 0 else self._total_points(canonical, kind) - value
+
+    def _find(self, kind: int, canonical: List[int]) -> (int, int):
+        """
+        Find the entry of the position.
+
+        Returns:
+            the index and value of the entry, or the index of the empty entry for the position and -1 if the
+            position is not in the table (the index is -1 if there is no empty entry)
+        """
+        h = kind
+        for hand in canonical:
+            h = ((h ^ hand) * _MIX) & _MASK_64
+        index = (h >> 20) & (self.capacity - 1)
+        for _ in range(_MAX_PROBES):
+            value = int(self._value[index])
+            if value < 0:
+                return index, -1
+            if self._kind[index] == kind and self._hands[index].tolist() == canonical:
+                return index, value
+            index = (index + 1) & (self.capacity - 1)
+        return -1, -1
+
+    @staticmethod
+    def _total_points(canonical: List[int], kind: int) -> int:
+        values = _card_values[_trump_of_kind(kind)]
+        return sum(values[card] for card in bits_to_card_list(canonical[0] | canonical[1] | canonical[2] |
+                                                               canonical[3])) + 5
+
+
+def fill_from_random_games(table: EndgameTable, nr_games: int, seed: int = None) -> None:
+    """
+    Add the positions at the start of each of the last tricks of random games to the table.
+
+    Args:
+        table: the table, opened for writing
+        nr_games: number of games
+        seed: seed for the random numbers
+    """
+    rng = np.random.default_rng(seed)
+    np.random.seed(rng.integers(1 << 31))
+    rule = RuleSchieber()
+    game = GameSim(rule=rule)
+    for _ in range(nr_games):
+        game.init_from_cards(hands=deal_random_hand(), dealer=int(rng.integers(4)))
+        game.action_trump(int(rng.integers(MAX_TRUMP + 1)))
+        while not game.is_done():
+            state = game.state
+            if state.nr_cards_in_trick == 0 and state.nr_played_cards >= 36 - table.nr_cards:
+                table.value([cards_to_bits(hand) for hand in state.hands], state.player, state.trump)
+            game.action_play_card(int(rng.choice(np.flatnonzero(rule.get_valid_cards_from_state(state)))))
+    table.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a table of endgame positions from random games')
+    parser.add_argument('--file', type=str, required=True, help='The file of the table')
+    parser.add_argument('--nr_tricks', type=int, default=3, help='Number of tricks at the end of the games')
+    parser.add_argument('--capacity', type=int, default=1 << 20, help='Number of entries of a new table')
+    parser.add_argument('--nr_games', type=int, default=10000, help='Number of random games to add')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for random number generator')
+    arg = parser.parse_args()
+
+    if os.path.exists(arg.file):
+        table = EndgameTable(arg.file, mode='r+')
+    else:
+        table = EndgameTable.create(arg.file, nr_tricks=arg.nr_tricks, capacity=arg.capacity)
+    fill_from_random_games(table, arg.nr_games, arg.seed)
+    print('Entries: {} of {}'.format(table.nr_entries, table.capacity))
+
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,7 @@ import numpy as np
 from jass.game.const import JASS_SCHIEBER, next_player, partner_player, card_ids
 from jass.game.game_util import convert_int_encoded_cards_to_str_encoded, \
     convert_one_hot_encoded_cards_to_str_encoded_list, convert_str_encoded_cards_to_int_encoded
+from jass.game.zobrist import hash_observation
 
 
 class GameObservation:
@@ -99,6 +100,13 @@ class GameObservation:
 
         self.points = np.zeros(shape=2, dtype=np.int32)
 
+    @property
+    def hash(self) -> int:
+        """
+        Zobrist hash of the observation (see jass.game.zobrist), it is calculated on each access.
+        """
+        return hash_observation(self)
+
     # noinspection PyUnresolvedReferences
     def __eq__(self, other: 'GameObservation') -> bool:
         if self.nr_played_cards == 36:
@@ -36,6 +36,28 @@ class GameRule:
         """
         raise NotImplementedError()
 
+    def get_valid_cards_batch(self, hands: np.ndarray,
+                              tricks: np.ndarray,
+                              move_nr: np.ndarray,
+                              trump: np.ndarray) -> np.ndarray:
+        """
+        Get the valid cards for a batch of N positions. The default implementation calls get_valid_cards for each
+        entry, subclasses can override it with a vectorized version.
+
+        Args:
+            hands: one-hot encoded array of shape [N, 36] of the hands of the players to move
+            tricks: array of shape [N, 4] with the cards of the current tricks (-1 for cards not played yet)
+            move_nr: array of shape [N] with the move to make in the current trick
+            trump: array of shape [N] with the trump of each position
+
+        Returns:
+            one-hot encoded array of shape [N, 36] of the valid moves
+        """
+        valid = np.zeros(hands.shape, dtype=np.int32)
+        for i in range(hands.shape[0]):
+            valid[i] = self.get_valid_cards(hands[i], tricks[i], int(move_nr[i]), int(trump[i]))
+        return valid
+
     def get_valid_cards_from_state(self, state: GameState):
         """
         Get the valid cards from the state for the current player.
@@ -136,6 +158,38 @@ class GameRule:
         """
         raise NotImplementedError
 
+    def calc_points_batch(self, tricks: np.ndarray, is_last: np.ndarray or bool, trump: np.ndarray) -> np.ndarray:
+        """
+        Calculate the points of a batch of N tricks. The default implementation calls calc_points for each trick.
+
+        Args:
+            tricks: array of shape [N, 4] of completed tricks
+            is_last: array of shape [N] (or a single bool) that is true for the last trick of a game
+            trump: array of shape [N] with the trump for each trick
+
+        Returns:
+            array of shape [N] with the points of each trick
+        """
+        is_last = np.broadcast_to(is_last, (tricks.shape[0],))
+        return np.array([self.calc_points(tricks[i], bool(is_last[i]), int(trump[i]))
+                         for i in range(tricks.shape[0])], dtype=np.int32)
+
+    def calc_winner_batch(self, tricks: np.ndarray, first_player: np.ndarray, trump: np.ndarray) -> np.ndarray:
+        """
+        Calculate the winners of a batch of N completed tricks. The default implementation calls calc_winner for
+        each trick.
+
+        Args:
+            tricks: array of shape [N, 4] of completed tricks
+            first_player: array of shape [N] with the first player of each trick
+            trump: array of shape [N] with the trump for each trick
+
+        Returns:
+            array of shape [N] with the player who won each trick
+        """
+        return np.array([self.calc_winner(tricks[i], int(first_player[i]), int(trump[i]))
+                         for i in range(tricks.shape[0])], dtype=np.int32)
+
     def assert_invariants(self, state: GameState) -> None:
         """
         Validates the internal consistency of the state according to the rules and throws an assertion exception if an
@@ -5,14 +5,15 @@
 
 # Simulator for a game
 
-import copy
 import numpy as np
 
-from jass.game.game_util import full_to_trump
+from jass.game.game_util import full_to_trump, trump_to_full
 from jass.game.const import next_player, PUSH, partner_player, NORTH, SOUTH, TRUMP_FULL_OFFSET
 from jass.game.game_rule import GameRule
 from jass.game.game_state import GameState
-from jass.game.game_state_util import observation_from_state
+from jass.game.game_observation import GameObservation
+from jass.game.game_state_util import observation_from_state, observation_view_from_state
+from jass.game.zobrist import hand_keys, trick_keys, played_keys, trump_keys, player_keys
 
 
 class GameSim:
@@ -27,21 +28,28 @@ class GameSim:
         self._state = GameState()
         self._rule = rule
 
+        # stack of the performed actions with the values needed to undo them, each entry is a tuple starting
+        # with the action (as full action)
+        self._moves = []
+
     def init_from_state(self, state: GameState):
-        self._state = copy.deepcopy(state)
+        self._state = state.copy()
+        self._moves.clear()
 
     def init_from_cards(self, hands: np.array, dealer: int):
+        self._moves.clear()
+        self._state.hash = None
         self._state.dealer = dealer
         self._state.player = next_player[dealer]
         self._state.trump = -1
         self._state.forehand = -1
-        self._state.hands = hands.copy()
+        self._state.hands[:, :] = hands
         self._state.tricks.fill(-1)
         self._state.trick_winner.fill(-1)
         self._state.trick_points.fill(0)
         self._state.trick_first_player.fill(-1)
-        self._state.current_trick = self._state.tricks[0, :]
         self._state.nr_tricks = 0
+        self._state.current_trick = self._state.tricks[0, :]
         self._state.nr_cards_in_trick = 0
         self._state.nr_played_cards = 0
         self._state.points[0] = 0
@@ -55,16 +63,45 @@ class GameSim:
     def state(self):
         return self._state
 
-    def get_observation(self):
+    def get_observation(self, obs: GameObservation = None) -> GameObservation:
         """
         Get the observation for the current player in the current state of the game.
 
+        Args:
+            obs: observation to fill in place (for example to reuse the same object for all moves), or None to
+                create a new observation
+
+        Returns:
+            The observation for the current player.
+        """
+        return observation_from_state(self._state, obs=obs)
+
+    def get_observation_view(self) -> GameObservation:
+        """
+        Get the observation for the current player as read-only views onto the state, without copying any arrays.
+        The observation is only valid until the next action.
+
         Returns:
             The observation for the current player.
         """
-        return observation_from_state(self._state)
+        return observation_view_from_state(self._state)
+
+    @property
+    def nr_moves(self):
+        """
+        Number of actions that have been performed since initialization and can be undone.
+        """
+        return len(self._moves)
 
     def action_trump(self, action: int) -> None:
+        if self._state.forehand == 1:
+            raise ValueError('Unexpected value {} for forehand in action_trump'.format(self._state.forehand))
+
+        h = self._state.hash
+        self._moves.append((trump_to_full(action), self._state.player, self._state.forehand, self._state.trump,
+                            self._state.declared_trump, self._state.trick_first_player[0], h))
+        h ^= trump_keys[self._state.trump + 1] ^ player_keys[self._state.player + 1]
+
         if self._state.forehand == -1:
             # this is the action of the forehand player
             if action == PUSH:
@@ -82,8 +119,8 @@ class GameSim:
             self._state.declared_trump = self._state.player
             self._state.player = next_player[self._state.dealer]
             self._state.trick_first_player[0] = self._state.player
-        else:
-            raise ValueError('Unexpected value {} for forehand in action_trump'.format(self._state.forehand))
+
+        self._state.hash = h ^ trump_keys[self._state.trump + 1] ^ player_keys[self._state.player + 1]
 
     def action_play_card(self, card: int) -> None:
         """
@@ -100,6 +137,15 @@ class GameSim:
         Args:
             card: The card to play
         """
+        nr_tricks = self._state.nr_tricks
+        player = self._state.player
+        h = self._state.hash
+        self._moves.append((card, player, self._state.trick_first_player[nr_tricks],
+                            self._state.trick_first_player[nr_tricks + 1] if nr_tricks < 8 else -1, h))
+
+        # update the hash for the card moved from the hand to the trick
+        h ^= hand_keys[player][card] ^ trick_keys[self._state.nr_cards_in_trick][card] ^ player_keys[player + 1]
+
         # remove card from player
         self._state.hands[self._state.player, card] = 0
 
@@ -118,6 +164,11 @@ class GameSim:
         else:
             # finish current trick
             self._end_trick()
+            # the cards of the trick are now played cards
+            for position, card_in_trick in enumerate(self._state.tricks[nr_tricks, :].tolist()):
+                h ^= trick_keys[position][card_in_trick] ^ played_keys[card_in_trick]
+
+        self._state.hash = h ^ player_keys[self._state.player + 1]
 
     def action(self, action: int):
         """
@@ -131,6 +182,57 @@ class GameSim:
             trump_action = full_to_trump(action)
             self.action_trump(trump_action)
 
+    def undo_action(self) -> None:
+        """
+        Undo the last action (card or trump), so that the state is exactly the same as before the action. This
+        allows search algorithms to make and unmake moves on one simulator instead of copying the state.
+        """
+        if not self._moves:
+            raise ValueError('No action to undo')
+        move = self._moves.pop()
+        if move[0] < TRUMP_FULL_OFFSET:
+            self._undo_play_card(*move)
+        else:
+            _, self._state.player, self._state.forehand, self._state.trump, self._state.declared_trump, \
+                self._state.trick_first_player[0], self._state.hash = move
+
+    def _undo_play_card(self, card: int, player: int, first_player: int, next_first_player: int, h: int) -> None:
+        """
+        Undo playing a card.
+
+        Args:
+            card: the card that was played
+            player: the player who played the card
+            first_player: the value of trick_first_player for the trick before the card was played
+            next_first_player: the value of trick_first_player for the next trick before the card was played
+            h: the hash of the state before the card was played
+        """
+        state = self._state
+        if state.nr_cards_in_trick == 0:
+            # the card completed the trick, so revert the end of the trick
+            state.nr_tricks -= 1
+            nr_trick = state.nr_tricks
+            if state.trick_winner[nr_trick] == NORTH or state.trick_winner[nr_trick] == SOUTH:
+                state.points[0] -= state.trick_points[nr_trick]
+            else:
+                state.points[1] -= state.trick_points[nr_trick]
+            state.trick_winner[nr_trick] = -1
+            state.trick_points[nr_trick] = 0
+            if nr_trick < 8:
+                state.trick_first_player[nr_trick + 1] = next_first_player
+            state.current_trick = state.tricks[nr_trick, :]
+            state.nr_cards_in_trick = 3
+        else:
+            state.nr_cards_in_trick -= 1
+
+        state.current_trick[state.nr_cards_in_trick] = -1
+        if state.nr_cards_in_trick == 0:
+            state.trick_first_player[state.nr_tricks] = first_player
+        state.hands[player, card] = 1
+        state.player = player
+        state.nr_played_cards -= 1
+        state.hash = h
+
     def is_done(self):
         """
         Return true if the game is finished.
@@ -0,0 +1,273 @@
+# HSLU
+#
+# Created by agent on 18.10.26
+#
+
+# Simulator for a batch of games
+
+import numpy as np
+
+from jass.game.const import next_player, partner_player, PUSH, team
+from jass.game.game_observation import GameObservation
+from jass.game.game_rule import GameRule
+from jass.game.game_state import GameState
+from jass.game.game_state_util import observation_from_state
+
+# as arrays, in order to index them with arrays of players
+_next_player = np.array(next_player, dtype=np.int32)
+_partner_player = np.array(partner_player, dtype=np.int32)
+
+
+class GameSimBatch:
+    """
+    Class for simulating N games at the same time. The games are stored as structure of arrays, i.e. each field of
+    GameState is an array with an additional first dimension of size N (for example hands[N, 4, 36] and
+    tricks[N, 9, 4]). The actions are given for all the games at once and are applied using array operations,
+    with the rules evaluated by the batch methods of the rule class.
+
+    The fields are public (as in GameState), GameState or GameObservation objects for a single game can be
+    extracted with get_state and get_observation.
+    """
+    def __init__(self, rule: GameRule, nr_games: int):
+        self._rule = rule
+        self._nr_games = nr_games
+        self._rows = np.arange(nr_games)
+
+        self.dealer = np.full(nr_games, -1, dtype=np.int32)
+        self.player = np.full(nr_games, -1, dtype=np.int32)
+        self.trump = np.full(nr_games, -1, dtype=np.int32)
+        self.forehand = np.full(nr_games, -1, dtype=np.int32)
+        self.declared_trump = np.full(nr_games, -1, dtype=np.int32)
+
+        self.hands = np.zeros(shape=[nr_games, 4, 36], dtype=np.int32)
+        self.tricks = np.full(shape=[nr_games, 9, 4], fill_value=-1, dtype=np.int32)
+        self.trick_winner = np.full(shape=[nr_games, 9], fill_value=-1, dtype=np.int32)
+        self.trick_points = np.zeros(shape=[nr_games, 9], dtype=np.int32)
+        self.trick_first_player = np.full(shape=[nr_games, 9], fill_value=-1, dtype=np.int32)
+
+        self.nr_tricks = np.zeros(nr_games, dtype=np.int32)
+        self.nr_cards_in_trick = np.zeros(nr_games, dtype=np.int32)
+        self.nr_played_cards = np.zeros(nr_games, dtype=np.int32)
+
+        self.points = np.zeros(shape=[nr_games, 2], dtype=np.int32)
+
+    @property
+    def rule(self):
+        return self._rule
+
+    @property
+    def nr_games(self):
+        return self._nr_games
+
+    def init_from_cards(self, hands: np.ndarray, dealer: np.ndarray or int) -> None:
+        """
+        Initialize all the games from the dealt cards.
+
+        Args:
+            hands: one-hot encoded array of shape [N, 4, 36] with the hands of the games
+            dealer: the dealer for each game (or the same dealer for all games)
+        """
+        self.dealer[:] = dealer
+        self.player[:] = _next_player[self.dealer]
+        self.trump.fill(-1)
+        self.forehand.fill(-1)
+        self.declared_trump.fill(-1)
+        self.hands[:, :, :] = hands
+        self.tricks.fill(-1)
+        self.trick_winner.fill(-1)
+        self.trick_points.fill(0)
+        self.trick_first_player.fill(-1)
+        self.nr_tricks.fill(0)
+        self.nr_cards_in_trick.fill(0)
+        self.nr_played_cards.fill(0)
+        self.points.fill(0)
+
+    def init_from_state(self, state: GameState) -> None:
+        """
+        Initialize all the games as copies of the same state.
+        """
+        self.dealer[:] = state.dealer
+        self.player[:] = state.player
+        self.trump[:] = state.trump
+        self.forehand[:] = state.forehand
+        self.declared_trump[:] = state.declared_trump
+        self.hands[:] = state.hands
+        self.tricks[:] = state.tricks
+        self.trick_winner[:] = state.trick_winner
+        self.trick_points[:] = state.trick_points
+        self.trick_first_player[:] = state.trick_first_player
+        self.nr_tricks[:] = state.nr_tricks
+        self.nr_cards_in_trick[:] = state.nr_cards_in_trick
+        self.nr_played_cards[:] = state.nr_played_cards
+        self.points[:] = state.points
+
+    def set_state(self, i: int, state: GameState) -> None:
+        """
+        Set the game with index i from a state.
+        """
+        self.dealer[i] = state.dealer
+        self.player[i] = state.player
+        self.trump[i] = state.trump
+        self.forehand[i] = state.forehand
+        self.declared_trump[i] = state.declared_trump
+        self.hands[i] = state.hands
+        self.tricks[i] = state.tricks
+        self.trick_winner[i] = state.trick_winner
+        self.trick_points[i] = state.trick_points
+        self.trick_first_player[i] = state.trick_first_player
+        self.nr_tricks[i] = state.nr_tricks
+        self.nr_cards_in_trick[i] = state.nr_cards_in_trick
+        self.nr_played_cards[i] = state.nr_played_cards
+        self.points[i] = state.points
+
+    def get_state(self, i: int) -> GameState:
+        """
+        Get the state of the game with index i.
+
+        Returns:
+            a new GameState object with a copy of the data of the game
+        """
+        state = GameState()
+        state.dealer = int(self.dealer[i])
+        state.player = int(self.player[i])
+        state.trump = int(self.trump[i])
+        state.forehand = int(self.forehand[i])
+        state.declared_trump = int(self.declared_trump[i])
+        state.hands[:, :] = self.hands[i]
+        state.tricks[:, :] = self.tricks[i]
+        state.trick_winner[:] = self.trick_winner[i]
+        state.trick_points[:] = self.trick_points[i]
+        state.trick_first_player[:] = self.trick_first_player[i]
+        state.nr_tricks = int(self.nr_tricks[i])
+        state.nr_cards_in_trick = int(self.nr_cards_in_trick[i])
+        state.nr_played_cards = int(self.nr_played_cards[i])
+        state.points[:] = self.points[i]
+
+        # current trick is a view to the trick
+        if state.nr_played_cards < 36:
+            state.current_trick = state.tricks[state.nr_tricks]
+        else:
+            state.current_trick = None
+        return state
+
+    def get_observation(self, i: int, player: int = -1) -> GameObservation:
+        """
+        Get the observation of the game with index i for the given player or for the current player.
+        """
+        return observation_from_state(self.get_state(i), player)
+
+    def get_valid_cards(self) -> np.ndarray:
+        """
+        Get the valid cards for the current player of each game.
+
+        Returns:
+            one-hot encoded array of shape [N, 36]
+        """
+        current_trick = self.tricks[self._rows, np.minimum(self.nr_tricks, 8)]
+        return self._rule.get_valid_cards_batch(self.hands[self._rows, self.player],
+                                                current_trick,
+                                                self.nr_cards_in_trick,
+                                                self.trump)
+
+    def is_done(self) -> np.ndarray:
+        """
+        Returns:
+            array of shape [N] that is true for the games that are finished
+        """
+        return self.nr_played_cards == 36
+
+    def action_trump(self, action: np.ndarray, games: np.ndarray = None) -> None:
+        """
+        Perform the trump action (trump or PUSH), the same as GameSim.action_trump for each game. As not all
+        games need a second trump action after a push, the action can be restricted to some of the games.
+
+        Args:
+            action: array with the action for each game (or for each of the selected games)
+            games: indices of the games for which to perform the action, or None for all games
+        """
+        if games is None:
+            games = self._rows
+        games = np.asarray(games)
+        action = np.asarray(action)
+        forehand = self.forehand[games]
+        if np.any(forehand == 1):
+            raise ValueError('Unexpected value 1 for forehand in action_trump')
+
+        # action of the forehand player
+        push = games[(forehand == -1) & (action == PUSH)]
+        declare = (forehand == -1) & (action != PUSH)
+        self.forehand[push] = 0
+        self.player[push] = _partner_player[self.player[push]]
+        self.trump[games[declare]] = action[declare]
+        declare = games[declare]
+        self.forehand[declare] = 1
+        self.declared_trump[declare] = self.player[declare]
+        self.trick_first_player[declare, 0] = self.player[declare]
+
+        # action of the partner of the forehand player
+        rearhand = forehand == 0
+        self.trump[games[rearhand]] = action[rearhand]
+        rearhand = games[rearhand]
+        self.declared_trump[rearhand] = self.player[rearhand]
+        self.player[rearhand] = _next_player[self.dealer[rearhand]]
+        self.trick_first_player[rearhand, 0] = self.player[rearhand]
+
+    def action_play_card(self, card: np.ndarray) -> None:
+        """
+        Play a card in every game as the current player of that game, the same as GameSim.action_play_card
+        for each game.
+
+        Preconditions:
+            trump selection done and no game is finished
+            self.hands[i, self.player[i], card[i]] == 1 for all games i
+
+        Args:
+            card: array of shape [N] with the card to play in each game
+        """
+        rows = self._rows
+        player = self.player
+        nr_tricks = self.nr_tricks
+        nr_cards_in_trick = self.nr_cards_in_trick
+
+        # remove card from player and place in trick
+        self.hands[rows, player, card] = 0
+        self.tricks[rows, nr_tricks, nr_cards_in_trick] = card
+        self.nr_played_cards += 1
+
+        # make sure the first player is set on the first card of a new trick
+        first_card = nr_cards_in_trick == 0
+        self.trick_first_player[rows[first_card], nr_tricks[first_card]] = player[first_card]
+
+        trick_finished = nr_cards_in_trick == 3
+        trick_not_finished = ~trick_finished
+        self.nr_cards_in_trick[trick_not_finished] += 1
+        self.player[trick_not_finished] = _next_player[player[trick_not_finished]]
+
+        if np.any(trick_finished):
+            self._end_trick(rows[trick_finished])
+
+    def _end_trick(self, games: np.ndarray) -> None:
+        """
+        End the current trick for the given games and update all the necessary fields.
+
+        Args:
+            games: indices of the games in which the trick is complete
+        """
+        nr_tricks = self.nr_tricks[games]
+        tricks = self.tricks[games, nr_tricks]
+        trump = self.trump[games]
+
+        points = self._rule.calc_points_batch(tricks, self.nr_played_cards[games] == 36, trump)
+        winner = self._rule.calc_winner_batch(tricks, self.trick_first_player[games, nr_tricks], trump)
+        self.trick_points[games, nr_tricks] = points
+        self.trick_winner[games, nr_tricks] = winner
+        self.points[games, team[winner]] += points
+
+        nr_tricks = nr_tricks + 1
+        self.nr_tricks[games] = nr_tricks
+        self.nr_cards_in_trick[games] = 0
+
+        # next player is the winner of the trick, or -1 at the end of the game
+        not_last = nr_tricks < 9
+        self.trick_first_player[games[not_last], nr_tricks[not_last]] = winner[not_last]
+        self.player[games] = np.where(not_last, winner, -1)
@@ -8,6 +8,7 @@ import numpy as np
 from jass.game.const import JASS_SCHIEBER, partner_player, next_player, card_ids
 from jass.game.game_util import convert_int_encoded_cards_to_str_encoded, \
     convert_one_hot_encoded_cards_to_str_encoded_list, convert_str_encoded_cards_to_int_encoded
+from jass.game.zobrist import hash_state
 
 
 class GameState:
@@ -80,6 +81,23 @@ class GameState:
 
         self.points = np.zeros(shape=2, dtype=np.int32)
 
+        # zobrist hash of the state, calculated when needed (see property hash)
+        self._hash = None
+
+    @property
+    def hash(self) -> int:
+        """
+        Zobrist hash of the state (see jass.game.zobrist). The value is updated incrementally by GameSim, if the
+        state is changed otherwise, it must be reset to None, so that it will be calculated again.
+        """
+        if self._hash is None:
+            self._hash = hash_state(self)
+        return self._hash
+
+    @hash.setter
+    def hash(self, value: int or None):
+        self._hash = value
+
     def __eq__(self, other: 'GameState') -> bool:
         if self.nr_played_cards == 36:
             assert self.current_trick is None
@@ -108,6 +126,57 @@ class GameState:
     def __repr__(self):
         return str(self.__dict__)
 
+    def copy(self) -> 'GameState':
+        """
+        Create a copy of the state. This is much faster than copy.deepcopy and the current trick of the copy is
+        a view onto the tricks of the copy (as in the original).
+
+        Returns:
+            a new state object with the same values
+        """
+        state = GameState.__new__(GameState)
+        state.__dict__.update(self.__dict__)
+        state.hands = self.hands.copy()
+        state.tricks = self.tricks.copy()
+        state.trick_winner = self.trick_winner.copy()
+        state.trick_points = self.trick_points.copy()
+        state.trick_first_player = self.trick_first_player.copy()
+        state.points = self.points.copy()
+        if self.current_trick is not None:
+            state.current_trick = state.tricks[state.nr_tricks, :]
+        return state
+
+    def copy_into(self, other: 'GameState') -> 'GameState':
+        """
+        Copy the values of this state into an existing state, without allocating any new arrays.
+
+        Args:
+            other: the state to copy into
+
+        Returns:
+            the other state
+        """
+        other.dealer = self.dealer
+        other.player = self.player
+        other.trump = self.trump
+        other.forehand = self.forehand
+        other.declared_trump = self.declared_trump
+        np.copyto(other.hands, self.hands)
+        np.copyto(other.tricks, self.tricks)
+        np.copyto(other.trick_winner, self.trick_winner)
+        np.copyto(other.trick_points, self.trick_points)
+        np.copyto(other.trick_first_player, self.trick_first_player)
+        other.nr_tricks = self.nr_tricks
+        other.nr_cards_in_trick = self.nr_cards_in_trick
+        other.nr_played_cards = self.nr_played_cards
+        np.copyto(other.points, self.points)
+        other._hash = self._hash
+        if self.current_trick is not None:
+            other.current_trick = other.tricks[other.nr_tricks, :]
+        else:
+            other.current_trick = None
+        return other
+
     def to_json(self):
         """
         Generate a dict representation that can be converted to json. The format is the same than used in
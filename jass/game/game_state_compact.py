@@ -0,0 +1,262 @@
+# HSLU
+#
+# Created by agent on 18.10.26
+#
+import numpy as np
+
+from jass.game.game_state import GameState
+from jass.game.zobrist import hash_state
+
+# layout of the buffer (offsets in bytes), the points are first so that the int16 view is aligned
+_POINTS = 0                 # 2 x int16
+_DEALER = 4
+_PLAYER = 5
+_TRUMP = 6
+_FOREHAND = 7
+_DECLARED_TRUMP = 8
+_NR_TRICKS = 9
+_NR_CARDS_IN_TRICK = 10
+_NR_PLAYED_CARDS = 11
+_TRICK_WINNER = 12          # 9 x int8
+_TRICK_POINTS = 21          # 9 x int8
+_TRICK_FIRST_PLAYER = 30    # 9 x int8
+_TRICKS = 39                # 9 x 4 x int8
+_HANDS = 75                 # 4 x 36 x int8
+BUFFER_SIZE = 219
+
+# initial content of the buffer, corresponding to the values of a new GameState
+_initial_buffer = np.zeros(BUFFER_SIZE, dtype=np.int8)
+_initial_buffer[_DEALER:_NR_TRICKS] = -1
+_initial_buffer[_TRICK_WINNER:_TRICK_POINTS] = -1
+_initial_buffer[_TRICK_FIRST_PLAYER:_HANDS] = -1
+
+
+def _scalar_property(offset: int, doc: str) -> property:
+    """
+    Create a property for an int field stored in the buffer at the given offset.
+    """
+    def getter(self) -> int:
+        return int(self._buffer[offset])
+
+    def setter(self, value: int) -> None:
+        self._buffer[offset] = value
+
+    return property(getter, setter, doc=doc)
+
+
+def _view_property(start: int, end: int, shape: tuple, dtype, doc: str) -> property:
+    """
+    Create a property for an array field stored in the buffer from start to end, the view onto the buffer is
+    created on each access, so that the state does not hold any other objects than the buffer.
+    """
+    def getter(self) -> np.ndarray:
+        return self._buffer[start:end].view(dtype).reshape(shape)
+
+    def setter(self, value: np.ndarray) -> None:
+        self._buffer[start:end].view(dtype).reshape(shape)[...] = value
+
+    return property(getter, setter, doc=doc)
+
+
+class GameStateCompact:
+    """
+    Compact representation of the state of the game, with the same fields as GameState.
+
+    All the data is stored in one contiguous int8 buffer of fixed layout (BUFFER_SIZE bytes), the array fields
+    (hands, tricks, trick_winner, trick_points, trick_first_player, points) are views onto the buffer, which are
+    created when the field is accessed, and the int fields are properties that read and write the buffer. The class
+    uses __slots__ and only holds the buffer and the hash, so a state takes about 390 bytes (the object, the numpy
+    array of the buffer and its data). Many states can be stored with BUFFER_SIZE bytes each in a
+    GameStateCompactArray. As the field names are the same as in GameState, the object can be used with GameSim and
+    the rule classes.
+
+    Copying and serializing the state only needs to copy the buffer.
+    """
+    __slots__ = ('_buffer', '_hash')
+
+    dealer = _scalar_property(_DEALER, 'dealer of the game')
+    player = _scalar_property(_PLAYER, 'player of the next action')
+    trump = _scalar_property(_TRUMP, 'selected trump')
+    forehand = _scalar_property(_FOREHAND, '1 if trump was declared forehand, 0 if rearhand, -1 if not declared')
+    declared_trump = _scalar_property(_DECLARED_TRUMP, 'the player, who declared trump')
+    nr_tricks = _scalar_property(_NR_TRICKS, 'the number of completed tricks')
+    nr_cards_in_trick = _scalar_property(_NR_CARDS_IN_TRICK, 'the number of cards in the current trick')
+    nr_played_cards = _scalar_property(_NR_PLAYED_CARDS, 'the total number of played cards')
+
+    points = _view_property(_POINTS, _DEALER, (2,), np.int16, 'points of the teams')
+    trick_winner = _view_property(_TRICK_WINNER, _TRICK_POINTS, (9,), np.int8, 'winners of the tricks')
+    trick_points = _view_property(_TRICK_POINTS, _TRICK_FIRST_PLAYER, (9,), np.int8, 'points of the tricks')
+    trick_first_player = _view_property(_TRICK_FIRST_PLAYER, _TRICKS, (9,), np.int8,
+                                        'first players of the tricks')
+    tricks = _view_property(_TRICKS, _HANDS, (9, 4), np.int8, 'cards of the tricks')
+    hands = _view_property(_HANDS, BUFFER_SIZE, (4, 36), np.int8, 'one hot encoded hands of the players')
+
+    def __init__(self, buffer: np.ndarray = None) -> None:
+        """
+        Initialize the state, either as a new state or on an existing buffer.
+
+        Args:
+            buffer: int8 array of size BUFFER_SIZE that will be used (not copied) for the data, or None to
+                allocate a buffer for a new state
+        """
+        if buffer is None:
+            buffer = _initial_buffer.copy()
+        self._buffer = buffer
+        self._hash = None
+
+    @property
+    def current_trick(self) -> np.ndarray or None:
+        """
+        The current trick, which is always the trick nr_tricks (None at the end of the game).
+        """
+        nr_tricks = int(self._buffer[_NR_TRICKS])
+        if nr_tricks < 9:
+            return self._buffer[_TRICKS + 4 * nr_tricks:_TRICKS + 4 * nr_tricks + 4]
+        return None
+
+    @current_trick.setter
+    def current_trick(self, value: np.ndarray or None) -> None:
+        # the current trick follows from nr_tricks, so it can only be set to the trick it already is (as GameSim does)
+        current_trick = self.current_trick
+        if current_trick is None:
+            valid = value is None
+        else:
+            valid = value is not None and np.shares_memory(value, current_trick)
+        if not valid:
+            raise ValueError('The current trick must be the trick nr_tricks')
+
+    @property
+    def buffer(self) -> np.ndarray:
+        return self._buffer
+
+    @property
+    def hash(self) -> int:
+        """
+        Zobrist hash of the state, the same as GameState.hash.
+        """
+        if self._hash is None:
+            self._hash = hash_state(self)
+        return self._hash
+
+    @hash.setter
+    def hash(self, value: int or None):
+        self._hash = value
+
+    def __eq__(self, other: 'GameStateCompact') -> bool:
+        if not isinstance(other, GameStateCompact):
+            return NotImplemented
+        return np.array_equal(self._buffer, other._buffer)
+
+    def __repr__(self):
+        return str(self.to_state())
+
+    def copy(self) -> 'GameStateCompact':
+        """
+        Create a copy of the state, which is a single copy of the buffer.
+        """
+        state = GameStateCompact(self._buffer.copy())
+        state._hash = self._hash
+        return state
+
+    def copy_into(self, other: 'GameStateCompact') -> 'GameStateCompact':
+        """
+        Copy the values of this state into an existing state, without allocating any new arrays.
+        """
+        np.copyto(other._buffer, self._buffer)
+        other._hash = self._hash
+        return other
+
+    def tobytes(self) -> bytes:
+        """
+        Serialize the state.
+        """
+        return self._buffer.tobytes()
+
+    @classmethod
+    def frombytes(cls, data: bytes) -> 'GameStateCompact':
+        """
+        Create a state from data serialized with tobytes.
+        """
+        return GameStateCompact(np.frombuffer(data, dtype=np.int8).copy())
+
+    @classmethod
+    def from_state(cls, state: GameState) -> 'GameStateCompact':
+        """
+        Create a compact state with the same values as the state.
+        """
+        compact = GameStateCompact()
+        compact.dealer = state.dealer
+        compact.player = state.player
+        compact.trump = state.trump
+        compact.forehand = state.forehand
+        compact.declared_trump = state.declared_trump
+        compact.hands[:, :] = state.hands
+        compact.tricks[:, :] = state.tricks
+        compact.trick_winner[:] = state.trick_winner
+        compact.trick_points[:] = state.trick_points
+        compact.trick_first_player[:] = state.trick_first_player
+        compact.nr_tricks = state.nr_tricks
+        compact.nr_cards_in_trick = state.nr_cards_in_trick
+        compact.nr_played_cards = state.nr_played_cards
+        compact.points[:] = state.points
+        return compact
+
+    def to_state(self) -> GameState:
+        """
+        Create a GameState with the same values as this state.
+        """
+        state = GameState()
+        state.dealer = self.dealer
+        state.player = self.player
+        state.trump = self.trump
+        state.forehand = self.forehand
+        state.declared_trump = self.declared_trump
+        state.hands[:, :] = self.hands
+        state.tricks[:, :] = self.tricks
+        state.trick_winner[:] = self.trick_winner
+        state.trick_points[:] = self.trick_points
+        state.trick_first_player[:] = self.trick_first_player
+        state.nr_tricks = self.nr_tricks
+        state.nr_cards_in_trick = self.nr_cards_in_trick
+        state.nr_played_cards = self.nr_played_cards
+        state.points[:] = self.points
+        if self.current_trick is not None:
+            state.current_trick = state.tricks[state.nr_tricks, :]
+        else:
+            state.current_trick = None
+        return state
+
+    def to_json(self):
+        """
+        Generate a dict representation that can be converted to json (the same as for GameState).
+        """
+        return self.to_state().to_json()
+
+
+class GameStateCompactArray:
+    """
+    Storage for many compact states, as the rows of one array [size, BUFFER_SIZE], so that each state takes only
+    BUFFER_SIZE bytes (for example for replay buffers). The states are not stored as objects, accessing a row
+    creates a GameStateCompact on the row.
+    """
+    def __init__(self, size: int):
+        """
+        Args:
+            size: number of states
+        """
+        self.buffers = np.tile(_initial_buffer, (size, 1))
+
+    def __len__(self) -> int:
+        return self.buffers.shape[0]
+
+    def __getitem__(self, index: int) -> GameStateCompact:
+        """
+        Get the state of a row, which is a view onto the row (changing the state changes the row).
+        """
+        return GameStateCompact(self.buffers[index])
+
+    def __setitem__(self, index: int, state: GameStateCompact) -> None:
+        """
+        Copy a compact state into a row.
+        """
+        self.buffers[index] = state.buffer
@@ -0,0 +1,44 @@
+# HSLU
+#
+# Created by agent on 18.10.26
+#
+from jass.game.game_state import GameState
+
+
+class GameStatePool:
+    """
+    Pool of preallocated GameState objects for algorithms that clone states many times, for example for
+    determinizations in search. Cloning copies into a state from the pool (using GameState.copy_into), so no new
+    arrays are allocated once the pool contains enough states. States that are not used anymore should be
+    returned to the pool with release.
+    """
+    def __init__(self, initial_size: int = 0):
+        """
+        Args:
+            initial_size: number of states to allocate in advance
+        """
+        self._free = [GameState() for _ in range(initial_size)]
+
+    @property
+    def nr_free(self) -> int:
+        return len(self._free)
+
+    def acquire(self) -> GameState:
+        """
+        Get a state from the pool (or a new one if the pool is empty), the values of the state are undefined.
+        """
+        if self._free:
+            return self._free.pop()
+        return GameState()
+
+    def clone(self, state: GameState) -> GameState:
+        """
+        Get a copy of the state using a state from the pool.
+        """
+        return state.copy_into(self.acquire())
+
+    def release(self, state: GameState) -> None:
+        """
+        Return a state to the pool, the state must not be used by the caller afterwards.
+        """
+        self._free.append(state)
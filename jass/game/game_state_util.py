@@ -47,7 +47,7 @@ def calculate_points_from_tricks(state: 'GameState') -> np.ndarray:
     return points
 
 
-def observation_from_state(state: GameState, player: int = -1) -> GameObservation:
+def observation_from_state(state: GameState, player: int = -1, obs: GameObservation = None) -> GameObservation:
     """
     Initialize observation from game state for the given player or the current player if the player is not
     supplied.
@@ -55,11 +55,13 @@ def observation_from_state(state: GameState, player: int = -1) -> GameObservatio
     Args:
         state: The game state from which to determine the observation
         player: player for which to create the observation or -1 for the current player
+        obs: observation that is filled in place (so that it can be reused), or None to create a new observation
 
     Returns:
         the observation for a given game state for the view of the player
     """
-    obs = GameObservation()
+    if obs is None:
+        obs = GameObservation()
 
     obs.dealer = state.dealer
     obs.player = state.player
@@ -75,6 +77,8 @@ def observation_from_state(state: GameState, player: int = -1) -> GameObservatio
 
     if state.nr_played_cards < 36:
         obs.hand[:] = state.hands[obs.player_view, :]
+    else:
+        obs.hand.fill(0)
 
     obs.tricks[:, :] = state.tricks[:, :]
     obs.trick_winner[:] = state.trick_winner[:]
@@ -96,6 +100,50 @@ def observation_from_state(state: GameState, player: int = -1) -> GameObservatio
     return obs
 
 
+def _read_only_view(array: np.ndarray) -> np.ndarray:
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+def observation_view_from_state(state: GameState, player: int = -1) -> GameObservation:
+    """
+    Create an observation from the game state that shares the arrays of the state instead of copying them. The
+    arrays of the observation are read-only views, so they can not be used to change the state, but they will
+    change when the state changes. The observation is only valid as long as the state is not changed.
+
+    Args:
+        state: The game state from which to determine the observation
+        player: player for which to create the observation or -1 for the current player
+
+    Returns:
+        the observation for a given game state for the view of the player
+    """
+    obs = GameObservation.__new__(GameObservation)
+    obs.dealer = state.dealer
+    obs.player = state.player
+    obs.player_view = state.player if player == -1 else player
+    obs.trump = state.trump
+    obs.forehand = state.forehand
+    obs.declared_trump = state.declared_trump
+
+    # after the last card, the hands of all players are empty
+    obs.hand = _read_only_view(state.hands[max(obs.player_view, 0), :])
+    obs.tricks = _read_only_view(state.tricks)
+    obs.trick_winner = _read_only_view(state.trick_winner)
+    obs.trick_points = _read_only_view(state.trick_points)
+    obs.trick_first_player = _read_only_view(state.trick_first_player)
+    obs.nr_tricks = state.nr_tricks
+    obs.nr_cards_in_trick = state.nr_cards_in_trick
+    obs.nr_played_cards = state.nr_played_cards
+    obs.points = _read_only_view(state.points)
+    if state.nr_played_cards < 36:
+        obs.current_trick = obs.tricks[obs.nr_tricks]
+    else:
+        obs.current_trick = None
+    return obs
+
+
 def state_from_observation(obs: GameObservation, hands: np.ndarray) -> GameState:
     """
     Initialize state from an observation and the distribution of all hands.
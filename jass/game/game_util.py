@@ -132,6 +132,27 @@ def deal_random_hand() -> np.ndarray:
     return hands
 
 
+def deal_hands_from_cards(cards: np.ndarray) -> np.ndarray:
+    """
+    Deal the cards of one or more shuffled decks, the first 9 cards of each deck to player 0, the next 9 to
+    player 1 and so on (as in deal_random_hand).
+
+    Args:
+        cards: the permutations of the card ids as array [36] or [nr_deals, 36]
+
+    Returns:
+        one hot encoded array [4, 36] or [nr_deals, 4, 36]
+    """
+    cards = np.asarray(cards)
+    players = np.repeat(np.arange(4), 9)
+    hands = np.zeros(cards.shape[:-1] + (4, 36), dtype=np.int32)
+    if cards.ndim == 1:
+        hands[players, cards] = 1
+    else:
+        hands[np.arange(cards.shape[0])[:, np.newaxis], players, cards] = 1
+    return hands
+
+
 def full_to_trump(full_action: int) -> int:
     action = full_action - TRUMP_FULL_OFFSET
     if action == PUSH_ALT:
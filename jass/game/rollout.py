@@ -0,0 +1,285 @@
+# HSLU
+#
+# Created by agent on 18.10.26
+#
+"""
+Fast playouts of games to the end (rollouts), for example for the simulations of Monte Carlo tree search.
+
+The playouts are played on bitboards (see jass.game.bitboard) with python ints and lists that are reused, so no
+numpy arrays or other objects are created for the cards played.
+"""
+import random
+from typing import List, Callable
+
+import numpy as np
+
+from jass.game.bitboard import cards_to_bits, color_of_card_list
+from jass.game.const import card_values, trick_strength, next_player, team
+from jass.game.game_sim_batch import GameSimBatch
+from jass.game.game_state import GameState
+from jass.game.rule_schieber import RuleSchieber
+from jass.game.rule_schieber_bitboard import RuleSchieberBitboard
+
+# number of bits for all 12 bit numbers, to count the cards of a bitboard in 3 lookups
+_bit_count_12 = [bin(i).count('1') for i in range(1 << 12)]
+
+ALL_PLAYERS = 0b1111
+
+# the tables as nested lists, as indexing lists with python ints is faster than indexing numpy arrays
+_card_values = card_values.tolist()
+_trick_strength = trick_strength.tolist()
+
+
+class RolloutEngine:
+    """
+    Plays games from a position to the end with random cards or with the cards selected by a policy.
+
+    A policy is a function policy(valid, trick, nr_cards_in_trick, trump, rng) that gets the bitboard of the valid
+    cards and returns the card to play.
+
+    If an endgame table is given, the playouts in which all players play according to the rules end at the start
+    of the first trick whose position is in the table, with the exact points from the table for the remaining
+    tricks.
+    """
+    def __init__(self, seed=None, policy: Callable[[int, List[int], int, int, random.Random], int] = None,
+                 endgame_table=None):
+        """
+        Args:
+            seed: seed for the random number generator
+            policy: policy to select the cards, or None to select random cards
+            endgame_table: EndgameTable with the values of positions of the last tricks, or None
+        """
+        self.rng = random.Random(seed)
+        self.policy = policy
+        self.endgame_table = endgame_table
+        self._valid_cards = RuleSchieberBitboard().get_valid_cards_bits
+
+        # position of the rollouts from a state
+        self._hands = [0, 0, 0, 0]
+        self._trick = [-1, -1, -1, -1]
+        self._points = [0, 0]
+
+    def seed(self, seed) -> None:
+        self.rng.seed(seed)
+
+    def playout(self, hands: List[int], trick: List[int], nr_cards_in_trick: int, first_player: int, player: int,
+                nr_played_cards: int, points: List[int], trump: int, rule_players: int = ALL_PLAYERS) -> None:
+        """
+        Play the game from the position to the end. The lists of the position are changed during the playout.
+
+        Args:
+            hands: bitboards of the cards of the players
+            trick: the cards of the current trick
+            nr_cards_in_trick: number of cards in the current trick
+            first_player: the first player of the current trick
+            player: the player to play the next card
+            nr_played_cards: number of cards played in the game
+            points: points of the teams, the points at the end of the game are added to these
+            trump: trump of the game
+            rule_players: bit mask of the players that play according to the rules, the other players can play any
+                card of their hand (for example, if their hand is the pool of all the unseen cards)
+        """
+        values = _card_values[trump]
+        strength_of_trump = _trick_strength[trump]
+        valid_cards = self._valid_cards
+        random_value = self.rng.random
+        policy = self.policy
+        table = self.endgame_table
+        endgame_start = 36 - table.nr_cards if table is not None and rule_players == ALL_PLAYERS else 37
+        while nr_played_cards < 36:
+            if nr_played_cards >= endgame_start and nr_cards_in_trick == 0:
+                points_team_0 = table.lookup(hands, player, trump)
+                if points_team_0 >= 0:
+                    remaining = hands[0] | hands[1] | hands[2] | hands[3]
+                    total = 5
+                    while remaining:
+                        card_bit = remaining & -remaining
+                        remaining ^= card_bit
+                        total += values[card_bit.bit_length() - 1]
+                    points[0] += points_team_0
+                    points[1] += total - points_team_0
+                    return
+            hand = hands[player]
+            if rule_players >> player & 1:
+                valid = valid_cards(hand, trick, nr_cards_in_trick, trump)
+            else:
+                valid = hand
+
+            if policy is not None:
+                card_bit = 1 << policy(valid, trick, nr_cards_in_trick, trump, self.rng)
+            else:
+                # select the index of the card uniformly and remove the lower cards
+                nr_valid = _bit_count_12[valid & 0xFFF] + _bit_count_12[(valid >> 12) & 0xFFF] + \
+                    _bit_count_12[valid >> 24]
+                index = int(random_value() * nr_valid)
+                while index:
+                    valid &= valid - 1
+                    index -= 1
+                card_bit = valid & -valid
+
+            hands[0] &= ~card_bit
+            hands[1] &= ~card_bit
+            hands[2] &= ~card_bit
+            hands[3] &= ~card_bit
+            trick[nr_cards_in_trick] = card_bit.bit_length() - 1
+            nr_played_cards += 1
+            if nr_cards_in_trick < 3:
+                nr_cards_in_trick += 1
+                player = next_player[player]
+                continue
+
+            # end of the trick
+            strength = strength_of_trump[color_of_card_list[trick[0]]]
+            winner = 0
+            highest = strength[trick[0]]
+            for i in range(1, 4):
+                if strength[trick[i]] > highest:
+                    highest = strength[trick[i]]
+                    winner = i
+            winner = (first_player - winner) % 4
+            trick_points = values[trick[0]] + values[trick[1]] + values[trick[2]] + values[trick[3]]
+            if nr_played_cards == 36:
+                trick_points += 5
+            points[team[winner]] += trick_points
+            nr_cards_in_trick = 0
+            first_player = winner
+            player = winner
+
+    def rollout(self, state: GameState, n: int) -> np.ndarray:
+        """
+        Play n games from the state to the end.
+
+        Args:
+            state: the state of the game, which is not changed
+            n: number of playouts
+
+        Returns:
+            array of shape [n, 2] with the points of the teams at the end of each game
+        """
+        result = np.zeros([n, 2], dtype=np.int32)
+        if state.nr_played_cards == 36:
+            result[:, :] = state.points
+            return result
+        root_hands = [cards_to_bits(state.hands[player]) for player in range(4)]
+        root_trick = state.tricks[state.nr_tricks].tolist()
+        first_player = int(state.trick_first_player[state.nr_tricks]) if state.nr_cards_in_trick > 0 \
+            else state.player
+        hands = self._hands
+        trick = self._trick
+        points = self._points
+        for i in range(n):
+            hands[:] = root_hands
+            trick[:] = root_trick
+            points[0] = int(state.points[0])
+            points[1] = int(state.points[1])
+            self.playout(hands, trick, state.nr_cards_in_trick, first_player, state.player, state.nr_played_cards,
+                         points, state.trump)
+            result[i, 0] = points[0]
+            result[i, 1] = points[1]
+        return result
+
+
+class BatchRolloutEngine:
+    """
+    Plays a batch of K random playouts from the same position as one vectorized computation: the K games are
+    simulated with GameSimBatch, the valid cards and the winners of the tricks are calculated for all games at once
+    by the batch methods of the rule, and a random valid card is selected for each game as the maximum of random
+    numbers over the valid cards.
+
+    The hands can be different for each of the games, for example to play a different sample of the hands of
+    the other players in each game.
+    """
+    def __init__(self, nr_playouts: int, seed=None):
+        """
+        Args:
+            nr_playouts: number of playouts K in a batch
+            seed: seed for the random number generator
+        """
+        self.nr_playouts = nr_playouts
+        self.rng = np.random.default_rng(seed)
+        self._sim = GameSimBatch(RuleSchieber(), nr_playouts)
+
+    def seed(self, seed) -> None:
+        self.rng = np.random.default_rng(seed)
+
+    def rollout(self, state: GameState) -> np.ndarray:
+        """
+        Play K games from the state to the end.
+
+        Args:
+            state: the state of the game
+
+        Returns:
+            array of shape [K, 2] with the points of the teams at the end of each game
+        """
+        self._sim.init_from_state(state)
+        return self._play()
+
+    def rollout_position(self, hands: np.ndarray, trick: List[int], nr_cards_in_trick: int, first_player: int,
+                         player: int, nr_played_cards: int, points: List[int], trump: int) -> np.ndarray:
+        """
+        Play K games from a position to the end. Only the information needed for playing the remaining cards is
+        set, the completed tricks of the games are not known.
+
+        Args:
+            hands: one-hot encoded hands of shape [K, 4, 36] (or [4, 36] for the same hands in all games)
+            trick: the cards of the current trick
+            nr_cards_in_trick: number of cards in the current trick
+            first_player: the first player of the current trick
+            player: the player to play the next card
+            nr_played_cards: number of cards played in the game
+            points: points of the teams
+            trump: trump of the game
+
+        Returns:
+            array of shape [K, 2] with the points of the teams at the end of each game
+        """
+        sim = self._sim
+        nr_tricks = (nr_played_cards - nr_cards_in_trick) // 4
+        sim.player[:] = player
+        sim.trump[:] = trump
+        sim.hands[:] = hands
+        sim.tricks.fill(-1)
+        sim.trick_first_player.fill(-1)
+        sim.trick_winner.fill(-1)
+        sim.trick_points.fill(0)
+        if nr_tricks < 9:
+            sim.tricks[:, nr_tricks, :] = trick
+            sim.trick_first_player[:, nr_tricks] = first_player
+        sim.nr_tricks[:] = nr_tricks
+        sim.nr_cards_in_trick[:] = nr_cards_in_trick
+        sim.nr_played_cards[:] = nr_played_cards
+        sim.points[:] = points
+        return self._play()
+
+    def _play(self) -> np.ndarray:
+        sim = self._sim
+        # all the games are at the same number of cards
+        for _ in range(int(sim.nr_played_cards[0]), 36):
+            valid = sim.get_valid_cards()
+            sim.action_play_card(np.argmax(self.rng.random(valid.shape) * valid, axis=1))
+        return sim.points.copy()
+
+
+def greedy_policy(valid: int, trick: List[int], nr_cards_in_trick: int, trump: int, rng: random.Random) -> int:
+    """
+    Simple policy for rollouts: play the strongest valid card if it wins the trick so far, otherwise the card with
+    the lowest value (ties are broken by the card index, the random number generator is not used).
+    """
+    values = _card_values[trump]
+    strength = _trick_strength[trump][color_of_card_list[trick[0]]] if nr_cards_in_trick > 0 else None
+    best_card = -1
+    lowest_card = -1
+    card = 0
+    while valid:
+        if valid & 1:
+            if lowest_card == -1 or values[card] < values[lowest_card]:
+                lowest_card = card
+            if strength is not None and (best_card == -1 or strength[card] > strength[best_card]):
+                best_card = card
+        valid >>= 1
+        card += 1
+    if strength is None:
+        return lowest_card
+    highest = max(strength[trick[i]] for i in range(nr_cards_in_trick))
+    return best_card if strength[best_card] > highest else lowest_card
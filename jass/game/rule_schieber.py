@@ -5,10 +5,13 @@
 import numpy as np
 
 from jass.game.const import color_of_card, color_masks, J_offset, higher_trump, lower_trump, card_values, UNE_UFE, \
-    OBE_ABE, next_player, partner_player
+    OBE_ABE, next_player, partner_player, trick_strength
 from jass.game.game_rule import GameRule
 from jass.game.game_state import GameState
 
+# the table as nested lists, as indexing lists with python ints is faster than indexing numpy arrays
+_trick_strength = trick_strength.tolist()
+
 
 class RuleSchieber(GameRule):
     """
@@ -17,6 +20,14 @@ class RuleSchieber(GameRule):
 
     """
 
+    def __init__(self, use_strength_table: bool = False):
+        """
+        Args:
+            use_strength_table: True if calc_winner should determine the winner from the precomputed table
+                const.trick_strength instead of comparing the cards for the different trump modes
+        """
+        self._use_strength_table = use_strength_table
+
     def get_valid_cards(self, hand: np.array,
                         current_trick: np.ndarray or list,
                         move_nr: int,
@@ -146,6 +157,83 @@ class RuleSchieber(GameRule):
                         not_lower_trump_cards = 1 - lower_trump_cards
                         return hand * not_lower_trump_cards
 
+    def get_valid_cards_batch(self, hands: np.ndarray,
+                              tricks: np.ndarray,
+                              move_nr: np.ndarray,
+                              trump: np.ndarray) -> np.ndarray:
+        """
+        Get the valid cards for a batch of N positions. All the branches of get_valid_cards are calculated as
+        array operations over the whole batch and then selected by masks, the result is the same as calling
+        get_valid_cards for each position.
+
+        Args:
+            hands: one-hot encoded array of shape [N, 36] of the hands of the players to move
+            tricks: array of shape [N, 4] with the cards of the current tricks (-1 for cards not played yet)
+            move_nr: array of shape [N] with the move to make in the current trick
+            trump: array of shape [N] with the trump of each position
+
+        Returns:
+            one-hot encoded array of shape [N, 36] of the valid moves
+        """
+        hands = np.asarray(hands, dtype=np.int32)
+        tricks = np.asarray(tricks)
+        move_nr = np.asarray(move_nr)
+        trump = np.asarray(trump)
+        rows = np.arange(hands.shape[0])
+
+        # color of the first card played (the value for positions on the first move is not used)
+        color_played = color_of_card[tricks[:, 0]]
+        color_cards = hands * color_masks[color_played, :]
+        have_color_played = color_cards.any(axis=1)
+
+        # trump cards in hand (the color is set to 0 for obe and une, the values are not used in that case)
+        is_trump_round = trump < 4
+        trump_color = np.where(is_trump_round, trump, 0)
+        trump_cards = hands * color_masks[trump_color, :]
+        number_of_trumps = trump_cards.sum(axis=1)
+        only_trumps = number_of_trumps == hands.sum(axis=1)
+        have_trump_jack = hands[rows, trump_color * 9 + J_offset] == 1
+
+        # lowest trump played by player 1 or 2, using the same comparison of indices as get_valid_cards
+        trump_played_1 = (move_nr > 1) & (color_of_card[tricks[:, 1]] == trump_color)
+        trump_played_2 = (move_nr == 3) & (color_of_card[tricks[:, 2]] == trump_color)
+        lowest_trump_played = np.where(trump_played_1, tricks[:, 1], -1)
+        lowest_trump_played = np.where(trump_played_2 & (lowest_trump_played < tricks[:, 2]),
+                                       tricks[:, 2], lowest_trump_played)
+        trump_played = lowest_trump_played != -1
+        lowest_trump_played = np.maximum(lowest_trump_played, 0)
+        higher_trump_cards = trump_cards * higher_trump[lowest_trump_played, :]
+        lower_trump_cards = trump_cards * lower_trump[lowest_trump_played, :]
+
+        # play anything, unless one of the restrictions below applies
+        valid = hands.copy()
+        not_first = move_nr > 0
+
+        # obe or une: must give the color if we have it
+        mask = not_first & ~is_trump_round & have_color_played
+        valid[mask] = color_cards[mask]
+
+        # trump played as first card: must give trump, unless we have none or only the trump jack
+        trump_led = not_first & is_trump_round & (color_played == trump_color)
+        mask = trump_led & ((number_of_trumps > 1) | ((number_of_trumps == 1) & ~have_trump_jack))
+        valid[mask] = trump_cards[mask]
+
+        # other color played as first card
+        color_led = not_first & is_trump_round & (color_played != trump_color)
+
+        # nobody played a trump: give the color or any trump
+        mask = color_led & ~trump_played & have_color_played
+        valid[mask] = color_cards[mask] + trump_cards[mask]
+
+        # somebody played a trump and we have other cards than trump: no lower trump
+        mask = color_led & trump_played & ~only_trumps & have_color_played
+        valid[mask] = color_cards[mask] + higher_trump_cards[mask]
+
+        mask = color_led & trump_played & ~only_trumps & ~have_color_played
+        valid[mask] = hands[mask] * (1 - lower_trump_cards[mask])
+
+        return valid
+
     def calc_points(self, trick: np.ndarray, is_last: bool, trump: int = -1) -> int:
         """
         Calculate the points from the cards in the trick according to the given trump
@@ -173,6 +261,9 @@ class RuleSchieber(GameRule):
         Returns:
             the player who won this trick
         """
+        if self._use_strength_table:
+            return self._calc_winner_from_strength_table(trick, first_player, trump)
+
         color_of_first_card = color_of_card[trick[0]]
         if trump == UNE_UFE:
             # lowest card of first color wins
@@ -231,6 +322,56 @@ class RuleSchieber(GameRule):
         # adjust actual winner by first player
         return (first_player - winner) % 4
 
+    def _calc_winner_from_strength_table(self, trick: np.ndarray, first_player: int, trump: int) -> int:
+        """
+        Calculate the winner of a completed trick as the card with the highest value in const.trick_strength.
+        """
+        strength = _trick_strength[trump][int(trick[0]) // 9]
+        winner = 0
+        highest = strength[trick[0]]
+        for i in range(1, 4):
+            if strength[trick[i]] > highest:
+                highest = strength[trick[i]]
+                winner = i
+        return (first_player - winner) % 4
+
+    def calc_points_batch(self, tricks: np.ndarray, is_last: np.ndarray or bool, trump: np.ndarray) -> np.ndarray:
+        """
+        Calculate the points of a batch of N tricks, the same as calc_points for each trick.
+
+        Args:
+            tricks: array of shape [N, 4] of completed tricks
+            is_last: array of shape [N] (or a single bool) that is true for the last trick of a game
+            trump: array of shape [N] with the trump for each trick
+
+        Returns:
+            array of shape [N] with the points of each trick
+        """
+        tricks = np.asarray(tricks)
+        trump = np.asarray(trump)
+        points = card_values[trump[:, np.newaxis], tricks].sum(axis=1)
+        return (points + 5 * np.asarray(is_last, dtype=np.int32)).astype(np.int32)
+
+    def calc_winner_batch(self, tricks: np.ndarray, first_player: np.ndarray, trump: np.ndarray) -> np.ndarray:
+        """
+        Calculate the winners of a batch of N completed tricks, the same as calc_winner for each trick. The cards
+        are compared using the table const.trick_strength.
+
+        Args:
+            tricks: array of shape [N, 4] of completed tricks
+            first_player: array of shape [N] with the first player of each trick
+            trump: array of shape [N] with the trump for each trick
+
+        Returns:
+            array of shape [N] with the player who won each trick
+        """
+        tricks = np.asarray(tricks)
+        trump = np.asarray(trump)
+        color_of_first_card = color_of_card[tricks[:, 0]]
+        strength = trick_strength[trump[:, np.newaxis], color_of_first_card[:, np.newaxis], tricks]
+        winner = strength.argmax(axis=1)
+        return ((np.asarray(first_player) - winner) % 4).astype(np.int32)
+
     def assert_invariants(self, state: GameState) -> None:
         """
         Validates the internal consistency of the state according to the rules and throws an assertion exception if an
@@ -0,0 +1,103 @@
+# HSLU
+#
+# Created by agent on 18.10.26
+#
+import numpy as np
+
+from jass.game.bitboard import color_masks_bits, trump_jack_bits, higher_trump_bits, lower_trump_bits, \
+    color_of_card_list, cards_to_bits, bits_to_cards
+from jass.game.rule_schieber import RuleSchieber
+
+
+class RuleSchieberBitboard(RuleSchieber):
+    """
+    Rules for 'Schieber' with the valid cards calculated on bitboards (see jass.game.bitboard). A hand is a single
+    int, so get_valid_cards_bits does not allocate any numpy arrays. The one-hot interface of GameRule is
+    still available and gives the same results as RuleSchieber.
+    """
+
+    def get_valid_cards_bits(self, hand: int,
+                             current_trick: np.ndarray or list,
+                             move_nr: int,
+                             trump: int) -> int:
+        """
+        Get the valid cards that can be played by the current player, the same as RuleSchieber.get_valid_cards,
+        but for cards in the bitboard representation.
+
+        Args:
+            hand: bitboard of the cards in the hand of the player
+            current_trick: array or list with the indices of the cards for the previous moves in the current trick
+            move_nr: which move the player has to make in the current trick, 0 for first move, 1 for second and so on
+            trump: trump color (or 'obe', 'une')
+
+        Returns:
+            bitboard of the valid cards
+        """
+        # play anything on the first move
+        if move_nr == 0:
+            return hand
+
+        color_played = color_of_card_list[current_trick[0]]
+        color_cards = hand & color_masks_bits[color_played]
+
+        if trump >= 4:
+            # obe or une declared, must give the color if we have it
+            return color_cards if color_cards else hand
+
+        trump_cards = hand & color_masks_bits[trump]
+
+        #
+        # the played color was trump
+        #
+        if color_played == trump:
+            if not trump_cards or trump_cards == trump_jack_bits[trump]:
+                # no trumps or only the trump jack, play anything
+                return hand
+            return trump_cards
+
+        #
+        # the played color was not trump, find the lowest trump played by player 1 or 2 (if any), using the same
+        # comparison as RuleSchieber
+        #
+        lowest_trump_played = -1
+        if move_nr > 1:
+            card = current_trick[1]
+            if color_of_card_list[card] == trump:
+                lowest_trump_played = card
+            if move_nr == 3:
+                card = current_trick[2]
+                if color_of_card_list[card] == trump and lowest_trump_played < card:
+                    lowest_trump_played = card
+
+        if lowest_trump_played == -1:
+            # nobody played a trump, give the color or any trump
+            return (color_cards | trump_cards) if color_cards else hand
+
+        if trump_cards == hand:
+            # only trumps left, so we can give any of them
+            return hand
+
+        if color_cards:
+            # must give a color or a higher trump
+            return color_cards | (trump_cards & higher_trump_bits[lowest_trump_played])
+        else:
+            # play anything except a lower trump
+            return hand & ~(trump_cards & lower_trump_bits[lowest_trump_played])
+
+    def get_valid_cards(self, hand: np.array,
+                        current_trick: np.ndarray or list,
+                        move_nr: int,
+                        trump: int or None) -> np.array:
+        """
+        Get the valid cards for the one-hot encoded hand, calculated using the bitboard implementation.
+
+        Args:
+            hand: one-hot encoded array of hands owned by the player
+            current_trick: array with the indices of the cards for the previous moves in the current trick
+            move_nr: which move the player has to make in the current trick, 0 for first move, 1 for second and so on
+            trump: trump color (or 'obe', 'une')
+
+        Returns:
+            one-hot encoded array of valid moves
+        """
+        return bits_to_cards(self.get_valid_cards_bits(cards_to_bits(hand), current_trick, move_nr, trump))
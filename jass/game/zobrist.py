@@ -0,0 +1,82 @@
+# HSLU
+#
+# Created by agent on 18.10.26
+#
+"""
+Zobrist hashing of game states and observations.
+
+The hash is the xor of random keys for:
+    - each card in the hand of a player (hand_keys[player][card])
+    - each card in the current trick at its position (trick_keys[position][card])
+    - each card played in a completed trick (played_keys[card])
+    - the trump (trump_keys[trump + 1], including -1 for no trump)
+    - the player to move (player_keys[player + 1], including -1 at the end of the game)
+
+The order of the cards in completed tricks and the points made are not part of the hash, so positions that differ
+only by these values (transpositions) have the same hash, as their outcome for the remaining game is the same.
+
+As each action changes only a few of the keys, the hash can be updated incrementally (see GameSim). The keys are
+generated from a fixed seed, so the hashes are the same in all processes.
+"""
+import numpy as np
+
+_rng = np.random.default_rng(0x4A415353)
+
+
+def _keys(shape) -> list:
+    # positive 63 bit keys as python ints (nested lists)
+    return _rng.integers(0, 2**63 - 1, size=shape, dtype=np.int64).tolist()
+
+
+hand_keys = _keys([4, 36])
+trick_keys = _keys([4, 36])
+played_keys = _keys(36)
+trump_keys = _keys(7)
+player_keys = _keys(5)
+
+
+def hash_state(state) -> int:
+    """
+    Calculate the hash of a state (GameState or GameStateCompact) from scratch.
+
+    Args:
+        state: the state
+
+    Returns:
+        the hash of the state
+    """
+    h = trump_keys[state.trump + 1] ^ player_keys[state.player + 1]
+    for player in range(4):
+        keys = hand_keys[player]
+        for card in np.flatnonzero(state.hands[player]).tolist():
+            h ^= keys[card]
+    return h ^ _hash_tricks(state.tricks, state.nr_tricks, state.nr_cards_in_trick)
+
+
+def hash_observation(obs) -> int:
+    """
+    Calculate the hash of an observation from scratch. Only the hand of the player of the observation
+    (player_view) is included, so the value is different from the hash of the state.
+
+    Args:
+        obs: the observation
+
+    Returns:
+        the hash of the observation
+    """
+    h = trump_keys[obs.trump + 1] ^ player_keys[obs.player + 1]
+    if obs.player_view != -1:
+        keys = hand_keys[obs.player_view]
+        for card in np.flatnonzero(obs.hand).tolist():
+            h ^= keys[card]
+    return h ^ _hash_tricks(obs.tricks, obs.nr_tricks, obs.nr_cards_in_trick)
+
+
+def _hash_tricks(tricks: np.ndarray, nr_tricks: int, nr_cards_in_trick: int) -> int:
+    h = 0
+    for card in tricks[0:nr_tricks, :].flatten().tolist():
+        h ^= played_keys[card]
+    if nr_tricks < 9:
+        for position, card in enumerate(tricks[nr_tricks, 0:nr_cards_in_trick].tolist()):
+            h ^= trick_keys[position][card]
+    return h
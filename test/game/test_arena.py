@@ -1,8 +1,72 @@
+import json
+import os
+import tempfile
 import unittest
 
+import numpy as np
+
 from jass.agents.agent_cheating_random_schieber import AgentCheatingRandomSchieber
+from jass.agents.Agent_rulebased import Agent_rulebased
+from jass.agents.MCTS_agent import MCTS_agent
+from jass.agents.agent import Agent
 from jass.agents.agent_random_schieber import AgentRandomSchieber
-from jass.arena.arena import Arena
+from jass.arena.arena import Arena, seed_players
+from jass.arena.dealing_card_seeded_random_strategy import DealingCardSeededRandomStrategy
+from jass.arena.dealing_card_strategy import DealingCardStrategy
+from jass.game.const import NORTH, next_player, MAX_TRUMP
+from jass.game.game_observation import GameObservation
+from jass.game.game_util import deal_random_hand
+from jass.game.rule_schieber import RuleSchieber
+from jass.logs.game_log_entry import GameLogEntry
+
+
+def _dealt_cards(game) -> np.ndarray:
+    # the player who played each card of a complete game
+    played = np.full(36, -1)
+    for trick, first_player in zip(game.tricks, game.trick_first_player):
+        for position in range(4):
+            played[trick[position]] = (first_player - position) % 4
+    return played
+
+
+class AgentFirstCard(Agent):
+    # deterministic agent: plays the first valid card
+    def __init__(self, trump: int = 0):
+        self._trump = trump
+
+    def action_trump(self, obs: GameObservation) -> int:
+        return self._trump
+
+    def action_play_card(self, obs: GameObservation) -> int:
+        return int(np.flatnonzero(RuleSchieber().get_valid_cards_from_obs(obs))[0])
+
+
+class DealingCardSeededStrategy(DealingCardStrategy):
+    def __init__(self):
+        np.random.seed(1)
+        self.hands = []
+
+    def deal_cards(self, game_nr: int = 0, total_nr_games: int = 0) -> np.ndarray:
+        self.hands.append(deal_random_hand())
+        return self.hands[-1]
+
+
+class AgentFailing(AgentFirstCard):
+    # fails in the second trick
+    def action_play_card(self, obs: GameObservation) -> int:
+        if obs.nr_tricks > 0:
+            raise RuntimeError('Agent failed')
+        return super().action_play_card(obs)
+
+
+class AgentSeeded(AgentFirstCard):
+    # records the seed
+    def __init__(self):
+        super().__init__()
+        self.seed = None
+
+    def set_seed(self, seed) -> None:
+        self.seed = seed
 
 
 class GameSimTestCase(unittest.TestCase):
@@ -18,6 +82,15 @@ class GameSimTestCase(unittest.TestCase):
 
         self.assertEqual(arena.nr_games_played, 1)
 
+    def test_arena_reuse_observation(self):
+        arena = Arena(nr_games_to_play=2, cheating_mode=False, check_move_validity=True, reuse_observation=True)
+        player = AgentRandomSchieber()
+        arena.set_players(player, player, player, player)
+        arena.play_all_games()
+
+        self.assertEqual(arena.nr_games_played, 2)
+        self.assertEqual(157, arena.points_team_0[0] + arena.points_team_1[0])
+
     def test_arena_in_cheating_mode(self):
         # setup the arena
         arena = Arena(nr_games_to_play=1, cheating_mode=True, check_move_validity=True)
@@ -47,6 +120,113 @@ class GameSimTestCase(unittest.TestCase):
         with self.assertRaises(AssertionError):
             arena.set_players(my_player, player, my_player, player)
 
+    def test_arena_parallel(self):
+        with tempfile.TemporaryDirectory() as directory:
+            results = []
+            for nr_workers in [1, 2]:
+                strategy = DealingCardSeededStrategy()
+                basename = os.path.join(directory, 'games_{}_'.format(nr_workers))
+                arena = Arena(nr_games_to_play=7, dealing_card_strategy=strategy, save_filename=basename,
+                              nr_workers=nr_workers, shard_size=3, seed=42)
+                player = AgentRandomSchieber()
+                arena.set_players(player, player, player, player)
+                arena.play_all_games()
+
+                self.assertEqual(7, arena.nr_games_played)
+                np.testing.assert_array_equal(157, arena.points_team_0 + arena.points_team_1)
+                results.append(arena.points_team_0.copy())
+
+                # the games are saved in order, with the deals and dealers of the sequential games
+                with open(basename + '0001.txt') as file:
+                    games = [GameLogEntry.from_json(json.loads(line)).game for line in file]
+                self.assertEqual(7, len(games))
+                dealer = NORTH
+                for game, hands, points in zip(games, strategy.hands, arena.points_team_0):
+                    self.assertEqual(dealer, game.dealer)
+                    self.assertEqual(points, game.points[0])
+                    played = _dealt_cards(game)
+                    for player_nr in range(4):
+                        np.testing.assert_array_equal(np.flatnonzero(hands[player_nr]),
+                                                      np.flatnonzero(played == player_nr))
+                    dealer = next_player[dealer]
+
+            # the results do not depend on the number of workers
+            np.testing.assert_array_equal(results[0], results[1])
+
+    def test_arena_duplicate(self):
+        with self.assertRaises(ValueError):
+            Arena(nr_games_to_play=5, duplicate=True)
+
+        # the same deterministic players on both teams get the same points on the same cards
+        arena = Arena(nr_games_to_play=8, duplicate=True)
+        arena.set_players(AgentFirstCard(), AgentFirstCard(), AgentFirstCard(), AgentFirstCard())
+        arena.play_all_games()
+        self.assertEqual(8, arena.nr_games_played)
+        np.testing.assert_array_equal(np.zeros(4), arena.paired_differences)
+        self.assertEqual((0.0, 0.0, 0.0), arena.duplicate_result())
+
+        with tempfile.TemporaryDirectory() as directory:
+            results = []
+            for nr_workers in [0, 2]:
+                basename = os.path.join(directory, 'games_{}_'.format(nr_workers))
+                arena = Arena(nr_games_to_play=6, dealing_card_strategy=DealingCardSeededStrategy(),
+                              save_filename=basename, duplicate=True, nr_workers=nr_workers, shard_size=3)
+                arena.set_players(AgentFirstCard(0), AgentFirstCard(MAX_TRUMP), AgentFirstCard(0),
+                                  AgentFirstCard(MAX_TRUMP), north_id=1, east_id=2, south_id=1, west_id=2)
+                arena.play_all_games()
+                results.append(arena.paired_differences)
+                mean, lower, upper = arena.duplicate_result()
+                self.assertAlmostEqual(mean, arena.paired_differences.mean())
+                self.assertLessEqual(lower, mean)
+                self.assertGreaterEqual(upper, mean)
+
+                with open(basename + '0001.txt') as file:
+                    games = [GameLogEntry.from_json(json.loads(line)) for line in file]
+                for first, second in zip(games[0::2], games[1::2]):
+                    self.assertEqual([1, 2, 1, 2], first.player_ids)
+                    self.assertEqual([2, 1, 2, 1], second.player_ids)
+                    self.assertEqual(first.game.dealer, second.game.dealer)
+                    self.assertEqual(first.game.trick_first_player[0], second.game.trick_first_player[0])
+                    np.testing.assert_array_equal(_dealt_cards(first.game), _dealt_cards(second.game))
+            np.testing.assert_array_equal(results[0], results[1])
+
+    def test_seed_players(self):
+        players = [AgentSeeded(), AgentSeeded(), AgentSeeded(), AgentRandomSchieber()]
+        seed_players(players, 5)
+        seeds = [player.seed for player in players[0:3]]
+        self.assertEqual(3, len(set(seeds)))
+        other = [AgentSeeded(), AgentSeeded(), AgentSeeded()]
+        seed_players(other, 5)
+        self.assertEqual(seeds, [player.seed for player in other])
+
+        # two random agents play with different random numbers
+        first = AgentRandomSchieber()
+        second = AgentRandomSchieber()
+        seed_players([first, second], 1)
+        self.assertNotEqual([first._rng.random() for _ in range(3)], [second._rng.random() for _ in range(3)])
+
+    def test_arena_parallel_mcts(self):
+        results = []
+        for nr_workers in [1, 2]:
+            arena = Arena(nr_games_to_play=4, dealing_card_strategy=DealingCardSeededRandomStrategy(seed=1),
+                          print_every_x_games=1, nr_workers=nr_workers, shard_size=2, seed=3)
+            mcts = MCTS_agent(max_iterations=10)
+            rule_based = Agent_rulebased()
+            arena.set_players(mcts, rule_based, mcts, rule_based)
+            arena.play_all_games()
+            self.assertEqual(4, arena.nr_games_played)
+            np.testing.assert_array_equal(157, arena.points_team_0 + arena.points_team_1)
+            results.append(arena.points_team_0.copy())
+        np.testing.assert_array_equal(results[0], results[1])
+
+    def test_arena_parallel_exception(self):
+        with tempfile.TemporaryDirectory() as directory:
+            arena = Arena(nr_games_to_play=4, save_filename=os.path.join(directory, 'games_'), nr_workers=1,
+                          shard_size=2)
+            arena.set_players(AgentFailing(), AgentFirstCard(), AgentFirstCard(), AgentFirstCard())
+            with self.assertRaises(RuntimeError):
+                arena.play_all_games()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -15,6 +15,20 @@ class JassConstTestCase(unittest.TestCase):
             # 9 cards per color
             self.assertEqual(9, color_masks[color, :].sum())
 
+    def test_trick_strength(self):
+        for trump in range(MAX_TRUMP + 1):
+            for color in range(4):
+                # the cards of the color played can always win
+                self.assertTrue(np.all(trick_strength[trump, color, color_masks[color, :] == 1] > 0))
+                # all cards that can win have a different strength
+                strength = trick_strength[trump, color, :]
+                self.assertEqual(np.count_nonzero(strength), np.unique(strength[strength > 0]).size)
+        # trump jack is the highest card, trump nine the second highest
+        self.assertEqual(19, trick_strength[HEARTS, DIAMONDS, HJ])
+        self.assertEqual(18, trick_strength[HEARTS, DIAMONDS, H9])
+        self.assertEqual(0, trick_strength[HEARTS, DIAMONDS, SA])
+        self.assertEqual(0, trick_strength[OBE_ABE, DIAMONDS, SA])
+
     def test_conversions(self):
         cards = get_cards_encoded([DA, C6])
         self.assertEqual(36, cards.size)
@@ -0,0 +1,75 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+
+from jass.agents.agent_random_schieber import AgentRandomSchieber
+from jass.arena.arena import Arena
+from jass.arena.dealing_card_file_strategy import DealingCardFileStrategy, save_deals
+from jass.arena.dealing_card_seeded_random_strategy import DealingCardSeededRandomStrategy
+from jass.game.game_util import deal_hands_from_cards
+
+
+class DealingCardStrategyTestCase(unittest.TestCase):
+    def test_deal_hands_from_cards(self):
+        cards = np.array([np.random.permutation(36) for _ in range(3)])
+        hands = deal_hands_from_cards(cards)
+        self.assertEqual((3, 4, 36), hands.shape)
+        for deal in range(3):
+            np.testing.assert_array_equal(hands[deal], deal_hands_from_cards(cards[deal]))
+            for player in range(4):
+                np.testing.assert_array_equal(np.sort(cards[deal, player * 9:player * 9 + 9]),
+                                              np.flatnonzero(hands[deal, player]))
+
+    def test_seeded_random(self):
+        strategy = DealingCardSeededRandomStrategy(seed=3, batch_size=8)
+        cards = strategy.get_cards(0, 20)
+        self.assertEqual((20, 36), cards.shape)
+        np.testing.assert_array_equal(np.arange(36), np.sort(cards, axis=1)[5])
+        self.assertFalse(np.array_equal(cards[0], cards[8]))
+
+        # the deals only depend on the seed and the game number
+        other = DealingCardSeededRandomStrategy(seed=3, batch_size=8)
+        np.testing.assert_array_equal(cards[5:13], other.get_cards(5, 13))
+        for game_nr in [17, 2, 9]:
+            np.testing.assert_array_equal(deal_hands_from_cards(cards[game_nr]), other.deal_cards(game_nr))
+        self.assertFalse(np.array_equal(cards, DealingCardSeededRandomStrategy(seed=4, batch_size=8).get_cards(0, 20)))
+
+        # a strategy without seed can be reproduced from its entropy
+        strategy = DealingCardSeededRandomStrategy()
+        np.testing.assert_array_equal(strategy.get_cards(0, 3),
+                                      DealingCardSeededRandomStrategy(strategy.entropy).get_cards(0, 3))
+
+    def test_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'deals.npy')
+            save_deals(filename, 10, seed=5)
+            strategy = DealingCardFileStrategy(filename)
+            self.assertEqual(10, strategy.nr_deals)
+            seeded = DealingCardSeededRandomStrategy(seed=5)
+            for game_nr in range(10):
+                np.testing.assert_array_equal(seeded.deal_cards(game_nr), strategy.deal_cards(game_nr))
+            with self.assertRaises(ValueError):
+                strategy.deal_cards(10)
+
+            copy = pickle.loads(pickle.dumps(strategy))
+            self.assertIsNone(copy._cards)
+            np.testing.assert_array_equal(strategy.deal_cards(4), copy.deal_cards(4))
+
+            # parallel arenas replay the same deals
+            results = []
+            for nr_workers in [1, 2]:
+                arena = Arena(nr_games_to_play=10, dealing_card_strategy=DealingCardFileStrategy(filename),
+                              print_every_x_games=10, nr_workers=nr_workers, shard_size=3, seed=1)
+                player = AgentRandomSchieber()
+                arena.set_players(player, player, player, player)
+                arena.play_all_games()
+                self.assertEqual(10, arena.nr_games_played)
+                results.append(arena.points_team_0.copy())
+            np.testing.assert_array_equal(results[0], results[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import random
+import unittest
+
+import numpy as np
+
+from jass.game.bitboard import ALL_CARDS_BITS, cards_to_bits, card_list_to_bits, count_bits
+from jass.game.const import *
+from jass.game.determinization import HandSampler, infer_excluded_cards
+from jass.game.game_sim import GameSim
+from jass.game.game_state_util import observation_from_state
+from jass.game.game_util import deal_random_hand, get_cards_encoded
+from jass.game.rule_schieber import RuleSchieber
+
+
+class DeterminizationTestCase(unittest.TestCase):
+    def test_excluded_cards(self):
+        game = GameSim(rule=RuleSchieber())
+        game.init_from_cards(hands=deal_random_hand(), dealer=NORTH)
+        game.action_trump(HEARTS)
+        # trick: west leads diamonds, south does not follow with a club, east trumps, north plays trump jack
+        game.state.hands[:, :] = 0
+        game.state.hands[WEST, :] = get_cards_encoded([DA, D6, C9])
+        game.state.hands[SOUTH, :] = get_cards_encoded([CA, C6, S9])
+        game.state.hands[EAST, :] = get_cards_encoded([H6, D7, S6])
+        game.state.hands[NORTH, :] = get_cards_encoded([HJ, HA, D8])
+        for card in [DA, CA, H6, HJ]:
+            game.action_play_card(card)
+
+        excluded = infer_excluded_cards(game.get_observation())
+        self.assertEqual(0, excluded[WEST])
+        self.assertEqual(cards_to_bits(get_cards_encoded(list(range(DA, D6 + 1)))), excluded[SOUTH])
+        self.assertEqual(0, excluded[EAST])
+        self.assertEqual(0, excluded[NORTH])
+
+    def test_sample(self):
+        rng = random.Random(1)
+        rule = RuleSchieber()
+        game = GameSim(rule=rule)
+        game.init_from_cards(hands=deal_random_hand(), dealer=WEST)
+        game.action_trump(SPADES)
+        while not game.is_done():
+            obs = game.get_observation()
+            sampler = HandSampler(obs)
+            excluded = infer_excluded_cards(obs)
+            for player in range(4):
+                # the actual hands are consistent with the observation
+                self.assertEqual(0, cards_to_bits(game.state.hands[player]) & excluded[player])
+            for _ in range(10):
+                hands = sampler.sample(rng)
+                self.assertEqual(cards_to_bits(obs.hand), hands[obs.player_view])
+                self.assertEqual(0, hands[0] & hands[1] | hands[0] & hands[2] | hands[0] & hands[3] |
+                                 hands[1] & hands[2] | hands[1] & hands[3] | hands[2] & hands[3])
+                for player in range(4):
+                    self.assertEqual(int(game.state.hands[player].sum()), count_bits(hands[player]))
+                    self.assertEqual(0, hands[player] & excluded[player])
+            game.action_play_card(np.random.choice(np.flatnonzero(rule.get_valid_cards_from_state(game.state))))
+
+    def test_sample_tight_constraints(self):
+        # after 4 tricks with obe abe, diamonds can only be with west, hearts with west or east, spades with west
+        # or south and clubs with south or east, which the fast sampling often fails to deal
+        hands = np.zeros((4, 36), dtype=np.int32)
+        hands[NORTH] = get_cards_encoded([D6, H7, CK, S7, DJ, D9, D8, D7, S6])
+        hands[EAST] = get_cards_encoded([C7, HA, C9, H8, H9, HQ, HJ, H10, CA])
+        hands[SOUTH] = get_cards_encoded([C6, C8, C10, S9, SQ, SJ, S10, CQ, CJ])
+        hands[WEST] = get_cards_encoded([DA, H6, D10, S8, DK, DQ, HK, SA, SK])
+        game = GameSim(rule=RuleSchieber())
+        game.init_from_cards(hands=hands, dealer=EAST)
+        game.action_trump(OBE_ABE)
+        for card in [D6, DA, C6, C7, H6, C8, HA, H7, C9, CK, D10, C10, S7, S8, S9, H8]:
+            self.assertEqual(1, game.rule.get_valid_cards_from_state(game.state)[card])
+            game.action_play_card(card)
+        obs = observation_from_state(game.state, NORTH)
+
+        excluded = infer_excluded_cards(obs)
+        sampler = HandSampler(obs, max_tries=1)
+        rng = random.Random(2)
+        for _ in range(200):
+            sampled = sampler.sample(rng)
+            self.assertEqual(cards_to_bits(obs.hand), sampled[NORTH])
+            self.assertEqual(ALL_CARDS_BITS & ~cards_to_bits(obs.hand) & ~card_list_to_bits(obs.tricks.flatten()),
+                             sampled[EAST] | sampled[SOUTH] | sampled[WEST])
+            for player in range(4):
+                self.assertEqual(int(game.state.hands[player].sum()), count_bits(sampled[player]))
+                self.assertEqual(0, sampled[player] & excluded[player])
+        self.assertGreater(sampler.nr_fallbacks, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
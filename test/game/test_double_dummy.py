@@ -0,0 +1,80 @@
+import unittest
+
+import numpy as np
+
+from jass.agents.agent_cheating_double_dummy import AgentCheatingDoubleDummy
+from jass.agents.agent_cheating_random_schieber import AgentCheatingRandomSchieber
+from jass.arena.arena import Arena
+from jass.game.const import *
+from jass.game.double_dummy import DoubleDummySolver
+from jass.game.game_sim import GameSim
+from jass.game.game_util import deal_random_hand
+from jass.game.rule_schieber import RuleSchieber
+
+
+def _minimax(game: GameSim) -> int:
+    # points of team 0 at the end of the game by searching all cards
+    state = game.state
+    if state.nr_played_cards == 36:
+        return int(state.points[0])
+    values = []
+    for card in np.flatnonzero(game.rule.get_valid_cards_from_state(state)):
+        game.action_play_card(card)
+        values.append(_minimax(game))
+        game.undo_action()
+    return max(values) if team[state.player] == 0 else min(values)
+
+
+class DoubleDummyTestCase(unittest.TestCase):
+    def _position(self, seed: int, nr_remaining: int) -> GameSim:
+        rng = np.random.default_rng(seed)
+        game = GameSim(rule=RuleSchieber())
+        game.init_from_cards(hands=deal_random_hand(), dealer=seed % 4)
+        game.action_trump(seed % 6)
+        while game.state.nr_played_cards < 36 - nr_remaining:
+            game.action_play_card(rng.choice(np.flatnonzero(game.rule.get_valid_cards_from_state(game.state))))
+        return game
+
+    def test_solve(self):
+        solver = DoubleDummySolver()
+        for seed in range(24):
+            game = self._position(seed, 5 + seed % 4)
+            state = game.state.copy()
+            points = solver.solve(game.state)
+            self.assertEqual(157, points.sum())
+            self.assertEqual(_minimax(game), points[0])
+            self.assertEqual(state, game.state)
+
+            # the value of the best card is the value of the position
+            values = solver.evaluate_cards(game.state)
+            valid = game.rule.get_valid_cards_from_state(game.state)
+            np.testing.assert_array_equal(valid == 1, values >= 0)
+            self.assertEqual(points[team[game.state.player]], values.max())
+
+    def test_solve_end_of_game(self):
+        game = self._position(1, 0)
+        np.testing.assert_array_equal(game.state.points, DoubleDummySolver().solve(game.state))
+
+    def test_solve_larger(self):
+        # the value does not change along the optimal line of play
+        game = self._position(7, 16)
+        solver = DoubleDummySolver()
+        points = solver.solve(game.state)
+        while not game.is_done():
+            values = solver.evaluate_cards(game.state)
+            self.assertEqual(points[team[game.state.player]], values.max())
+            game.action_play_card(int(np.argmax(values)))
+        np.testing.assert_array_equal(points, game.state.points)
+
+    def test_agent(self):
+        arena = Arena(nr_games_to_play=2, cheating_mode=True, check_move_validity=True)
+        arena.set_players(AgentCheatingDoubleDummy(max_cards_to_solve=12, nr_playouts=4, seed=1),
+                          AgentCheatingRandomSchieber(),
+                          AgentCheatingDoubleDummy(max_cards_to_solve=12, nr_playouts=4, seed=2),
+                          AgentCheatingRandomSchieber())
+        arena.play_all_games()
+        self.assertEqual(2, arena.nr_games_played)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from jass.game.bitboard import cards_to_bits
+from jass.game.const import *
+from jass.game.double_dummy import DoubleDummySolver
+from jass.game.endgame_table import EndgameTable, canonical_position, fill_from_random_games
+from jass.game.game_sim import GameSim
+from jass.game.game_util import deal_random_hand
+from jass.game.rollout import RolloutEngine
+from jass.game.rule_schieber import RuleSchieber
+
+
+class EndgameTableTestCase(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self._dir.name, 'endgame.bin')
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _endgame(self, seed: int, nr_tricks: int) -> GameSim:
+        rng = np.random.default_rng(seed)
+        game = GameSim(rule=RuleSchieber())
+        game.init_from_cards(hands=deal_random_hand(), dealer=seed % 4)
+        game.action_trump(seed % 6)
+        while game.state.nr_played_cards < 36 - 4 * nr_tricks:
+            game.action_play_card(rng.choice(np.flatnonzero(game.rule.get_valid_cards_from_state(game.state))))
+        return game
+
+    def test_canonical_position(self):
+        hands = [cards_to_bits(hand) for hand in deal_random_hand()]
+        # exchange hearts and clubs
+        swapped = [(hand & ~(0x1FF << 9) & ~(0x1FF << 27)) | ((hand >> 9) & 0x1FF) << 27 |
+                   ((hand >> 27) & 0x1FF) << 9 for hand in hands]
+        for trump in [DIAMONDS, SPADES, OBE_ABE, UNE_UFE]:
+            self.assertEqual(canonical_position(hands, EAST, trump), canonical_position(swapped, EAST, trump))
+        self.assertNotEqual(canonical_position(hands, EAST, HEARTS), canonical_position(swapped, EAST, HEARTS))
+
+        # rotating the players
+        rotated = [hands[(player + 1) % 4] for player in range(4)]
+        self.assertEqual(canonical_position(hands, NORTH, CLUBS), canonical_position(rotated, WEST, CLUBS))
+
+        # trump becomes diamonds
+        kind, canonical = canonical_position(hands, SOUTH, HEARTS)
+        self.assertEqual(0, kind)
+        self.assertEqual((hands[SOUTH] >> 9) & 0x1FF, canonical[0] & 0x1FF)
+
+    def test_value(self):
+        table = EndgameTable.create(self.filename, nr_tricks=3, capacity=1000)
+        self.assertEqual(1024, table.capacity)
+        solver = DoubleDummySolver()
+        for seed in range(12):
+            game = self._endgame(seed, 1 + seed % 3)
+            state = game.state
+            hands = [cards_to_bits(hand) for hand in state.hands]
+            self.assertEqual(-1, table.lookup(hands, state.player, state.trump))
+            expected = solver.solve_position(hands, [-1, -1, -1, -1], 0, state.player, state.player, state.trump)
+            self.assertEqual(expected, table.value(hands, state.player, state.trump))
+            self.assertEqual(expected, table.lookup(hands, state.player, state.trump))
+        self.assertEqual(12, table.nr_entries)
+        table.flush()
+
+        # the entries are in the file
+        read_only = EndgameTable(self.filename)
+        self.assertEqual(3, read_only.nr_tricks)
+        self.assertEqual(12, read_only.nr_entries)
+        game = self._endgame(100, 2)
+        hands = [cards_to_bits(hand) for hand in game.state.hands]
+        read_only.value(hands, game.state.player, game.state.trump)
+        self.assertEqual(12, read_only.nr_entries)
+
+    def test_value_random_positions(self):
+        table = EndgameTable.create(self.filename, nr_tricks=3, capacity=1 << 10)
+        solver = DoubleDummySolver()
+        np.random.seed(3)
+        for seed in range(300):
+            game = self._endgame(1000 + seed, 2 + seed % 2)
+            state = game.state
+            hands = [cards_to_bits(hand) for hand in state.hands]
+            expected = solver.solve_position(hands, [-1, -1, -1, -1], 0, state.player, state.player, state.trump)
+            self.assertEqual(expected, table.value(hands, state.player, state.trump))
+            self.assertEqual(expected, table.lookup(hands, state.player, state.trump))
+
+    def test_rollout_and_solver(self):
+        table = EndgameTable.create(self.filename, nr_tricks=2, capacity=1 << 12)
+        fill_from_random_games(table, 20, seed=1)
+        self.assertGreater(table.nr_entries, 30)
+
+        game = self._endgame(3, 2)
+        state = game.state
+        hands = [cards_to_bits(hand) for hand in state.hands]
+        table.value(hands, state.player, state.trump)
+
+        # the playouts end with the exact value of the table
+        points = RolloutEngine(seed=1, endgame_table=table).rollout(state, 10)
+        expected = DoubleDummySolver().solve(state)
+        np.testing.assert_array_equal(np.tile(expected, (10, 1)), points)
+
+        game = self._endgame(4, 4)
+        self.assertEqual(DoubleDummySolver().solve(game.state).tolist(),
+                         DoubleDummySolver(endgame_table=table).solve(game.state).tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
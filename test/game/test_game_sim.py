@@ -1,3 +1,4 @@
+import copy
 import unittest
 import numpy as np
 
@@ -7,6 +8,8 @@ from jass.game.game_sim import GameSim
 from jass.game.game_state import GameState
 from jass.game.game_util import deal_random_hand, get_cards_encoded
 from jass.game.rule_schieber import RuleSchieber
+from jass.game.game_state_util import observation_from_state
+from jass.game.zobrist import hash_state
 
 
 class GameSimTestCase(unittest.TestCase):
@@ -25,6 +28,82 @@ class GameSimTestCase(unittest.TestCase):
             game.action_play_card(card)
             game.rule.assert_invariants(game.state)
 
+    def test_undo_action(self):
+        rule = RuleSchieber()
+        game = GameSim(rule=rule)
+        game.init_from_cards(hands=deal_random_hand(), dealer=EAST)
+
+        states = []
+        while not game.is_done():
+            states.append(copy.deepcopy(game.state))
+            actions = rule.get_valid_actions_from_state(game.state)
+            game.action(np.random.choice(np.flatnonzero(actions)))
+        states.append(copy.deepcopy(game.state))
+        self.assertEqual(len(states) - 1, game.nr_moves)
+
+        for expected in reversed(states[:-1]):
+            game.undo_action()
+            self.assertEqual(expected, game.state)
+            # the current trick must still be a view into the tricks
+            self.assertTrue(np.shares_memory(game.state.current_trick, game.state.tricks))
+            rule.assert_invariants(game.state)
+
+        self.assertEqual(0, game.nr_moves)
+        with self.assertRaises(ValueError):
+            game.undo_action()
+
+    def test_hash(self):
+        rule = RuleSchieber()
+        game = GameSim(rule=rule)
+        game.init_from_cards(hands=deal_random_hand(), dealer=WEST)
+
+        hashes = [game.state.hash]
+        while not game.is_done():
+            actions = rule.get_valid_actions_from_state(game.state)
+            game.action(np.random.choice(np.flatnonzero(actions)))
+            # incremental hash must be the same as the hash calculated from scratch
+            self.assertEqual(hash_state(game.state), game.state.hash)
+            self.assertEqual(game.get_observation().hash, observation_from_state(game.state).hash)
+            hashes.append(game.state.hash)
+        self.assertEqual(len(hashes), len(set(hashes)))
+
+        while game.nr_moves > 0:
+            game.undo_action()
+            hashes.pop()
+            self.assertEqual(hashes[-1], game.state.hash)
+            self.assertEqual(hash_state(game.state), game.state.hash)
+
+    def test_hash_transposition(self):
+        # different cards played give a different hash
+        rule = RuleSchieber()
+        hands = np.array([
+            get_cards_encoded([C6, S7, S9, HQ, DA, CA, S8, D6, S10]),      # N
+            get_cards_encoded([CK, C10, D10, H6, H7, H9, HK, DQ, D8]),     # E
+            get_cards_encoded([C7, SA, SQ, HJ, C9, DJ, CQ, DK, C8]),       # S
+            get_cards_encoded([CJ, SJ, S6, H10, H8, HA, SK, D9, D7]),      # W
+        ], dtype=np.int32)
+        hashes = []
+        for cards in [[C7, C10, C6, CJ], [C7, CK, CA, CJ]]:
+            game = GameSim(rule=rule)
+            game.init_from_cards(hands=hands, dealer=WEST)
+            game.action_trump(U)
+            for card in cards:
+                game.action_play_card(card)
+            hashes.append(game.state.hash)
+        self.assertNotEqual(hashes[0], hashes[1])
+
+        # the order of the cards in completed tricks is not part of the hash
+        state = game.state.copy()
+        state.tricks[0, :] = [CJ, CA, CK, C7]
+        self.assertEqual(hashes[1], hash_state(state))
+
+        # but the order in the current trick is
+        game.action_play_card(S7)
+        game.action_play_card(SJ)
+        state = game.state.copy()
+        state.tricks[1, 0:2] = [SJ, S7]
+        self.assertNotEqual(game.state.hash, hash_state(state))
+
     def test_calc_points(self):
         rule = RuleSchieber()
         trick = np.array([SA, SK, SQ, SJ])
@@ -92,6 +171,33 @@ class GameSimTestCase(unittest.TestCase):
         trick = np.array([SA, D6, D7, S9])
         self.assertEqual(rule.calc_winner(trick, first_player, trump=OBE_ABE), EAST)
         
+    def test_calc_winner_strength_table(self):
+        rule = RuleSchieber()
+        rule_table = RuleSchieber(use_strength_table=True)
+        rng = np.random.default_rng(4)
+        for trump in range(MAX_TRUMP + 1):
+            for lead in range(36):
+                for _ in range(100):
+                    trick = np.concatenate([[lead], rng.choice(np.delete(np.arange(36), lead), 3, replace=False)])
+                    first_player = int(rng.integers(0, 4))
+                    self.assertEqual(rule.calc_winner(trick, first_player, trump),
+                                     rule_table.calc_winner(trick, first_player, trump))
+
+    def test_calc_winner_and_points_batch(self):
+        rule = RuleSchieber()
+        rng = np.random.default_rng(3)
+        nr_tricks = 6000
+        tricks = np.array([rng.permutation(36)[0:4] for _ in range(nr_tricks)], dtype=np.int32)
+        first_player = rng.integers(0, 4, size=nr_tricks)
+        trumps = np.arange(nr_tricks) % 6
+        is_last = rng.integers(0, 2, size=nr_tricks).astype(bool)
+
+        winners = rule.calc_winner_batch(tricks, first_player, trumps)
+        points = rule.calc_points_batch(tricks, is_last, trumps)
+        for i in range(nr_tricks):
+            self.assertEqual(rule.calc_winner(tricks[i], first_player[i], trumps[i]), winners[i])
+            self.assertEqual(rule.calc_points(tricks[i], is_last[i], trumps[i]), points[i])
+
     def test_complete_game(self):
         # replay game manually from a log file entry
         # {"trump":5,"dealer":3,"tss":1,"tricks":[{"cards":["C7","CK","C6","CJ"],"points":17,"win":0,"first":2},
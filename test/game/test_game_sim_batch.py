@@ -0,0 +1,58 @@
+import unittest
+
+import numpy as np
+
+from jass.game.const import *
+from jass.game.game_sim import GameSim
+from jass.game.game_sim_batch import GameSimBatch
+from jass.game.game_util import deal_random_hand
+from jass.game.rule_schieber import RuleSchieber
+
+
+class GameSimBatchTestCase(unittest.TestCase):
+    def test_same_as_game_sim(self):
+        rule = RuleSchieber()
+        nr_games = 24
+        rng = np.random.default_rng(7)
+        hands = np.array([deal_random_hand() for _ in range(nr_games)])
+        dealers = np.arange(nr_games) % 4
+
+        batch = GameSimBatch(rule=rule, nr_games=nr_games)
+        batch.init_from_cards(hands, dealers)
+
+        games = []
+        for i in range(nr_games):
+            game = GameSim(rule=rule)
+            game.init_from_cards(hands[i], int(dealers[i]))
+            games.append(game)
+
+        # push in half the games, then select all the different trumps
+        trumps = np.arange(nr_games) % 6
+        push = np.where(np.arange(nr_games) % 2 == 0, PUSH, trumps)
+        batch.action_trump(push)
+        pushed = np.flatnonzero(push == PUSH)
+        batch.action_trump(trumps[pushed], games=pushed)
+        for i in range(nr_games):
+            games[i].action_trump(int(push[i]))
+            if push[i] == PUSH:
+                games[i].action_trump(int(trumps[i]))
+
+        for i in range(nr_games):
+            self.assertEqual(games[i].state, batch.get_state(i))
+
+        while not np.all(batch.is_done()):
+            valid = batch.get_valid_cards()
+            cards = (rng.random(valid.shape) * valid).argmax(axis=1)
+            batch.action_play_card(cards)
+            for i in range(nr_games):
+                np.testing.assert_array_equal(rule.get_valid_cards_from_state(games[i].state), valid[i])
+                games[i].action_play_card(int(cards[i]))
+                self.assertEqual(games[i].state, batch.get_state(i))
+
+        for i in range(nr_games):
+            rule.assert_invariants(batch.get_state(i))
+            self.assertEqual(games[i].get_observation(), batch.get_observation(i))
+
+
+if __name__ == '__main__':
+    unittest.main()
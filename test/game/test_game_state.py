@@ -8,8 +8,10 @@ from jass.game.const import NORTH, PUSH
 from jass.game.game_observation import GameObservation
 from jass.game.game_sim import GameSim
 from jass.game.game_state import GameState
+from jass.game.game_state_pool import GameStatePool
 from jass.game.game_state_util import observation_from_state, calculate_starting_hands_from_game, \
-    state_from_complete_game, state_for_trump_from_complete_game, state_from_observation
+    state_from_complete_game, state_for_trump_from_complete_game, state_from_observation, \
+    observation_view_from_state
 from jass.game.game_util import deal_random_hand
 from jass.game.rule_schieber import RuleSchieber
 
@@ -41,6 +43,39 @@ class MyTestCase(unittest.TestCase):
         # deep copy keeps value
         self.assertEqual(0, game_state_deep.hands[0, 0])
 
+    def test_copy_method(self):
+        rule = RuleSchieber()
+        game_sim = GameSim(rule=rule)
+        game_sim.init_from_cards(deal_random_hand(), NORTH)
+        game_sim.action_trump(PUSH)
+        game_sim.action_trump(0)
+        pool = GameStatePool(initial_size=1)
+
+        while not game_sim.is_done():
+            state = game_sim.state
+            state_copy = state.copy()
+            state_pooled = pool.clone(state)
+            self.assertEqual(state, state_copy)
+            self.assertEqual(state, state_pooled)
+            self.assertFalse(np.shares_memory(state.hands, state_copy.hands))
+            self.assertTrue(np.shares_memory(state_copy.current_trick, state_copy.tricks))
+            self.assertTrue(np.shares_memory(state_pooled.current_trick, state_pooled.tricks))
+            pool.release(state_pooled)
+
+            # continue the game on the copy, the original must not change
+            game_copy = GameSim(rule=rule)
+            game_copy.init_from_state(state)
+            card = np.flatnonzero(rule.get_valid_cards_from_state(state))[0]
+            game_copy.action_play_card(card)
+            rule.assert_invariants(game_copy.state)
+            self.assertEqual(state, state_copy)
+
+            game_sim.action_play_card(card)
+            self.assertEqual(game_sim.state, game_copy.state)
+
+        self.assertIsNone(game_sim.state.copy().current_trick)
+        self.assertEqual(1, pool.nr_free)
+
     def test_eq(self):
         game_sim = GameSim(rule=RuleSchieber())
 
@@ -187,6 +222,32 @@ class MyTestCase(unittest.TestCase):
             state_back = state_from_observation(obs, game.state.hands)
             self.assertTrue(game.state == state_back)
 
+    def test_obs_reuse_and_view(self):
+        rule = RuleSchieber()
+        game = GameSim(rule=rule)
+        agent = AgentRandomSchieber()
+        game.init_from_cards(hands=deal_random_hand(), dealer=NORTH)
+        game.action_trump(agent.action_trump(game.get_observation()))
+
+        obs_reused = GameObservation()
+        while True:
+            obs = game.get_observation()
+            self.assertIs(obs_reused, game.get_observation(obs_reused))
+            self.assertEqual(obs, obs_reused)
+            for player in range(4):
+                self.assertEqual(observation_from_state(game.state, player),
+                                 observation_view_from_state(game.state, player))
+
+            view = game.get_observation_view()
+            self.assertEqual(obs, view)
+            self.assertFalse(view.tricks.flags.writeable)
+            self.assertTrue(np.shares_memory(view.tricks, game.state.tricks))
+            with self.assertRaises(ValueError):
+                view.hand[0] = 1
+            if game.is_done():
+                break
+            game.action_play_card(agent.action_play_card(obs))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+
+import numpy as np
+
+from jass.game.const import *
+from jass.game.game_sim import GameSim
+from jass.game.game_state import GameState
+from jass.game.game_state_compact import GameStateCompact, GameStateCompactArray, BUFFER_SIZE
+from jass.game.game_util import deal_random_hand
+from jass.game.rule_schieber import RuleSchieber
+
+
+class GameStateCompactTestCase(unittest.TestCase):
+    def test_new_state(self):
+        compact = GameStateCompact()
+        self.assertEqual(GameState(), compact.to_state())
+        self.assertEqual(BUFFER_SIZE, compact.buffer.nbytes)
+        self.assertFalse(hasattr(compact, '__dict__'))
+        self.assertEqual(('_buffer', '_hash'), GameStateCompact.__slots__)
+        self.assertIs(NotImplemented, compact.__eq__(GameState()))
+        self.assertNotEqual(compact, None)
+
+        # the current trick can not be set to another trick
+        compact.current_trick = compact.tricks[0, :]
+        with self.assertRaises(ValueError):
+            compact.current_trick = compact.tricks[1, :]
+        with self.assertRaises(ValueError):
+            compact.current_trick = None
+
+    def test_array(self):
+        states = GameStateCompactArray(3)
+        self.assertEqual(3, len(states))
+        self.assertEqual((3, BUFFER_SIZE), states.buffers.shape)
+        self.assertEqual(GameState(), states[1].to_state())
+
+        game = GameSim(rule=RuleSchieber())
+        game.init_from_state(GameStateCompact())
+        game.init_from_cards(hands=deal_random_hand(), dealer=WEST)
+        game.action_trump(CLUBS)
+        game.action_play_card(int(np.flatnonzero(game.state.hands[game.state.player])[0]))
+        states[2] = game.state
+        self.assertEqual(game.state, states[2])
+
+        # the state of a row is a view onto the row
+        state = states[0]
+        state.dealer = EAST
+        state.hands[NORTH, 5] = 1
+        self.assertEqual(EAST, states[0].dealer)
+        self.assertEqual(1, states.buffers[0].reshape(-1)[-144 + 5])
+
+    def test_play_game(self):
+        rule = RuleSchieber()
+        hands = deal_random_hand()
+
+        game = GameSim(rule=rule)
+        game.init_from_cards(hands=hands, dealer=SOUTH)
+        game_compact = GameSim(rule=rule)
+        game_compact.init_from_state(GameStateCompact())
+        game_compact.init_from_cards(hands=hands, dealer=SOUTH)
+        self.assertIsInstance(game_compact.state, GameStateCompact)
+
+        game.action_trump(PUSH)
+        game_compact.action_trump(PUSH)
+        game.action_trump(HEARTS)
+        game_compact.action_trump(HEARTS)
+
+        while not game.is_done():
+            card = np.random.choice(np.flatnonzero(rule.get_valid_cards_from_state(game.state)))
+            np.testing.assert_array_equal(rule.get_valid_cards_from_state(game.state),
+                                          rule.get_valid_cards_from_state(game_compact.state))
+            game.action_play_card(card)
+            game_compact.action_play_card(card)
+            rule.assert_invariants(game_compact.state)
+            self.assertEqual(game.state, game_compact.state.to_state())
+            self.assertEqual(game.get_observation(), game_compact.get_observation())
+
+            # serialize and copy
+            state = game_compact.state
+            self.assertEqual(state, GameStateCompact.frombytes(state.tobytes()))
+            self.assertEqual(state, state.copy())
+            self.assertEqual(state, GameStateCompact.from_state(game.state))
+
+        self.assertEqual(game.state.to_json(), game_compact.state.to_json())
+
+        # undo works on the compact state as well
+        while game_compact.nr_moves > 0:
+            game.undo_action()
+            game_compact.undo_action()
+            self.assertEqual(game.state, game_compact.state.to_state())
+
+
+if __name__ == '__main__':
+    unittest.main()
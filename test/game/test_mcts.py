@@ -0,0 +1,193 @@
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from jass.agents.MCTS_logic import MCTS_logic
+from jass.agents.mcts_tree import MCTSTree
+from jass.game.const import *
+from jass.game.game_sim import GameSim
+from jass.game.game_util import deal_random_hand
+from jass.game.rule_schieber import RuleSchieber
+
+
+class MCTSTestCase(unittest.TestCase):
+    def test_tree(self):
+        tree = MCTSTree(capacity=5)
+        root = tree.clear(player=WEST)
+        self.assertTrue(tree.expand(root, [3, 7], NORTH))
+        self.assertEqual(range(1, 3), tree.children(root))
+        self.assertFalse(tree.expand(1, [1, 2, 4], EAST))
+        self.assertFalse(tree.is_expanded(1))
+
+        # unvisited children are selected first
+        self.assertEqual(1, tree.select_child_ucb1(root, 1.0))
+        tree.backpropagate([root, 1], 0.25)
+        self.assertEqual(2, tree.select_child_ucb1(root, 1.0))
+        tree.backpropagate([root, 2], 0.75)
+        self.assertEqual(2, tree.select_child_ucb1(root, 1.0))
+
+        # payoff is stored for the team of the player of the node
+        self.assertEqual(0.25, tree.total_payoff[1])
+        self.assertEqual(0.75, tree.total_payoff[2])
+        self.assertEqual(1.0 - 0.25 + 1.0 - 0.75, tree.total_payoff[root])
+
+    def test_reroot(self):
+        tree = MCTSTree(capacity=20)
+        root = tree.clear(player=WEST)
+        tree.expand(root, [1, 2, 3], NORTH)
+        tree.expand(2, [4, 5], EAST)
+        tree.expand(1, [6, 7], EAST)
+        tree.expand(7, [8, 9, 10], SOUTH)
+        tree.backpropagate([root, 1, 7, 8], 0.5)
+        tree.backpropagate([root, 1, 6], 1.0)
+        tree.backpropagate([root, 1, 7, 10], 0.0)
+        self.assertEqual(7, tree.find_child(1, 7))
+        self.assertEqual(-1, tree.find_child(1, 5))
+
+        # the subtree of the child for card 1 is moved to the start
+        self.assertEqual(0, tree.reroot(1))
+        self.assertEqual(6, tree.nr_nodes)
+        self.assertEqual([1, 6, 7, 8, 9, 10], tree.card[0:6].tolist())
+        self.assertEqual([-1, 0, 0, 2, 2, 2], tree.parent[0:6].tolist())
+        self.assertEqual([1, -1, 3, -1, -1, -1], tree.first_child[0:6].tolist())
+        self.assertEqual([3, 1, 2, 1, 0, 1], tree.count[0:6].tolist())
+        self.assertEqual([1.5, 0.0, 1.5, 0.5, 0.0, 0.0], tree.total_payoff[0:6].tolist())
+        self.assertEqual(1, tree.find_child(0, 6))
+        self.assertEqual(5, tree.find_child(2, 10))
+
+    def test_play_game(self):
+        rule = RuleSchieber()
+        game = GameSim(rule=rule)
+        game.init_from_cards(hands=deal_random_hand(), dealer=NORTH)
+        game.action_trump(SPADES)
+        mcts = MCTS_logic('test', iterations=50, seed=1)
+
+        while not game.is_done():
+            obs = game.get_observation()
+            valid = np.flatnonzero(rule.get_valid_cards_from_obs(obs))
+            card = mcts.choose_card(obs)
+            self.assertIn(card, valid)
+            if len(valid) > 1:
+                tree = mcts.tree
+                self.assertEqual(50, tree.count[mcts.root])
+                self.assertEqual(50, tree.count[tree.children(mcts.root)].sum())
+                self.assertEqual(sorted(valid), sorted(tree.card[tree.children(mcts.root)]))
+            game.action_play_card(card)
+
+    def test_play_game_information_set(self):
+        rule = RuleSchieber()
+        game = GameSim(rule=rule)
+        game.init_from_cards(hands=deal_random_hand(), dealer=WEST)
+        game.action_trump(UNE_UFE)
+        mcts = MCTS_logic('test', iterations=50, seed=1, information_set=True)
+
+        while not game.is_done():
+            obs = game.get_observation()
+            valid = np.flatnonzero(rule.get_valid_cards_from_obs(obs))
+            card = mcts.choose_card(obs)
+            self.assertIn(card, valid)
+            if len(valid) > 1:
+                tree = mcts.tree
+                self.assertEqual(50, tree.count[tree.children(mcts.root)].sum())
+                # children of the other players are only visited if they are available in the sampled hands
+                count = tree.count[1:tree.nr_nodes]
+                available = tree.available[1:tree.nr_nodes]
+                self.assertTrue(np.all(available[count > 0] >= count[count > 0]))
+            game.action_play_card(card)
+
+    def test_time_budget(self):
+        game = GameSim(rule=RuleSchieber())
+        game.init_from_cards(hands=deal_random_hand(), dealer=SOUTH)
+        game.action_trump(CLUBS)
+        mcts = MCTS_logic('test', iterations=1, time_budget_ms=50, information_set=True)
+        card = mcts.choose_card(game.get_observation())
+
+        self.assertIn(card, np.flatnonzero(game.state.hands[game.state.player]))
+        self.assertGreater(mcts.last_iterations, 1)
+        self.assertEqual(mcts.last_iterations, mcts.tree.count[mcts.root])
+        self.assertTrue(0 < mcts.last_confidence <= 1)
+
+    def test_parallel(self):
+        game = GameSim(rule=RuleSchieber())
+        game.init_from_cards(hands=deal_random_hand(), dealer=NORTH)
+        game.action_trump(DIAMONDS)
+        valid = np.flatnonzero(game.state.hands[game.state.player])
+
+        mcts = MCTS_logic('test', iterations=30, information_set=True, nr_workers=2)
+        try:
+            for _ in range(2):
+                self.assertIn(mcts.choose_card(game.get_observation()), valid)
+                self.assertEqual(60, mcts.last_iterations)
+        finally:
+            mcts.close()
+
+        # the workers are started before the time of the first search is taken
+        mcts = MCTS_logic('test', time_budget_ms=20, nr_workers=2)
+        events = []
+        start_workers = mcts.start_workers
+        mcts.start_workers = lambda: (events.append('start_workers'), start_workers())
+        real_time = time.time
+        try:
+            with mock.patch('jass.agents.MCTS_logic.time') as mock_time:
+                mock_time.time.side_effect = lambda: (events.append('time'), real_time())[1]
+                self.assertIn(mcts.choose_card(game.get_observation()), valid)
+            self.assertEqual(['start_workers', 'time'], events[0:2])
+        finally:
+            mcts.close()
+
+    def test_reuse_tree(self):
+        # with a few deals, the opponents never play into an expanded node of the small tree
+        np.random.seed(1)
+        rule = RuleSchieber()
+        game = GameSim(rule=rule)
+        game.init_from_cards(hands=deal_random_hand(), dealer=SOUTH)
+        game.action_trump(HEARTS)
+        mcts = MCTS_logic('test', iterations=200, seed=1, information_set=True, reuse_tree=True)
+        reused = []
+        while not game.is_done():
+            obs = game.get_observation()
+            if obs.player_view == NORTH:
+                card = mcts.choose_card(obs)
+                self.assertIn(card, np.flatnonzero(rule.get_valid_cards_from_obs(obs)))
+                self.assertEqual(mcts.last_reused_iterations + mcts.last_iterations, mcts.tree.count[mcts.root])
+                reused.append(mcts.last_reused_iterations)
+            else:
+                card = np.random.choice(np.flatnonzero(rule.get_valid_cards_from_obs(obs)))
+            game.action_play_card(card)
+        self.assertEqual(0, reused[0])
+        self.assertGreater(sum(reused), 0)
+
+        # not reused for a new game
+        game.init_from_cards(hands=deal_random_hand(), dealer=WEST)
+        game.action_trump(HEARTS)
+        mcts.choose_card(game.get_observation())
+        self.assertEqual(0, mcts.last_reused_iterations)
+
+    def test_batch_rollouts(self):
+        rule = RuleSchieber()
+        for information_set in (False, True):
+            game = GameSim(rule=rule)
+            game.init_from_cards(hands=deal_random_hand(), dealer=EAST)
+            game.action_trump(HEARTS)
+            mcts = MCTS_logic('test', iterations=10, seed=2, information_set=information_set, rollouts_per_leaf=8)
+            while not game.is_done():
+                obs = game.get_observation()
+                card = mcts.choose_card(obs)
+                self.assertIn(card, np.flatnonzero(rule.get_valid_cards_from_obs(obs)))
+                payoff = mcts.tree.total_payoff[mcts.root] / mcts.tree.count[mcts.root]
+                self.assertTrue(0 <= payoff <= 1)
+                game.action_play_card(card)
+
+    def test_seed(self):
+        game = GameSim(rule=RuleSchieber())
+        game.init_from_cards(hands=deal_random_hand(), dealer=EAST)
+        game.action_trump(OBE_ABE)
+        obs = game.get_observation()
+        card = MCTS_logic('test', iterations=100, seed=7).choose_card(obs)
+        self.assertEqual(card, MCTS_logic('test', iterations=100, seed=7).choose_card(obs))
+
+
+if __name__ == '__main__':
+    unittest.main()
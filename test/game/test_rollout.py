@@ -0,0 +1,74 @@
+import unittest
+
+import numpy as np
+
+from jass.game.bitboard import cards_to_bits
+from jass.game.const import *
+from jass.game.game_sim import GameSim
+from jass.game.game_util import deal_random_hand
+from jass.game.rollout import RolloutEngine, BatchRolloutEngine, greedy_policy
+from jass.game.rule_schieber import RuleSchieber
+
+
+class RolloutTestCase(unittest.TestCase):
+    def test_rollout(self):
+        game = GameSim(rule=RuleSchieber())
+        game.init_from_cards(hands=deal_random_hand(), dealer=NORTH)
+        game.action_trump(OBE_ABE)
+        for _ in range(6):
+            game.action_play_card(np.flatnonzero(game.rule.get_valid_cards_from_state(game.state))[0])
+        state = game.state.copy()
+
+        engine = RolloutEngine(seed=3)
+        points = engine.rollout(game.state, 100)
+        self.assertEqual((100, 2), points.shape)
+        np.testing.assert_array_equal(157, points.sum(axis=1))
+        self.assertTrue(np.all(points >= game.state.points))
+        self.assertGreater(len(np.unique(points[:, 0])), 1)
+        self.assertEqual(state, game.state)
+
+        # same seed gives the same playouts
+        np.testing.assert_array_equal(points, RolloutEngine(seed=3).rollout(game.state, 100))
+
+    def test_policy(self):
+        # a deterministic policy gives the same result as playing the game with the policy
+        rule = RuleSchieber()
+        for trump in range(6):
+            game = GameSim(rule=rule)
+            game.init_from_cards(hands=deal_random_hand(), dealer=EAST)
+            game.action_trump(trump)
+            game.action_play_card(np.flatnonzero(game.state.hands[game.state.player])[0])
+
+            points = RolloutEngine(policy=greedy_policy).rollout(game.state, 2)
+            while not game.is_done():
+                valid = cards_to_bits(rule.get_valid_cards_from_state(game.state))
+                trick = game.state.current_trick.tolist()
+                game.action_play_card(greedy_policy(valid, trick, game.state.nr_cards_in_trick, trump, None))
+            np.testing.assert_array_equal(game.state.points, points[0])
+            np.testing.assert_array_equal(game.state.points, points[1])
+
+    def test_batch_rollout(self):
+        game = GameSim(rule=RuleSchieber())
+        game.init_from_cards(hands=deal_random_hand(), dealer=WEST)
+        game.action_trump(CLUBS)
+        for _ in range(10):
+            game.action_play_card(np.flatnonzero(game.rule.get_valid_cards_from_state(game.state))[0])
+        state = game.state
+
+        engine = BatchRolloutEngine(32, seed=5)
+        points = engine.rollout(state)
+        self.assertEqual((32, 2), points.shape)
+        np.testing.assert_array_equal(157, points.sum(axis=1))
+        self.assertTrue(np.all(points >= state.points))
+        self.assertGreater(len(np.unique(points[:, 0])), 1)
+
+        # from the position only, with the same random numbers
+        engine.seed(5)
+        points_position = engine.rollout_position(state.hands, state.current_trick.tolist(), state.nr_cards_in_trick,
+                                                  state.trick_first_player[state.nr_tricks], state.player,
+                                                  state.nr_played_cards, state.points.tolist(), state.trump)
+        np.testing.assert_array_equal(points, points_position)
+
+
+if __name__ == '__main__':
+    unittest.main()
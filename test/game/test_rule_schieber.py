@@ -156,6 +156,44 @@ class RuleSchieberTestCase(unittest.TestCase):
         actions = rule.get_valid_actions_from_state(game.state)
         self.assertEqual(9, actions.sum())
 
+    def test_valid_cards_batch(self):
+        # collect positions from random games with all trumps
+        np.random.seed(1)
+        hands, tricks, move_nr, trumps, expected = [], [], [], [], []
+        for game_nr in range(60):
+            game = GameSim(rule=self.rule)
+            game.init_from_cards(hands=deal_random_hand(), dealer=NORTH)
+            game.action_trump(game_nr % 6)
+            while not game.is_done():
+                state = game.state
+                valid = self.rule.get_valid_cards_from_state(state)
+                hands.append(state.hands[state.player].copy())
+                tricks.append(state.current_trick.copy())
+                move_nr.append(state.nr_cards_in_trick)
+                trumps.append(state.trump)
+                expected.append(valid.copy())
+                game.action_play_card(np.random.choice(np.flatnonzero(valid)))
+
+        # add the positions from the other tests
+        for hand, trick, trump in [([SA, SK, HJ, C6, C7], [H6, H8, -1, -1], H),
+                                   ([SA, SK, HJ, H8, H6, C7, C6], [C10, CA, H10, -1], H),
+                                   ([SA, SK, S7, H8, H6, C7, C6], [HK, H8, SQ, -1], S),
+                                   ([SA, SK, H9, H8, H6, C7, C6], [C10, CA, HA, -1], H),
+                                   ([DA, DK, D8], [C10, DJ, H10, -1], D),
+                                   ([SA, SK, H7, HJ], [SQ, -1, -1, -1], OBE_ABE)]:
+            hand_encoded = np.zeros(36, np.int32)
+            hand_encoded[hand] = 1
+            nr_cards = int(np.count_nonzero(np.array(trick) > -1))
+            hands.append(hand_encoded)
+            tricks.append(np.array(trick))
+            move_nr.append(nr_cards)
+            trumps.append(trump)
+            expected.append(self.rule.get_valid_cards(hand_encoded, trick, nr_cards, trump))
+
+        valid = self.rule.get_valid_cards_batch(np.array(hands), np.array(tricks), np.array(move_nr),
+                                                np.array(trumps))
+        np.testing.assert_array_equal(np.array(expected), valid)
+
 
 
 
@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+
+from jass.game.bitboard import cards_to_bits, bits_to_cards, card_list_to_bits, bits_to_card_list, count_bits
+from jass.game.const import *
+from jass.game.game_sim import GameSim
+from jass.game.game_util import deal_random_hand, get_cards_encoded
+from jass.game.rule_schieber import RuleSchieber
+from jass.game.rule_schieber_bitboard import RuleSchieberBitboard
+
+
+class RuleSchieberBitboardTestCase(unittest.TestCase):
+    def test_conversions(self):
+        cards = get_cards_encoded([DA, H10, SJ, C6])
+        bits = cards_to_bits(cards)
+        self.assertEqual((1 << DA) | (1 << H10) | (1 << SJ) | (1 << C6), bits)
+        self.assertEqual(4, count_bits(bits))
+        np.testing.assert_array_equal(cards, bits_to_cards(bits))
+        self.assertEqual([DA, H10, SJ, C6], bits_to_card_list(bits))
+        self.assertEqual(bits, card_list_to_bits([DA, H10, SJ, C6, -1]))
+
+    def test_same_as_rule_schieber(self):
+        rule = RuleSchieber()
+        rule_bitboard = RuleSchieberBitboard()
+        np.random.seed(42)
+        for game_nr in range(60):
+            game = GameSim(rule=rule)
+            game.init_from_cards(hands=deal_random_hand(), dealer=NORTH)
+            game.action_trump(game_nr % 6)
+            while not game.is_done():
+                state = game.state
+                expected = rule.get_valid_cards_from_state(state)
+                valid = rule_bitboard.get_valid_cards_from_state(state)
+                np.testing.assert_array_equal(expected, valid)
+                self.assertEqual(cards_to_bits(expected),
+                                 rule_bitboard.get_valid_cards_bits(cards_to_bits(state.hands[state.player]),
+                                                                    state.current_trick,
+                                                                    state.nr_cards_in_trick,
+                                                                    state.trump))
+                game.action_play_card(np.random.choice(np.flatnonzero(valid)))
+
+    def test_trump_jack(self):
+        rule = RuleSchieberBitboard()
+        hand = card_list_to_bits([SA, SK, HJ, C6, C7])
+        self.assertEqual(hand, rule.get_valid_cards_bits(hand, [H6, H8], 2, H))
+
+        hand = card_list_to_bits([SA, SK, HJ, H6, C7])
+        self.assertEqual(card_list_to_bits([HJ, H6]), rule.get_valid_cards_bits(hand, [H10], 1, H))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+
+import numpy as np
+
+from jass.agents.agent_random_schieber import AgentRandomSchieber
+from jass.arena.arena import Arena
+from jass.arena.stopping_rule import StoppingRule, SPRTStoppingRule, ConfidenceBoundStoppingRule, \
+    TEAM_0_BETTER, TEAM_1_BETTER, UNDECIDED
+
+
+class StoppingRuleAlways(StoppingRule):
+    # decides for team 0 as soon as it has the minimal number of observations
+    def _decide(self) -> int:
+        return TEAM_0_BETTER
+
+
+def _observations_to_decide(rule: StoppingRule, differences: np.ndarray) -> (int, int):
+    for difference in differences:
+        if rule.update(difference) != UNDECIDED:
+            break
+    return rule.decision, rule.nr_observations
+
+
+class StoppingRuleTestCase(unittest.TestCase):
+    def test_mean_variance(self):
+        rng = np.random.default_rng(1)
+        differences = rng.normal(3.0, 40.0, 100)
+        rule = StoppingRuleAlways(min_observations=1000)
+        for difference in differences:
+            rule.update(difference)
+        self.assertAlmostEqual(differences.mean(), rule.mean)
+        self.assertAlmostEqual(differences.var(ddof=1), rule.variance)
+
+        rule.reset()
+        self.assertEqual(0, rule.nr_observations)
+        self.assertEqual(UNDECIDED, rule.decision)
+
+    def test_sprt(self):
+        rng = np.random.default_rng(2)
+        decision, nr_observations = _observations_to_decide(SPRTStoppingRule(), rng.normal(20.0, 50.0, 10000))
+        self.assertEqual(TEAM_0_BETTER, decision)
+        self.assertLess(nr_observations, 1000)
+
+        decision, _ = _observations_to_decide(SPRTStoppingRule(), rng.normal(-20.0, 50.0, 10000))
+        self.assertEqual(TEAM_1_BETTER, decision)
+
+        # the decision does not change anymore
+        rule = SPRTStoppingRule()
+        _observations_to_decide(rule, rng.normal(-20.0, 50.0, 10000))
+        self.assertEqual(TEAM_1_BETTER, rule.update(1000.0))
+
+        with self.assertRaises(ValueError):
+            SPRTStoppingRule(delta_0=5.0, delta_1=5.0)
+
+    def test_confidence_bound(self):
+        rng = np.random.default_rng(3)
+        decision, nr_observations = _observations_to_decide(ConfidenceBoundStoppingRule(),
+                                                            rng.normal(20.0, 50.0, 10000))
+        self.assertEqual(TEAM_0_BETTER, decision)
+        self.assertLess(nr_observations, 1000)
+
+        # equal teams are (almost always) undecided
+        decision, nr_observations = _observations_to_decide(ConfidenceBoundStoppingRule(max_observations=2000),
+                                                            rng.normal(0.0, 50.0, 2000))
+        self.assertEqual(UNDECIDED, decision)
+        self.assertEqual(2000, nr_observations)
+
+    def test_arena(self):
+        for nr_workers in (0, 1):
+            for duplicate in (False, True):
+                arena = Arena(nr_games_to_play=40, print_every_x_games=40, nr_workers=nr_workers, shard_size=4,
+                              duplicate=duplicate, stopping_rule=StoppingRuleAlways(min_observations=5))
+                arena.set_players(AgentRandomSchieber(), AgentRandomSchieber(),
+                                  AgentRandomSchieber(), AgentRandomSchieber())
+                arena.play_all_games()
+                self.assertEqual(TEAM_0_BETTER, arena.decision)
+                self.assertEqual(10 if duplicate else 5, arena.nr_games_played)
+
+    def test_arena_undecided(self):
+        arena = Arena(nr_games_to_play=10, print_every_x_games=10,
+                      stopping_rule=StoppingRuleAlways(min_observations=100))
+        arena.set_players(AgentRandomSchieber(), AgentRandomSchieber(),
+                          AgentRandomSchieber(), AgentRandomSchieber())
+        arena.play_all_games()
+        self.assertEqual(UNDECIDED, arena.decision)
+        self.assertEqual(10, arena.nr_games_played)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+import numpy as np
+
+from jass.agents.agent_random_schieber import AgentRandomSchieber
+from jass.arena.tournament import Tournament
+
+
+class AgentRandomSeeded(AgentRandomSchieber):
+    # records the seeds
+    def __init__(self):
+        super().__init__()
+        self.seeds = []
+
+    def set_seed(self, seed) -> None:
+        super().set_seed(seed)
+        self.seeds.append(seed)
+
+
+class TournamentTestCase(unittest.TestCase):
+    def test_deal(self):
+        tournament = Tournament(dict(a=AgentRandomSchieber, b=AgentRandomSchieber), nr_deals=20, seed=1)
+        deals = tournament._deal()
+        self.assertEqual((20, 4, 36), deals.shape)
+        np.testing.assert_array_equal(9, deals.sum(axis=2))
+        np.testing.assert_array_equal(1, deals.sum(axis=1))
+        np.testing.assert_array_equal(deals, Tournament(dict(a=AgentRandomSchieber, b=AgentRandomSchieber),
+                                                        nr_deals=20, seed=1)._deal())
+
+    def test_ratings(self):
+        agents = dict(a=AgentRandomSchieber, b=AgentRandomSchieber, c=AgentRandomSchieber)
+        tournament = Tournament(agents, nr_deals=30)
+        # a wins 2/3 of the deals against b, b 2/3 of the deals against c and a 4/5 of the deals against c
+        outcomes = np.where(np.arange(30) % 3 == 0, -10.0, 10.0)
+        tournament._add_result(0, 1, 0, outcomes.tolist())
+        tournament._add_result(1, 2, 0, outcomes.tolist())
+        tournament._add_result(0, 2, 0, np.where(np.arange(30) % 5 == 0, -10.0, 10.0).tolist())
+        ratings = tournament.ratings(prior_deals=0.0)
+        self.assertAlmostEqual(1500.0, ratings.mean())
+        # the winning probabilities of the fitted model match the results of a against b and b against c
+        self.assertAlmostEqual(400 * np.log10(2), ratings[0] - ratings[1], places=3)
+        self.assertAlmostEqual(400 * np.log10(2), ratings[1] - ratings[2], places=3)
+        self.assertEqual(['a', 'b', 'c'], [standing[0] for standing in tournament.standings()])
+
+    def test_play(self):
+        results = []
+        for nr_workers in [0, 2]:
+            standings = []
+            agents = dict(random=AgentRandomSchieber, other_random=AgentRandomSchieber(), third=AgentRandomSchieber)
+            tournament = Tournament(agents, nr_deals=5, deals_per_task=2, nr_workers=nr_workers, seed=7,
+                                    standings_callback=standings.append, print_standings=False)
+            final = tournament.play()
+
+            # 3 matches in 3 tasks each
+            self.assertEqual(9, len(standings))
+            self.assertEqual(final, standings[-1])
+            self.assertEqual(3, len(final))
+            for name, rating, nr_deals, difference in final:
+                self.assertEqual(10, nr_deals)
+            np.testing.assert_array_equal(tournament.differences, -tournament.differences.transpose(1, 0, 2))
+            results.append(tournament.differences)
+
+        # the results do not depend on the number of workers
+        np.testing.assert_array_equal(results[0], results[1])
+
+    def test_seeds(self):
+        first = AgentRandomSeeded()
+        second = AgentRandomSeeded()
+        Tournament(dict(first=first, second=second), nr_deals=2, seed=1, print_standings=False).play()
+        self.assertEqual(1, len(first.seeds))
+        self.assertNotEqual(first.seeds, second.seeds)
+
+    def test_too_few_agents(self):
+        with self.assertRaises(ValueError):
+            Tournament(dict(a=AgentRandomSchieber))
+
+
+if __name__ == '__main__':
+    unittest.main()
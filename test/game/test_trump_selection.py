@@ -0,0 +1,130 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+
+from jass.agents.Agent_rulebased import Agent_rulebased
+from jass.agents.MCTS_agent import MCTS_agent
+from jass.agents.trump_selection import TrumpSelection, canonical_hand, TRUMP_SCORE, NO_TRUMP_SCORE, \
+    OBENABE_SCORE, UNEUFE_SCORE
+from jass.game.bitboard import cards_to_bits
+from jass.game.const import *
+from jass.game.game_observation import GameObservation
+from jass.game.game_util import deal_random_hand
+
+
+def _scores(hand: np.ndarray) -> list:
+    # scores calculated card by card
+    scores = []
+    for trump in range(MAX_TRUMP + 1):
+        score = 0
+        for card in np.flatnonzero(hand):
+            offset = offset_of_card[card]
+            if color_of_card[card] == trump:
+                score += TRUMP_SCORE[offset]
+            elif trump == OBE_ABE:
+                score += OBENABE_SCORE[offset]
+            elif trump == UNE_UFE:
+                score += UNEUFE_SCORE[offset]
+            else:
+                score += NO_TRUMP_SCORE[offset]
+        scores.append(score)
+    return scores
+
+
+def _permute_colors(hand: np.ndarray, colors: list) -> np.ndarray:
+    # move the cards of color c to color colors[c]
+    permuted = np.zeros(36, dtype=hand.dtype)
+    for color in range(4):
+        permuted[colors[color] * 9:colors[color] * 9 + 9] = hand[color * 9:color * 9 + 9]
+    return permuted
+
+
+class TrumpSelectionTestCase(unittest.TestCase):
+    def test_canonical_hand(self):
+        hand = deal_random_hand()[0]
+        canonical, colors = canonical_hand(cards_to_bits(hand))
+        for permutation in ([1, 2, 3, 0], [3, 2, 0, 1]):
+            self.assertEqual(canonical, canonical_hand(cards_to_bits(_permute_colors(hand, permutation)))[0])
+        blocks = [(canonical >> (9 * color)) & 0x1FF for color in range(4)]
+        self.assertEqual(sorted(blocks, reverse=True), blocks)
+        self.assertEqual([(cards_to_bits(hand) >> (9 * color)) & 0x1FF for color in colors], blocks)
+
+    def test_scores(self):
+        selection = TrumpSelection()
+        for hand in deal_random_hand():
+            values = selection.evaluate(hand)
+            np.testing.assert_array_equal(_scores(hand), values[0:6])
+            self.assertEqual(68, values[6])
+
+            best = int(np.argmax(values[0:6]))
+            self.assertEqual(best, selection.select(hand, forehand=0))
+            self.assertEqual(best if values[best] >= 68 else PUSH, selection.select(hand, forehand=-1))
+
+    def test_cache(self):
+        selection = TrumpSelection()
+        hand = deal_random_hand()[0]
+        values = selection.evaluate(hand)
+        permuted = _permute_colors(hand, [2, 0, 3, 1])
+        permuted_values = selection.evaluate(permuted)
+        np.testing.assert_array_equal(values[[0, 1, 2, 3]], permuted_values[[2, 0, 3, 1]])
+        np.testing.assert_array_equal(values[4:], permuted_values[4:])
+        self.assertEqual(1, selection.cache_info().hits)
+
+    def test_simulation(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'trump')
+            selection = TrumpSelection(method='simulation', nr_deals=4, cache_file=filename)
+            hand = deal_random_hand()[0]
+            values = selection.evaluate(hand)
+            self.assertEqual(7, values.size)
+            self.assertTrue(np.all((values >= 0) & (values <= 157)))
+            self.assertIn(selection.select(hand, forehand=-1), list(range(6)) + [PUSH])
+            selection.close()
+
+            self.assertEqual(1, selection.nr_simulations)
+            selection.close()
+
+            # the evaluation is read from the file
+            selection = TrumpSelection(method='simulation', nr_deals=4, cache_file=filename)
+            np.testing.assert_array_equal(values, selection.evaluate(hand))
+            self.assertEqual(0, selection.nr_simulations)
+
+            # a copy reads the file, but does not write to it
+            copy = pickle.loads(pickle.dumps(selection))
+            np.testing.assert_array_equal(values, copy.evaluate(hand))
+            self.assertEqual(0, copy.nr_simulations)
+            copy.evaluate(deal_random_hand()[1])
+            self.assertEqual(1, copy.nr_simulations)
+            copy.close()
+            selection.close()
+
+    def test_pickle(self):
+        selection = TrumpSelection()
+        hand = deal_random_hand()[0]
+        values = selection.evaluate(hand)
+        copy = pickle.loads(pickle.dumps(selection))
+        np.testing.assert_array_equal(values, copy.evaluate(hand))
+        self.assertEqual(0, copy.cache_info().hits)
+        copy.evaluate(hand)
+        self.assertEqual(1, copy.cache_info().hits)
+
+        for agent in [Agent_rulebased(), MCTS_agent()]:
+            copy = pickle.loads(pickle.dumps(agent))
+            self.assertIsInstance(copy, type(agent))
+
+    def test_mcts_agent(self):
+        obs = GameObservation()
+        obs.player = NORTH
+        obs.player_view = NORTH
+        obs.dealer = EAST
+        obs.forehand = 0
+        obs.hand = deal_random_hand()[0]
+        agent = MCTS_agent(trump_selection=TrumpSelection())
+        self.assertIn(agent.action_trump(obs), range(6))
+
+
+if __name__ == '__main__':
+    unittest.main()